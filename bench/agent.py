@@ -0,0 +1,364 @@
+"""
+Lokální simulovaný SNMP agent pro benchmarky
+SNMP v1/v2c GET / GETNEXT / GETBULK nad syntetickou IF-MIB tabulkou
+BER kódování je ruční, agent tak nebrzdí měřeného klienta
+"""
+
+import argparse
+import asyncio
+import bisect
+import random
+import time
+
+# BER / SNMP tagy
+INTEGER = 0x02
+OCTET_STRING = 0x04
+NULL = 0x05
+OBJECT_ID = 0x06
+SEQUENCE = 0x30
+IP_ADDRESS = 0x40
+COUNTER32 = 0x41
+GAUGE32 = 0x42
+TIME_TICKS = 0x43
+COUNTER64 = 0x46
+NO_SUCH_OBJECT = 0x80
+NO_SUCH_INSTANCE = 0x81
+END_OF_MIB_VIEW = 0x82
+
+GET_REQUEST = 0xA0
+GETNEXT_REQUEST = 0xA1
+RESPONSE = 0xA2
+GETBULK_REQUEST = 0xA5
+
+ERR_TOO_BIG = 1
+ERR_NO_SUCH_NAME = 2
+
+# Rezerva na hlavičku zprávy při ořezávání GETBULK odpovědi
+HEADER_RESERVE = 64
+
+
+def _oid(dotted):
+    return tuple(int(x) for x in dotted.strip('.').split('.'))
+
+
+SYS_DESCR = _oid('1.3.6.1.2.1.1.1.0')
+SYS_OBJECT_ID = _oid('1.3.6.1.2.1.1.2.0')
+SYS_UPTIME = _oid('1.3.6.1.2.1.1.3.0')
+IF_NUMBER = _oid('1.3.6.1.2.1.2.1.0')
+IF_ENTRY = _oid('1.3.6.1.2.1.2.2.1')
+IFX_ENTRY = _oid('1.3.6.1.2.1.31.1.1.1')
+IF_TABLE_LAST_CHANGE = _oid('1.3.6.1.2.1.31.1.5.0')
+
+
+# === BER ===
+
+def decode_tlv(data, pos):
+    """Vrátí (tag, začátek hodnoty, konec hodnoty)"""
+    tag = data[pos]
+    length = data[pos + 1]
+    pos += 2
+    if length & 0x80:
+        n = length & 0x7F
+        length = int.from_bytes(data[pos:pos + n], 'big')
+        pos += n
+    return tag, pos, pos + length
+
+
+def decode_oid(data):
+    first = data[0]
+    arcs = [first // 40, first % 40] if first < 80 else [2, first - 80]
+    val = 0
+    for b in data[1:]:
+        val = (val << 7) | (b & 0x7F)
+        if not b & 0x80:
+            arcs.append(val)
+            val = 0
+    return tuple(arcs)
+
+
+def encode_length(n):
+    if n < 0x80:
+        return bytes((n,))
+    body = n.to_bytes((n.bit_length() + 7) // 8, 'big')
+    return bytes((0x80 | len(body),)) + body
+
+
+def encode_tlv(tag, body):
+    return bytes((tag,)) + encode_length(len(body)) + body
+
+
+def encode_int(tag, value):
+    return encode_tlv(tag, value.to_bytes(value.bit_length() // 8 + 1, 'big', signed=True))
+
+
+def encode_unsigned(tag, value):
+    # Unsigned typy (Counter, Gauge, TimeTicks) potřebují vedoucí 0 při nastaveném horním bitu
+    return encode_tlv(tag, value.to_bytes(value.bit_length() // 8 + 1, 'big'))
+
+
+def encode_oid(oid):
+    body = bytearray((oid[0] * 40 + oid[1],))
+    for arc in oid[2:]:
+        chunk = [arc & 0x7F]
+        arc >>= 7
+        while arc:
+            chunk.append(0x80 | (arc & 0x7F))
+            arc >>= 7
+        body += bytes(reversed(chunk))
+    return encode_tlv(OBJECT_ID, bytes(body))
+
+
+def encode_value(tag, value):
+    if tag == OCTET_STRING:
+        return encode_tlv(tag, value.encode() if isinstance(value, str) else value)
+    if tag == OBJECT_ID:
+        return encode_oid(value)
+    if tag == INTEGER:
+        return encode_int(tag, value)
+    if tag in (NULL, NO_SUCH_OBJECT, NO_SUCH_INSTANCE, END_OF_MIB_VIEW):
+        return bytes((tag, 0))
+    return encode_unsigned(tag, value)
+
+
+def encode_varbind(oid, tag, value=None):
+    return encode_tlv(SEQUENCE, encode_oid(oid) + encode_value(tag, value))
+
+
+# === MIB ===
+
+class SyntheticIfMib:
+    """Syntetická IF-MIB / IF-X-MIB tabulka s rostoucími čítači"""
+
+    def __init__(self, interfaces=48, seed=1):
+        self.interfaces = interfaces
+        self.start = time.monotonic()
+        self.values = {}
+        rnd = random.Random(seed)
+
+        self.values[SYS_DESCR] = (OCTET_STRING, f"Simulated switch, {interfaces} ports")
+        self.values[SYS_OBJECT_ID] = (OBJECT_ID, _oid('1.3.6.1.4.1.8072.3.2.10'))
+        self.values[SYS_UPTIME] = (TIME_TICKS, self._uptime)
+        self.values[IF_NUMBER] = (INTEGER, interfaces)
+        self.values[IF_TABLE_LAST_CHANGE] = (TIME_TICKS, 0)
+
+        for idx in range(1, interfaces + 1):
+            # Bajtů/s a bajtů na paket pro každý směr
+            rx_rate = rnd.randint(0, 125_000_000)
+            tx_rate = rnd.randint(0, 125_000_000)
+            up = 1 if rnd.random() < 0.7 else 2
+            self._add(IF_ENTRY, 1, idx, INTEGER, idx)
+            self._add(IF_ENTRY, 2, idx, OCTET_STRING, f"GigabitEthernet1/0/{idx}")
+            self._add(IF_ENTRY, 5, idx, GAUGE32, 1_000_000_000)
+            self._add(IF_ENTRY, 7, idx, INTEGER, 1)
+            self._add(IF_ENTRY, 8, idx, INTEGER, up)
+            self._add(IF_ENTRY, 9, idx, TIME_TICKS, 0)
+            self._add(IF_ENTRY, 10, idx, COUNTER32, self._counter(rx_rate, 32))
+            self._add(IF_ENTRY, 11, idx, COUNTER32, self._counter(rx_rate // 800, 32))
+            self._add(IF_ENTRY, 14, idx, COUNTER32, self._counter(rx_rate // 10_000_000, 32))
+            self._add(IF_ENTRY, 16, idx, COUNTER32, self._counter(tx_rate, 32))
+            self._add(IF_ENTRY, 17, idx, COUNTER32, self._counter(tx_rate // 800, 32))
+            self._add(IF_ENTRY, 20, idx, COUNTER32, self._counter(tx_rate // 10_000_000, 32))
+            self._add(IFX_ENTRY, 1, idx, OCTET_STRING, f"Gi1/0/{idx}")
+            self._add(IFX_ENTRY, 6, idx, COUNTER64, self._counter(rx_rate, 64))
+            self._add(IFX_ENTRY, 7, idx, COUNTER64, self._counter(rx_rate // 800, 64))
+            self._add(IFX_ENTRY, 10, idx, COUNTER64, self._counter(tx_rate, 64))
+            self._add(IFX_ENTRY, 11, idx, COUNTER64, self._counter(tx_rate // 800, 64))
+            self._add(IFX_ENTRY, 15, idx, GAUGE32, 1000)
+            self._add(IFX_ENTRY, 18, idx, OCTET_STRING, f"port {idx}" if idx % 3 else "")
+            self._add(IFX_ENTRY, 19, idx, TIME_TICKS, 0)
+
+        self.oids = sorted(self.values)
+
+    def _add(self, entry, column, idx, tag, value):
+        self.values[entry + (column, idx)] = (tag, value)
+
+    def _uptime(self):
+        return int((time.monotonic() - self.start) * 100) + 100_000
+
+    def _counter(self, per_second, bits):
+        mask = (1 << bits) - 1
+        return lambda: int((time.monotonic() - self.start) * per_second) & mask
+
+    def get(self, oid, v1=False):
+        entry = self.values.get(oid)
+        if entry is None or (v1 and entry[0] == COUNTER64):
+            # SNMPv1 nezná Counter64, takové objekty pro něj neexistují
+            return None
+        tag, value = entry
+        return tag, value() if callable(value) else value
+
+    def next(self, oid, v1=False):
+        pos = bisect.bisect_right(self.oids, oid)
+        while pos < len(self.oids):
+            nxt = self.oids[pos]
+            entry = self.get(nxt, v1)
+            if entry is not None:
+                return nxt, entry
+            pos += 1
+        return None, None
+
+
+# === Agent ===
+
+class SimulatedAgent(asyncio.DatagramProtocol):
+    """UDP SNMP responder s nastavitelnou latencí a ztrátovostí"""
+
+    def __init__(self, mib, community='public', latency=0.0, loss=0.0, max_size=1472):
+        self.mib = mib
+        self.community = community.encode()
+        self.latency = latency
+        self.loss = loss
+        self.max_size = max_size
+        self.transport = None
+        self.requests = 0
+        self.dropped = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.requests += 1
+        if self.loss and random.random() < self.loss:
+            self.dropped += 1
+            return
+        try:
+            response = self.handle(data)
+        except (IndexError, ValueError):
+            return
+        if response is None:
+            return
+        if self.latency:
+            asyncio.get_running_loop().call_later(self.latency, self.transport.sendto, response, addr)
+        else:
+            self.transport.sendto(response, addr)
+
+    def handle(self, data):
+        _, pos, _ = decode_tlv(data, 0)
+        tag, start, end = decode_tlv(data, pos)
+        version = int.from_bytes(data[start:end], 'big', signed=True)
+        tag, start, end = decode_tlv(data, end)
+        if data[start:end] != self.community:
+            return None
+        pdu_type, pos, _ = decode_tlv(data, end)
+        fields = []
+        for _ in range(3):
+            tag, start, pos = decode_tlv(data, pos)
+            fields.append(int.from_bytes(data[start:pos], 'big', signed=True))
+        request_id, field2, field3 = fields
+
+        _, pos, vbl_end = decode_tlv(data, pos)
+        oids = []
+        while pos < vbl_end:
+            _, vb_start, vb_end = decode_tlv(data, pos)
+            _, start, end = decode_tlv(data, vb_start)
+            oids.append(decode_oid(data[start:end]))
+            pos = vb_end
+
+        if pdu_type == GET_REQUEST:
+            status, index, varbinds = self._get(oids, version)
+        elif pdu_type == GETNEXT_REQUEST:
+            status, index, varbinds = self._getnext(oids, version)
+        elif pdu_type == GETBULK_REQUEST and version == 1:
+            status, index, varbinds = self._getbulk(oids, field2, field3)
+        else:
+            return None
+
+        body = b''.join(varbinds)
+        if status == 0 and len(body) + HEADER_RESERVE > self.max_size:
+            status, index = ERR_TOO_BIG, 0
+        if status:
+            body = b''.join(encode_varbind(oid, NULL) for oid in oids)
+
+        pdu = (encode_int(INTEGER, request_id) + encode_int(INTEGER, status)
+               + encode_int(INTEGER, index) + encode_tlv(SEQUENCE, body))
+        return encode_tlv(SEQUENCE, encode_int(INTEGER, version)
+                          + encode_tlv(OCTET_STRING, self.community)
+                          + encode_tlv(RESPONSE, pdu))
+
+    def _get(self, oids, version):
+        varbinds = []
+        for i, oid in enumerate(oids, 1):
+            entry = self.mib.get(oid, version == 0)
+            if entry is None:
+                if version == 0:
+                    return ERR_NO_SUCH_NAME, i, []
+                varbinds.append(encode_varbind(oid, NO_SUCH_INSTANCE))
+            else:
+                varbinds.append(encode_varbind(oid, *entry))
+        return 0, 0, varbinds
+
+    def _getnext(self, oids, version):
+        varbinds = []
+        for i, oid in enumerate(oids, 1):
+            nxt, entry = self.mib.next(oid, version == 0)
+            if nxt is None:
+                if version == 0:
+                    return ERR_NO_SUCH_NAME, i, []
+                varbinds.append(encode_varbind(oid, END_OF_MIB_VIEW))
+            else:
+                varbinds.append(encode_varbind(nxt, *entry))
+        return 0, 0, varbinds
+
+    def _getbulk(self, oids, non_repeaters, max_repetitions):
+        varbinds = []
+        size = HEADER_RESERVE
+
+        def add(oid):
+            nonlocal size
+            nxt, entry = self.mib.next(oid)
+            vb = encode_varbind(oid, END_OF_MIB_VIEW) if nxt is None else encode_varbind(nxt, *entry)
+            if size + len(vb) > self.max_size:
+                return None
+            size += len(vb)
+            varbinds.append(vb)
+            return nxt or oid
+
+        for oid in oids[:non_repeaters]:
+            if add(oid) is None:
+                return 0, 0, varbinds
+        row = list(oids[non_repeaters:])
+        for _ in range(max(0, max_repetitions)):
+            if not row:
+                break
+            for col, oid in enumerate(row):
+                nxt = add(oid)
+                if nxt is None:
+                    return 0, 0, varbinds
+                row[col] = nxt
+        return 0, 0, varbinds
+
+
+async def start_agent(host='127.0.0.1', port=0, interfaces=48, **kwargs):
+    """Spustí agenta na aktuální smyčce, vrátí (transport, agent, port)"""
+    loop = asyncio.get_running_loop()
+    agent = SimulatedAgent(SyntheticIfMib(interfaces), **kwargs)
+    transport, _ = await loop.create_datagram_endpoint(lambda: agent, local_addr=(host, port))
+    return transport, agent, transport.get_extra_info('sockname')[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulovaný SNMP agent (IF-MIB)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=16100)
+    parser.add_argument('--interfaces', type=int, default=48)
+    parser.add_argument('--community', default='public')
+    parser.add_argument('--latency', type=float, default=0.0, help="zpoždění odpovědi v sekundách")
+    parser.add_argument('--loss', type=float, default=0.0, help="podíl zahozených požadavků 0..1")
+    parser.add_argument('--max-size', type=int, default=1472, help="max velikost odpovědi v bajtech")
+    args = parser.parse_args()
+
+    async def run():
+        _, agent, port = await start_agent(
+            args.host, args.port, args.interfaces, community=args.community,
+            latency=args.latency, loss=args.loss, max_size=args.max_size)
+        print(f"Agent naslouchá na {args.host}:{port} ({args.interfaces} rozhraní)", flush=True)
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
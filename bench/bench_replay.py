@@ -0,0 +1,164 @@
+"""
+Benchmark výpočetní cesty pollingu přehráváním záznamu
+Vygeneruje syntetický záznam GET odpovědí (stejný formát jako --record, s
+burstem, přetečením Counter32 a restartem agenta) a přehraje ho bez sítě
+a bez čekání přes SnmpSession + PortMonitor - měří se jen zpracování
+(parsování, rozdíly, rychlosti, trackery, historie). S --profile vypíše
+nejdražší funkce (cProfile) na stderr.
+
+    python bench/bench_replay.py --ports 48 --polls 20000
+    python bench/bench_replay.py --record incident.rec.gz --host 192.168.1.1 --ports 1,2,3
+    python bench/bench_replay.py --baseline replay.json
+"""
+
+import argparse
+import cProfile
+import json
+import platform
+import pstats
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from snmpmon.counters import stats_oids
+from snmpmon.history import HistoryStore
+from snmpmon.monitor import PortMonitor
+from snmpmon.replay import Recorder, ReplayClient
+from snmpmon.session import SnmpSession
+from snmpmon.target import SnmpTarget
+
+HOST = '192.0.2.1'  # Dokumentační adresa - záznam nikdy nejde na síť
+
+
+def synthesize(path, ports, polls, interval=1.0, seed=1):
+    """Záznam polls odpovědí pro ports portů
+
+    Uprostřed záznamu je restart agenta (sysUpTime od nuly, čítače od nuly),
+    v první čtvrtině desetinásobný burst a in_errors začínají těsně pod 2^32,
+    takže přetečou.
+    """
+    rng = random.Random(seed)
+    target = SnmpTarget(HOST)
+    indices = [str(idx) for idx in range(1, ports + 1)]
+    oids = stats_oids(indices)
+    base = [rng.randrange(10 ** 6, 10 ** 8) for _ in range(ports)]  # B/s portu
+    counters = [[0, 0, 0, 0, 2 ** 32 - 1000 * (i + 1), 0] for i in range(ports)]
+    recorder = Recorder(path)
+    start = time.time() - polls * interval
+    uptime = 100000
+    for n in range(polls):
+        if n == polls // 2:
+            uptime = 0
+            counters = [[0] * 6 for _ in range(ports)]
+        burst = 10 if polls // 4 <= n < polls // 4 + 10 else 1
+        values = {oids[0]: str(uptime)}
+        for i, row in enumerate(counters):
+            rate = base[i] * burst
+            row[0] += rate
+            row[1] += rate // 3
+            row[2] += rate // 800
+            row[3] += rate // 2400
+            row[4] = (row[4] + rng.randrange(0, 50)) & 0xFFFFFFFF
+            offset = 1 + i * 7
+            for j, value in enumerate(row):
+                values[oids[offset + j]] = str(value)
+            values[oids[offset + 6]] = '0'
+        recorder.record('get', target, oids, values, start + n * interval)
+        uptime += int(interval * 100)
+    recorder.close()
+    return target, indices
+
+
+def replay(path, target, indices, profile=False):
+    """Přehraje záznam co nejrychleji, vrací (vzorky, vzorky bez rychlosti, sekundy)"""
+    session = SnmpSession(client=ReplayClient(path, speed=0))
+    monitor = PortMonitor(session, target, indices, interval=1.0, history=HistoryStore())
+    counts = {'samples': 0, 'no_rate': 0}
+
+    def on_poll(samples, total):
+        counts['samples'] += len(samples)
+        counts['no_rate'] += sum(1 for sample in samples if sample.rates is None)
+
+    profiler = cProfile.Profile() if profile else None
+    start = time.perf_counter()
+    try:
+        if profiler is not None:
+            profiler.enable()
+        monitor.run(on_poll, threading.Event(), paced=False)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        elapsed = time.perf_counter() - start
+        session.close()
+    if profiler is not None:
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(25)
+    return counts['samples'], counts['no_rate'], elapsed
+
+
+def compare(results, baseline, threshold):
+    """Propustnost nižší o víc než threshold (podíl) proti předchozímu běhu"""
+    old = baseline['results']
+    if results['samples_per_min'] < old['samples_per_min'] * (1 - threshold):
+        return [{'baseline_samples_per_min': old['samples_per_min'], 'samples_per_min': results['samples_per_min']}]
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark zpracování vzorků přehráním záznamu (bez sítě)")
+    parser.add_argument('--record', help="přehrát existující záznam místo syntetického")
+    parser.add_argument('--host', default=HOST, help="zařízení v záznamu (s --record)")
+    parser.add_argument('--port', type=int, default=161, help="UDP port zařízení v záznamu (s --record)")
+    parser.add_argument('--ports', default='48', help="počet portů syntetického záznamu, s --record ifIndexy oddělené čárkou")
+    parser.add_argument('--polls', type=int, default=20000, help="počet odpovědí syntetického záznamu")
+    parser.add_argument('--profile', action='store_true', help="vypsat profil (cProfile) na stderr")
+    parser.add_argument('--output', help="soubor pro JSON výsledky (výchozí stdout)")
+    parser.add_argument('--baseline', help="JSON předchozího běhu pro porovnání")
+    parser.add_argument('--threshold', type=float, default=0.2, help="povolený pokles propustnosti (podíl)")
+    args = parser.parse_args()
+
+    if args.record:
+        path = args.record
+        target = SnmpTarget(args.host, port=args.port)
+        indices = args.ports.split(',')
+    else:
+        path = str(Path(tempfile.mkdtemp(prefix='snmpmon-replay-')) / 'synthetic.rec.gz')
+        target, indices = synthesize(path, int(args.ports), args.polls)
+
+    samples, no_rate, elapsed = replay(path, target, indices, args.profile)
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'record': args.record or 'synthetic',
+            'ports': len(indices),
+        },
+        'results': {
+            'samples': samples,
+            'samples_without_rate': no_rate,  # První měření a resety (restart agenta)
+            'seconds': elapsed,
+            'samples_per_min': samples / elapsed * 60 if elapsed else 0.0,
+            'us_per_sample': elapsed / samples * 1e6 if samples else 0.0,
+        },
+    }
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            report['regressions'] = compare(report['results'], json.load(f), args.threshold)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if report.get('regressions'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark režie SNMP požadavku: nový engine na každý požadavek vs SnmpSession
+Spouští lokálního simulovaného agenta, výsledky vypíše jako JSON
+
+    python bench/bench_session.py --requests 200
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pysnmp.hlapi.v3arch import (
+    get_cmd, SnmpEngine, CommunityData, UdpTransportTarget, ContextData,
+    ObjectType, ObjectIdentity
+)
+
+from agent import start_agent
+from snmpmon import SnmpSession, SnmpTarget
+
+SYS_UPTIME = '1.3.6.1.2.1.1.3.0'
+
+
+def run_agent_thread(interfaces):
+    """Spustí agenta ve vlastním vlákně se smyčkou, vrátí port"""
+    ready = threading.Event()
+    result = {}
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        _, _, result['port'] = loop.run_until_complete(start_agent(interfaces=interfaces))
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+    return result['port']
+
+
+def get_per_request(port, oid):
+    """Původní vzor: nová smyčka, engine a transport pro každý GET"""
+    async def do_get():
+        target = await UdpTransportTarget.create(('127.0.0.1', port))
+        return await get_cmd(
+            SnmpEngine(), CommunityData('public', mpModel=1), target, ContextData(),
+            ObjectType(ObjectIdentity(oid))
+        )
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    errorIndication, errorStatus, _, varBinds = loop.run_until_complete(do_get())
+    loop.close()
+    if errorIndication or errorStatus:
+        raise RuntimeError(str(errorIndication or errorStatus))
+    return str(varBinds[0][1])
+
+
+def measure(label, func, requests):
+    func()  # Zahřátí (import MIB, první spojení)
+    latencies = []
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    latencies.sort()
+    return {
+        'mode': label,
+        'requests': requests,
+        'req_per_sec': requests / wall,
+        'mean_ms': statistics.fmean(latencies) * 1000,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        'cpu_ms_per_request': cpu / requests * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Režie SNMP požadavku před/po SnmpSession")
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    port = run_agent_thread(interfaces=48)
+    session = SnmpSession()
+    target = SnmpTarget('127.0.0.1', port=port)
+
+    results = [
+        measure('engine-per-request', lambda: get_per_request(port, SYS_UPTIME), args.requests),
+        measure('session', lambda: session.get(target, [SYS_UPTIME]), args.requests),
+    ]
+    session.close()
+
+    results.append({
+        'mode': 'speedup',
+        'mean_latency_x': results[0]['mean_ms'] / results[1]['mean_ms'],
+        'cpu_x': results[0]['cpu_ms_per_request'] / results[1]['cpu_ms_per_request'],
+    })
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
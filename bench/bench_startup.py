@@ -0,0 +1,159 @@
+"""
+Benchmark startu - import balíčku, GUI a čas do prvního vzorku
+Každý běh je nový proces Pythonu (studený start bez cache v paměti), čas se
+měří od spuštění procesu, dokud proces neohlásí hotovo. Výsledky jsou JSON;
+s --baseline se porovnají s dřívějším během a při zpomalení mediánu nad
+--threshold skončí s návratovým kódem 1.
+
+    python bench/bench_startup.py --runs 10 --output startup.json
+    python bench/bench_startup.py --baseline startup.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_suite import start_agent_process
+
+# Scénář -> kód procesu; proces vypíše 'ok' (hotovo) nebo 'skip: důvod'
+SCENARIOS = {
+    # Samotný interpreter - základ, od kterého se ostatní scénáře odečítají
+    'python': "print('ok')",
+    'import_snmpmon': "import snmpmon; print('ok')",
+    'import_cli': "import snmpmon.cli; print('ok')",
+    'import_gui': """
+try:
+    import tkinter
+except ImportError as e:
+    print(f'skip: {e}')
+else:
+    import traffic_monitor
+    print('ok')
+""",
+    # GUI: okno vytvořené a vykreslené (bez displeje se přeskočí)
+    'gui_first_paint': """
+import tkinter as tk
+try:
+    root = tk.Tk()
+except tk.TclError as e:
+    print(f'skip: {e}')
+else:
+    import traffic_monitor
+    app = traffic_monitor.SNMPMonitor(root)
+    root.update()
+    print('ok', flush=True)
+    app.on_close()
+""",
+    # Headless: session, první GET čítačů portů a jejich parsování
+    'first_sample': """
+from snmpmon.counters import fetch_stats
+from snmpmon.session import SnmpSession
+from snmpmon.target import SnmpTarget
+session = SnmpSession()
+stats = session.call(fetch_stats(session.client, SnmpTarget('127.0.0.1', port={port}), ['1', '2', '3']))
+assert len(stats) == 3
+print('ok', flush=True)
+session.close()
+""",
+}
+
+
+def run_once(code):
+    """Jeden studený start, vrací sekundy do 'ok' nebo důvod přeskočení"""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-c', code], cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline().strip()
+    elapsed = time.perf_counter() - start
+    proc.stdout.read()
+    if proc.wait() != 0 or not line.startswith(('ok', 'skip')):
+        raise RuntimeError(f"Proces skončil s chybou {proc.returncode}: {line!r}")
+    if line.startswith('skip'):
+        return line[len('skip: '):]
+    return elapsed
+
+
+def measure(name, code, runs):
+    """Medián a rozptyl runs studených startů (první běh se zahodí - cache disku)"""
+    times = []
+    for i in range(runs + 1):
+        result = run_once(code)
+        if isinstance(result, str):
+            return {'scenario': name, 'skipped': result}
+        if i:
+            times.append(result)
+    times.sort()
+    return {
+        'scenario': name,
+        'runs': runs,
+        'p50_ms': statistics.median(times) * 1000,
+        'min_ms': times[0] * 1000,
+        'max_ms': times[-1] * 1000,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Scénáře, jejichž medián se zhoršil o víc než threshold (podíl)"""
+    previous = {r['scenario']: r for r in baseline['results'] if 'p50_ms' in r}
+    regressions = []
+    for result in results:
+        old = previous.get(result['scenario'])
+        if old and 'p50_ms' in result and result['p50_ms'] > old['p50_ms'] * (1 + threshold):
+            regressions.append({
+                'scenario': result['scenario'],
+                'baseline_p50_ms': old['p50_ms'],
+                'p50_ms': result['p50_ms'],
+            })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark startu (import, GUI, první vzorek) ve studených procesech")
+    parser.add_argument('--runs', type=int, default=10, help="počet měřených startů na scénář")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help="scénáře oddělené čárkou")
+    parser.add_argument('--output', help="soubor pro JSON výsledky (výchozí stdout)")
+    parser.add_argument('--baseline', help="JSON předchozího běhu pro porovnání")
+    parser.add_argument('--threshold', type=float, default=0.2, help="povolené zhoršení mediánu (podíl)")
+    args = parser.parse_args()
+
+    proc, port = start_agent_process(48, 0.0, 0.0)
+    try:
+        results = [
+            measure(name, SCENARIOS[name].replace('{port}', str(port)), args.runs)
+            for name in args.scenarios.split(',')
+        ]
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            report['regressions'] = compare(results, json.load(f), args.threshold)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if report.get('regressions'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Benchmark suite - discovery a polling proti lokálnímu simulovanému agentovi
+Agent běží v samostatném procesu, měří se jen klient (čas, CPU, paměť).
+Výsledky jsou JSON; s --baseline se porovnají s dřívějším během a při
+zpomalení nad --threshold skončí s návratovým kódem 1.
+
+    python bench/bench_suite.py --sizes 10,1000,10000 --output results.json
+    python bench/bench_suite.py --baseline results.json
+"""
+
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from snmpmon import SnmpSession, SnmpTarget
+from snmpmon.counters import OID, fetch_stats
+from snmpmon.ifcache import InterfaceCache, fetch_interfaces
+
+AGENT = Path(__file__).resolve().parent / 'agent.py'
+
+
+def start_agent_process(interfaces, latency, loss):
+    """Spustí agenta jako proces, vrátí (Popen, port)"""
+    proc = subprocess.Popen(
+        [sys.executable, str(AGENT), '--port', '0', '--interfaces', str(interfaces),
+         '--latency', str(latency), '--loss', str(loss)],
+        stdout=subprocess.PIPE, text=True
+    )
+    line = proc.stdout.readline()  # "Agent naslouchá na host:port (...)"
+    return proc, int(line.split()[3].split(':')[1])
+
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def measure(name, interfaces, func, budget, min_runs=3, max_runs=1000):
+    """Opakuje func, dokud nevyčerpá budget sekund (alespoň min_runs)"""
+    latencies = []
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    while len(latencies) < max_runs and (len(latencies) < min_runs or time.perf_counter() - wall_start < budget):
+        t0 = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    latencies.sort()
+    return {
+        'scenario': name,
+        'interfaces': interfaces,
+        'runs': len(latencies),
+        'ops_per_sec': len(latencies) / wall,
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'cpu_ms_per_op': cpu / len(latencies) * 1000,
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run_size(interfaces, args):
+    """Všechny scénáře pro jednu velikost tabulky"""
+    proc, port = start_agent_process(interfaces, args.latency, args.loss)
+    session = SnmpSession()
+    target = SnmpTarget('127.0.0.1', port=port, timeout=args.timeout)
+    indices = [str(idx) for idx in range(1, interfaces + 1)]
+    cache = InterfaceCache(tempfile.mkdtemp(prefix='snmpmon-bench-'))
+    client = session.client
+    # Na velkých tabulkách je walk po jednom OID velmi pomalý - stačí jeden běh
+    heavy = 1 if interfaces >= 5000 else 3
+
+    try:
+        session.get(target, [OID['sysUpTime']])  # Zahřátí (engine, transport)
+        session.call(fetch_interfaces(client, target, cache))  # Naplní cache pro discovery_cached
+        return [
+            measure('get', interfaces, lambda: session.get(target, [OID['sysUpTime']]), args.budget),
+            measure('walk_ifDescr', interfaces, lambda: session.walk(target, OID['ifDescr']),
+                    args.budget, min_runs=heavy),
+            measure('discovery', interfaces, lambda: session.call(fetch_interfaces(client, target)),
+                    args.budget, min_runs=heavy),
+            measure('discovery_cached', interfaces, lambda: session.call(fetch_interfaces(client, target, cache)),
+                    args.budget),
+            measure('poll', interfaces, lambda: session.call(fetch_stats(client, target, indices)),
+                    args.budget, min_runs=heavy),
+        ]
+    finally:
+        session.close()
+        proc.terminate()
+        proc.wait()
+
+
+def compare(results, baseline, threshold):
+    """Scénáře, jejichž p50 se zhoršilo o víc než threshold (podíl)"""
+    previous = {(r['scenario'], r['interfaces']): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        old = previous.get((result['scenario'], result['interfaces']))
+        if old and result['p50_ms'] > old['p50_ms'] * (1 + threshold):
+            regressions.append({
+                'scenario': result['scenario'],
+                'interfaces': result['interfaces'],
+                'baseline_p50_ms': old['p50_ms'],
+                'p50_ms': result['p50_ms'],
+            })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark discovery a pollingu proti simulovanému agentovi")
+    parser.add_argument('--sizes', default='10,1000,10000', help="počty rozhraní oddělené čárkou")
+    parser.add_argument('--latency', type=float, default=0.0, help="zpoždění odpovědi agenta v sekundách")
+    parser.add_argument('--loss', type=float, default=0.0, help="podíl zahozených požadavků 0..1")
+    parser.add_argument('--timeout', type=float, default=1.0, help="SNMP timeout klienta")
+    parser.add_argument('--budget', type=float, default=3.0, help="čas na jeden scénář v sekundách")
+    parser.add_argument('--output', help="soubor pro JSON výsledky (výchozí stdout)")
+    parser.add_argument('--baseline', help="JSON předchozího běhu pro porovnání")
+    parser.add_argument('--threshold', type=float, default=0.2, help="povolené zhoršení p50 (podíl)")
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(',')):
+        results += run_size(size, args)
+
+    from pysnmp import __version__ as pysnmp_version
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'pysnmp': pysnmp_version,
+            'platform': platform.platform(),
+            'latency': args.latency,
+            'loss': args.loss,
+        },
+        'results': results,
+    }
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            report['regressions'] = compare(results, json.load(f), args.threshold)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if report.get('regressions'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
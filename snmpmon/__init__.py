@@ -0,0 +1,52 @@
+"""
+SNMP monitorovací jádro
+Sdílené části pro GUI i další nástroje (bez závislosti na tkinter)
+
+Podmoduly se načítají až při prvním přístupu ke jménu (PEP 562), takže
+import snmpmon nenačte pysnmp ani numpy.
+"""
+
+import importlib
+
+# Veřejné jméno -> podmodul, ve kterém je definované
+_EXPORTS = {
+    'AdaptivePolicy': 'adaptive',
+    'ArchivePolicy': 'archive',
+    'ArchiveReader': 'archive',
+    'ArchiveWriter': 'archive',
+    'AsyncPoller': 'poller',
+    'DDSketch': 'sketch',
+    'HistoryStore': 'history',
+    'MetricsCache': 'exporter',
+    'MetricsExporter': 'exporter',
+    'PollPolicy': 'poller',
+    'PortMonitor': 'monitor',
+    'PortRates': 'counters',
+    'PortStats': 'counters',
+    'PortTracker': 'counters',
+    'Response': 'target',
+    'Sample': 'counters',
+    'ShardedPoller': 'shard',
+    'SnmpClient': 'session',
+    'SnmpError': 'target',
+    'SnmpSession': 'session',
+    'SnmpTarget': 'target',
+    'SnmpTimeout': 'target',
+    'StreamStats': 'sketch',
+    'TopTalkers': 'talkers',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,145 @@
+"""
+Adaptivní intervaly pollingu
+Interval každého portu se řídí jeho aktivitou (změna rychlosti, vytížení
+linky, idle/down) a celková zátěž zařízení se drží pod rozpočtem požadavků/s.
+"""
+
+import asyncio
+from dataclasses import dataclass
+
+
+@dataclass
+class AdaptivePolicy:
+    """Pravidla adaptivních intervalů"""
+    min_interval: float = 1.0         # Nejkratší interval portu (s)
+    max_interval: float = 60.0        # Nejdelší interval (idle a down porty)
+    busy_utilization: float = 0.7     # Vytížení linky, od kterého se polluje nejrychleji
+    change_threshold: float = 0.25    # Relativní změna rychlosti, která interval zkrátí
+    idle_rate: float = 1000.0         # Pod touto rychlostí (B/s) je port idle
+    backoff: float = 1.5              # Násobek intervalu při stabilním provozu
+    budget_rps: float = 20.0          # Max SNMP požadavků (PDU)/s na zařízení
+    budget_burst: float = 1.0         # PDU, která smí odejít naráz (kapacita TokenBucket)
+    ports_per_request: int = 10       # Portů v jednom požadavku (pro výpočet rozpočtu)
+
+
+class TokenBucket:
+    """Rozpočet PDU jednoho zařízení
+
+    Každé PDU (včetně opakování, stránek GETBULK a rozdělení po tooBig)
+    spotřebuje jeden token, tokeny přibývají rychlostí rate za sekundu až do
+    burst. V libovolném okně T sekund tak odejde nejvýš burst + rate * T PDU.
+    """
+
+    def __init__(self, rate, burst=1.0, now=None):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+        self.waited = 0.0  # Celkové čekání na rozpočet (s)
+
+    def reserve(self, now):
+        """Spotřebuje token, vrací sekundy, které je před odesláním PDU potřeba počkat"""
+        if self.updated is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        self.waited += delay
+        return delay
+
+    async def acquire(self):
+        delay = self.reserve(asyncio.get_running_loop().time())
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class PortSchedule:
+    """Plán jednoho portu"""
+
+    __slots__ = ('interval', 'next_due', 'prev_rate', 'speed', 'oper')
+
+    def __init__(self, interval, next_due):
+        self.interval = interval
+        self.next_due = next_due
+        self.prev_rate = None
+        self.speed = 0    # ifHighSpeed v Mb/s (0 = neznámá)
+        self.oper = '1'   # ifOperStatus
+
+
+class AdaptiveScheduler:
+    """Plánovač portů jednoho zařízení
+
+    Každý port má vlastní interval mezi policy.min_interval a max_interval:
+    down porty (ifOperStatus != 1) a idle porty se odsouvají na maximum,
+    porty blízko rychlosti linky běží na minimu, změna rychlosti interval
+    zkrátí na polovinu a stabilní provoz ho postupně prodlužuje zpět k
+    base_interval. Pokud by odhad požadavků překročil budget_rps, všechny
+    intervaly se úměrně prodlouží (scale). Odhad jen rozkládá zátěž;
+    skutečná PDU drží v rozpočtu TokenBucket zařízení (SnmpClient.budgets).
+    """
+
+    def __init__(self, ports, base_interval, policy, now):
+        self.policy = policy
+        self.base_interval = base_interval
+        self.ports = {idx: PortSchedule(base_interval, now) for idx in ports}
+        self._demand = len(self.ports) / base_interval  # Σ 1/interval
+        self.scale = 1.0
+        self._update_scale()
+
+    def _update_scale(self):
+        requests_per_sec = self._demand / self.policy.ports_per_request
+        self.scale = max(1.0, requests_per_sec / self.policy.budget_rps)
+
+    def set_speed(self, idx, speed):
+        self.ports[idx].speed = speed
+
+    def intervals(self):
+        """Skutečně použité intervaly portů (včetně škálování rozpočtem)"""
+        return {idx: port.interval * self.scale for idx, port in self.ports.items()}
+
+    def next_wakeup(self):
+        return min(port.next_due for port in self.ports.values())
+
+    def due(self, now):
+        """Porty, které jsou na řadě; přibere i porty splatné do min_interval/2 (méně PDU)"""
+        horizon = now + self.policy.min_interval / 2
+        return [idx for idx, port in self.ports.items() if port.next_due <= horizon]
+
+    def _set_interval(self, port, interval):
+        policy = self.policy
+        interval = min(policy.max_interval, max(policy.min_interval, interval))
+        self._demand += 1 / interval - 1 / port.interval
+        port.interval = interval
+
+    def update(self, idx, rates, oper, now):
+        """Zapíše měření portu a naplánuje další (rates None = bez rychlosti)"""
+        policy = self.policy
+        port = self.ports[idx]
+        port.oper = oper or port.oper
+
+        if port.oper != '1':
+            interval = policy.max_interval
+        elif rates is None:
+            interval = port.interval
+        else:
+            rate = max(rates.in_rate, rates.out_rate)
+            line_rate = port.speed * 1e6 / 8
+            prev, port.prev_rate = port.prev_rate, rate
+            if line_rate and rate >= policy.busy_utilization * line_rate:
+                interval = policy.min_interval
+            elif prev is not None and abs(rate - prev) > policy.change_threshold * max(prev, policy.idle_rate):
+                interval = port.interval / 2
+            elif rate < policy.idle_rate:
+                interval = port.interval * policy.backoff
+            else:
+                # Stabilní provoz - zpět k základnímu intervalu (shora i zdola)
+                interval = min(port.interval * policy.backoff, max(self.base_interval, port.interval / policy.backoff))
+
+        self._set_interval(port, interval)
+        self._update_scale()
+        port.next_due = now + port.interval * self.scale
+
+    def postpone(self, idx, now):
+        """Po neúspěšném pollu zkusí port znovu za jeho běžný interval"""
+        port = self.ports[idx]
+        port.next_due = now + port.interval * self.scale
@@ -0,0 +1,289 @@
+"""
+Archiv měření na disku
+Append-only soubory se záznamy pevné délky, jeden soubor na zařízení, port a den (UTC):
+
+    <root>/<zařízení>/<ifIndex>/<YYYY-MM-DD>.bin      jednotlivá měření
+    <root>/<zařízení>/<ifIndex>/<YYYY-MM-DD>.60s.bin  po kompakci (agregované záznamy)
+
+Zápis běží po dávkách v samostatném vlákně, čtení přes mmap.
+"""
+
+import mmap
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+# Pořadí polí záznamu (čas, countery, sysUpTime, rychlosti, interval)
+FIELDS = (
+    'timestamp',
+    'in_octets', 'out_octets', 'in_packets', 'out_packets', 'in_errors', 'out_errors',
+    'uptime',
+    'in_rate', 'out_rate', 'in_pps', 'out_pps', 'interval',
+)
+RECORD = struct.Struct('<d6QI5f')  # 80 B
+HEADER = struct.Struct('<8sI4x')   # magic, délka záznamu
+MAGIC = b'SNMPARC1'
+
+
+@dataclass
+class ArchivePolicy:
+    """Retence a kompakce archivu"""
+    retention_days: int = 30       # Starší dny se mažou (0 = nemazat)
+    compact_after_days: int = 7    # Starší dny se agregují (0 = nekompaktovat)
+    compact_resolution: int = 60   # Rozlišení agregovaných záznamů (s)
+    maintain_interval: float = 3600.0  # Jak často writer spouští údržbu (s)
+
+
+def segment_date(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%d')
+
+
+def pack_sample(sample):
+    """Sample -> záznam archivu (první měření bez rychlostí má interval 0)"""
+    stats, rates = sample.stats, sample.rates
+    if rates is None:
+        rate_values = (0.0, 0.0, 0.0, 0.0, 0.0)
+    else:
+        rate_values = (rates.in_rate, rates.out_rate, rates.in_pps, rates.out_pps, rates.interval)
+    return RECORD.pack(
+        sample.timestamp,
+        stats.in_octets, stats.out_octets, stats.in_packets, stats.out_packets,
+        stats.in_errors, stats.out_errors, stats.uptime,
+        *rate_values,
+    )
+
+
+def append_records(path, data):
+    """Připojí záznamy na konec segmentu (nový segment dostane hlavičku)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'ab') as f:
+        if f.tell() == 0:
+            f.write(HEADER.pack(MAGIC, RECORD.size))
+        f.write(data)
+
+
+class ArchiveWriter:
+    """Zapisuje Sample do archivu mimo vlákno pollingu
+
+    add() jen zařadí vzorek do fronty; vlákno writeru každých flush_interval
+    sekund zapíše frontu po dávkách (jeden zápis na segment) a jednou za
+    policy.maintain_interval spustí retenci a kompakci. Chyby zápisu
+    a údržby (plný disk, práva, poškozený segment) vlákno neukončí - předají
+    se on_error(výjimka) (výchozí výpis na stderr) a dávka segmentu se zahodí.
+    """
+
+    def __init__(self, root, policy=None, flush_interval=5.0, on_error=None):
+        self.root = root
+        self.policy = policy or ArchivePolicy()
+        self.flush_interval = flush_interval
+        self.on_error = on_error or (lambda e: print(f"Archiv: {e}", file=sys.stderr))
+        self.written = 0
+        self.dropped = 0  # Záznamy zahozené kvůli chybě zápisu
+        self.errors = 0
+        self._queue = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def add(self, sample, device):
+        self._queue.put((device, sample))
+
+    def close(self):
+        """Zapíše zbytek fronty a ukončí vlákno"""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        last_maintain = 0.0
+        while True:
+            stopping = self._stop.wait(self.flush_interval)
+            self._flush()
+            if time.monotonic() - last_maintain >= self.policy.maintain_interval:
+                try:
+                    maintain(self.root, self.policy, on_error=self._error)
+                except Exception as e:
+                    self._error(e)
+                last_maintain = time.monotonic()
+            if stopping:
+                return
+
+    def _error(self, e):
+        self.errors += 1
+        try:
+            self.on_error(e)
+        except Exception:
+            pass  # Chyba hlášení nesmí ukončit vlákno writeru
+
+    def _flush(self):
+        batches = defaultdict(list)
+        try:
+            while True:
+                device, sample = self._queue.get_nowait()
+                path = os.path.join(
+                    self.root, device, str(sample.ifindex), f"{segment_date(sample.timestamp)}.bin"
+                )
+                batches[path].append(pack_sample(sample))
+        except queue.Empty:
+            pass
+
+        for path, records in batches.items():
+            try:
+                append_records(path, b''.join(records))
+            except Exception as e:
+                self.dropped += len(records)
+                self._error(e)
+            else:
+                self.written += len(records)
+
+
+class ArchiveReader:
+    """Čtení archivu přes mmap"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _list(self, *parts):
+        path = os.path.join(self.root, *parts)
+        return sorted(os.listdir(path)) if os.path.isdir(path) else []
+
+    def devices(self):
+        return self._list()
+
+    def interfaces(self, device):
+        return self._list(device)
+
+    def segments(self, device, ifindex, start=None, end=None):
+        """Cesty segmentů, které mohou obsahovat záznamy start <= čas < end"""
+        first = segment_date(start) if start is not None else None
+        last = segment_date(end) if end is not None else None
+        paths = []
+        for name in self._list(device, str(ifindex)):
+            date = name[:10]
+            if name.endswith('.bin') and (first is None or date >= first) and (last is None or date <= last):
+                paths.append(os.path.join(self.root, device, str(ifindex), name))
+        return paths
+
+    def scan(self, device, ifindex, start=None, end=None):
+        """Iterátor záznamů (tuple v pořadí FIELDS) se start <= čas < end"""
+        for path in self.segments(device, ifindex, start, end):
+            yield from scan_segment(path, start, end)
+
+
+def _bisect(mm, count, timestamp):
+    """Index prvního záznamu s časem >= timestamp (záznamy jsou seřazené podle času)"""
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if RECORD.unpack_from(mm, HEADER.size + mid * RECORD.size)[0] < timestamp:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def scan_segment(path, start=None, end=None):
+    """Záznamy jednoho segmentu přes mmap (bez načtení celého souboru)"""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= HEADER.size:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, record_size = HEADER.unpack_from(mm)
+            if magic != MAGIC or record_size != RECORD.size:
+                raise ValueError(f"{path}: neznámý formát archivu")
+            count = (size - HEADER.size) // RECORD.size
+            first = _bisect(mm, count, start) if start is not None else 0
+            last = _bisect(mm, count, end) if end is not None else count
+            view = memoryview(mm)[HEADER.size + first * RECORD.size:HEADER.size + last * RECORD.size]
+            try:
+                yield from RECORD.iter_unpack(view)
+            finally:
+                view.release()
+
+
+def compact_segment(path, resolution):
+    """Přepíše segment na agregované záznamy po resolution sekundách
+
+    Záznam bucketu nese countery a uptime posledního měření, rychlosti jsou
+    průměrem vážený intervaly a interval je jejich součtem. Už existující
+    agregovaný segment téhož dne se sloučí (jeho záznamy vstoupí do agregace
+    se svým intervalem jako váhou).
+    """
+    target = f"{path[:-len('.bin')]}.{resolution}s.bin"
+    records = list(scan_segment(path))
+    if os.path.exists(target):
+        records += scan_segment(target)
+        records.sort(key=lambda record: record[0])
+
+    out = []
+    bucket = None
+    last = None
+    sums = [0.0] * 5  # Σ rate * interval (4x), Σ interval
+
+    def emit():
+        interval = sums[4]
+        rates = [s / interval if interval else 0.0 for s in sums[:4]]
+        out.append(RECORD.pack(*last[:8], *rates, interval))
+
+    for record in records:
+        current = int(record[0] // resolution)
+        if bucket is not None and current != bucket:
+            emit()
+            sums = [0.0] * 5
+        bucket, last = current, record
+        interval = record[12]
+        for i in range(4):
+            sums[i] += record[8 + i] * interval
+        sums[4] += interval
+    if last is not None:
+        emit()
+
+    tmp = target + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, RECORD.size))
+        f.write(b''.join(out))
+    os.replace(tmp, target)
+    os.remove(path)
+
+
+def maintain(root, policy, now=None, on_error=None):
+    """Retence (mazání starých dnů) a kompakce starších segmentů celého archivu
+
+    S on_error se chyba jednoho segmentu předá on_error(výjimka) a údržba
+    pokračuje dalšími segmenty, jinak se vyhodí.
+    """
+    if not os.path.isdir(root):
+        return
+    today = datetime.fromtimestamp(now if now is not None else time.time(), timezone.utc).date()
+    for device in os.listdir(root):
+        if not os.path.isdir(os.path.join(root, device)):
+            continue
+        for ifindex in os.listdir(os.path.join(root, device)):
+            directory = os.path.join(root, device, ifindex)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                if not name.endswith('.bin'):
+                    continue
+                try:
+                    age = (today - datetime.strptime(name[:10], '%Y-%m-%d').date()).days
+                except ValueError:
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    if policy.retention_days and age > policy.retention_days:
+                        os.remove(path)
+                    elif policy.compact_after_days and age > policy.compact_after_days and name.count('.') == 1:
+                        compact_segment(path, policy.compact_resolution)
+                except (OSError, ValueError) as e:
+                    if on_error is None:
+                        raise
+                    on_error(e)
+            if not os.listdir(directory):
+                os.rmdir(directory)
@@ -0,0 +1,258 @@
+"""
+Headless CLI - vzorky portů jako JSON lines nebo CSV na stdout
+
+    python -m snmpmon --host 192.168.1.1 --ports 1,2 --interval 2
+    python -m snmpmon --host 192.168.1.1 --version v3 --user monitor --auth-key ... --priv-key ...
+    python -m snmpmon --host 192.168.1.1 --top 10 --interval 5
+    python -m snmpmon --inventory devices.json --format csv
+    python -m snmpmon --inventory devices.json --format none --metrics-port 9116
+    python -m snmpmon --inventory devices.json --workers 8
+    python -m snmpmon --host 192.168.1.1 --ports 1,2 --record incident.rec.gz
+    python -m snmpmon --host 192.168.1.1 --ports 1,2 --replay incident.rec.gz --speed 0
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import sys
+import threading
+
+from .adaptive import AdaptivePolicy
+from .archive import ArchivePolicy, ArchiveWriter
+from .exporter import MetricsCache, MetricsExporter
+from .monitor import PortMonitor, discover_ports
+from .poller import AsyncPoller, PollPolicy, load_inventory
+from .replay import Recorder, ReplayClient
+from .session import SnmpClient, SnmpSession
+from .shard import ShardedPoller
+from .talkers import TopTalkers
+from .target import SnmpTarget
+from .usm import AUTH_PROTOCOLS, PRIV_PROTOCOLS, EngineCache
+
+# Sloupce výstupu (pořadí v CSV)
+FIELDS = (
+    'timestamp', 'host', 'ifindex',
+    'in_octets', 'out_octets', 'in_packets', 'out_packets', 'in_errors', 'out_errors',
+    'in_rate', 'out_rate', 'in_pps', 'out_pps', 'interval',
+)
+
+
+class SampleWriter:
+    """Zapisuje Sample jako JSON lines nebo CSV (rychlosti v B/s a pkt/s), 'none' nic"""
+
+    def __init__(self, stream, fmt='jsonl'):
+        self.stream = stream
+        self.fmt = fmt
+        self._csv = None
+        if fmt == 'csv':
+            self._csv = csv.writer(stream)
+            self._csv.writerow(FIELDS)
+
+    def write(self, sample):
+        if sample.rates is None or self.fmt == 'none':
+            return  # První měření nemá rychlost
+        stats, rates = sample.stats, sample.rates
+        row = (
+            round(sample.timestamp, 3), sample.host, sample.ifindex,
+            stats.in_octets, stats.out_octets, stats.in_packets, stats.out_packets,
+            stats.in_errors, stats.out_errors,
+            round(rates.in_rate, 3), round(rates.out_rate, 3),
+            round(rates.in_pps, 3), round(rates.out_pps, 3), round(rates.interval, 3),
+        )
+        if self._csv is not None:
+            self._csv.writerow(row)
+        else:
+            self.stream.write(json.dumps(dict(zip(FIELDS, row))) + '\n')
+
+    def flush(self):
+        self.stream.flush()
+
+
+def open_archive(args):
+    if not args.archive:
+        return None
+    return ArchiveWriter(args.archive, ArchivePolicy(args.retention_days, args.compact_after_days))
+
+
+def run_host(args, writer, archive=None, cache=None, recorder=None):
+    """Jedno zařízení - stejné jádro jako GUI (PortMonitor)"""
+    if args.replay:
+        session = SnmpSession(client=ReplayClient(args.replay, args.speed))
+    else:
+        session = SnmpSession(EngineCache(args.engine_cache))
+    session.client.recorder = recorder
+    target = SnmpTarget(
+        args.host, args.community, args.version, args.port,
+        user=args.user, auth_protocol=args.auth_protocol, auth_key=args.auth_key,
+        priv_protocol=args.priv_protocol, priv_key=args.priv_key, context=args.context,
+    )
+    if args.top:
+        monitor = TopTalkers(session, target, args.top, args.interval)
+    else:
+        indices = args.ports.split(',') if args.ports else discover_ports(session, target)
+        monitor = PortMonitor(session, target, indices, args.interval, archive=archive)
+
+    stop = threading.Event()
+    if args.duration:
+        timer = threading.Timer(args.duration, stop.set)
+        timer.daemon = True
+        timer.start()
+
+    def on_poll(samples, total):
+        for sample in samples:
+            writer.write(sample)
+            if cache is not None:
+                cache.update(sample)
+        writer.flush()
+
+    def on_top(ranking, timestamp):
+        if args.format == 'none':
+            return
+        record = {'timestamp': round(timestamp, 3), 'host': target.host, 'ports': monitor.ports}
+        for metric, entries in ranking.items():
+            record[metric] = [{'ifindex': idx, 'rate': round(rate, 3)} for rate, idx in entries]
+        print(json.dumps(record), flush=True)
+
+    def on_error(e):
+        print(f"Chyba: {e}", file=sys.stderr)
+
+    try:
+        monitor.run(on_top if args.top else on_poll, stop, on_error, paced=not args.replay)
+    finally:
+        stop.set()
+        session.close()
+        print(f"Vynechaných cyklů: {monitor.missed}", file=sys.stderr)
+        if args.replay:
+            print(f"Přehráno odpovědí: {session.client.replayed}", file=sys.stderr)
+        if args.stats:
+            print(json.dumps(session.client.stats.snapshot(), indent=2), file=sys.stderr)
+
+
+def run_inventory(args, writer, archive=None, cache=None, recorder=None):
+    """Více zařízení podle inventáře - AsyncPoller"""
+    devices = load_inventory(args.inventory)
+    policy = PollPolicy(max_inflight=args.max_inflight, max_inflight_device=args.max_inflight_device)
+    if args.adaptive:
+        policy.adaptive = AdaptivePolicy(
+            min_interval=args.min_interval, max_interval=args.max_interval, budget_rps=args.budget_rps
+        )
+
+    def on_sample(sample):
+        writer.write(sample)
+        if cache is not None:
+            cache.update(sample)
+
+    if args.workers:
+        poller = ShardedPoller(devices, on_sample, policy, args.workers, archive, args.engine_cache)
+
+        def run():
+            stop = threading.Event()
+            if args.duration:
+                timer = threading.Timer(args.duration, stop.set)
+                timer.daemon = True
+                timer.start()
+            poller.run(stop)
+    else:
+        client = SnmpClient(engines=EngineCache(args.engine_cache))
+        client.recorder = recorder
+        poller = AsyncPoller(devices, on_sample, policy, client, archive=archive)
+
+        def run():
+            async def main():
+                stop = asyncio.Event()
+                if args.duration:
+                    asyncio.get_running_loop().call_later(args.duration, stop.set)
+                await poller.run(stop)
+
+            asyncio.run(main())
+
+    try:
+        run()
+    finally:
+        writer.flush()
+        print(f"Vzorků: {poller.samples}, požadavků: {poller.requests}, timeoutů: {poller.timeouts}, "
+              f"chyb: {poller.errors}, opakování: {poller.retries}, vynechaných cyklů: {poller.missed}",
+              file=sys.stderr)
+        if args.workers:
+            print(f"Workerů: {len(poller.workers)}, restartů: {poller.restarts}", file=sys.stderr)
+        elif args.stats:
+            print(json.dumps(poller.client.stats.snapshot(), indent=2), file=sys.stderr)
+            intervals = {f"{host}:{port}": scheduler.intervals() for (host, port), scheduler in poller.schedulers.items()}
+            if intervals:
+                print(json.dumps({'intervals': intervals}, indent=2), file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m snmpmon", description=__doc__.strip().splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--host', help="IP switche")
+    source.add_argument('--inventory', help="JSON inventář zařízení a portů")
+    parser.add_argument('--community', default='public')
+    parser.add_argument('--version', choices=['v1', 'v2c', 'v3'], default='v2c')
+    parser.add_argument('--user', default='', help="SNMPv3 USM uživatel")
+    parser.add_argument('--auth-protocol', choices=list(AUTH_PROTOCOLS), default='SHA')
+    parser.add_argument('--auth-key', default='', help="SNMPv3 heslo autentizace (prázdné = noAuthNoPriv)")
+    parser.add_argument('--priv-protocol', choices=list(PRIV_PROTOCOLS), default='AES')
+    parser.add_argument('--priv-key', default='', help="SNMPv3 heslo šifrování (prázdné = authNoPriv)")
+    parser.add_argument('--context', default='', help="SNMPv3 context name")
+    parser.add_argument('--engine-cache', help="adresář cache engine ID SNMPv3 agentů (výchozí jen v paměti)")
+    parser.add_argument('--port', type=int, default=161, help="UDP port agenta")
+    parser.add_argument('--ports', help="ifIndexy oddělené čárkou (výchozí: všechny porty)")
+    parser.add_argument('--interval', type=float, default=2.0, help="interval měření v sekundách")
+    parser.add_argument('--duration', type=float, default=0, help="doba běhu v sekundách (0 = do Ctrl+C)")
+    parser.add_argument('--format', choices=['jsonl', 'csv', 'none'], default='jsonl')
+    parser.add_argument('--top', type=int, default=0,
+                        help="žebříček top N portů celého switche podle RX/TX/chyb (jen --host, JSON lines)")
+    parser.add_argument('--max-inflight', type=int, default=PollPolicy.max_inflight)
+    parser.add_argument('--max-inflight-device', type=int, default=PollPolicy.max_inflight_device)
+    parser.add_argument('--workers', type=int, default=0,
+                        help="počet procesů pollingu (jen --inventory, 0 = jeden proces)")
+    parser.add_argument('--adaptive', action='store_true', help="adaptivní intervaly portů (jen --inventory)")
+    parser.add_argument('--min-interval', type=float, default=AdaptivePolicy.min_interval)
+    parser.add_argument('--max-interval', type=float, default=AdaptivePolicy.max_interval)
+    parser.add_argument('--budget-rps', type=float, default=AdaptivePolicy.budget_rps,
+                        help="max SNMP PDU/s na zařízení v adaptivním režimu (včetně opakování)")
+    parser.add_argument('--archive', help="adresář archivu měření na disku")
+    parser.add_argument('--retention-days', type=int, default=ArchivePolicy.retention_days)
+    parser.add_argument('--compact-after-days', type=int, default=ArchivePolicy.compact_after_days)
+    parser.add_argument('--stats', action='store_true', help="na konci vypsat statistiky SNMP klienta (JSON)")
+    parser.add_argument('--metrics-port', type=int, default=0, help="port HTTP /metrics (OpenMetrics, 0 = vypnuto)")
+    parser.add_argument('--metrics-host', default='', help="adresa HTTP /metrics (výchozí: všechny)")
+    parser.add_argument('--record', help="zapisovat SNMP odpovědi do záznamu (gzip, pro --replay)")
+    parser.add_argument('--replay', help="přehrát záznam místo dotazů na síť (jen --host)")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="rychlost přehrávání (1 = reálný čas, 0 = co nejrychleji)")
+    args = parser.parse_args(argv)
+    if args.replay and args.inventory:
+        parser.error("--replay funguje jen s --host")
+    if args.host and (args.adaptive or args.workers or args.budget_rps != AdaptivePolicy.budget_rps):
+        parser.error("--adaptive, --workers a --budget-rps fungují jen s --inventory")
+    if args.record and args.workers:
+        parser.error("--record nelze kombinovat s --workers")
+
+    writer = SampleWriter(sys.stdout, args.format)
+    archive = open_archive(args)
+    recorder = Recorder(args.record) if args.record else None
+    cache = exporter = None
+    if args.metrics_port:
+        cache = MetricsCache()
+        exporter = MetricsExporter(cache, args.metrics_host, args.metrics_port).start()
+    try:
+        if args.inventory:
+            run_inventory(args, writer, archive, cache, recorder)
+        else:
+            run_host(args, writer, archive, cache, recorder)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if exporter is not None:
+            exporter.close()
+        if archive is not None:
+            archive.close()
+        if recorder is not None:
+            recorder.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+"""
+IF-MIB countery portů a výpočet rychlostí
+"""
+
+from dataclasses import dataclass
+
+from .sketch import StreamStats
+from .target import Response
+
+# SNMP OID konstanty
+OID = {
+    'sysDescr': '1.3.6.1.2.1.1.1.0',
+    'sysObjectID': '1.3.6.1.2.1.1.2.0',
+    'sysUpTime': '1.3.6.1.2.1.1.3.0',
+    'ifNumber': '1.3.6.1.2.1.2.1.0',
+    'ifTableLastChange': '1.3.6.1.2.1.31.1.5.0',
+    'ifDescr': '1.3.6.1.2.1.2.2.1.2',
+    'ifAlias': '1.3.6.1.2.1.31.1.1.1.18',
+    'ifHighSpeed': '1.3.6.1.2.1.31.1.1.1.15',
+    'ifCounterDiscontinuityTime': '1.3.6.1.2.1.31.1.1.1.19',
+    'ifAdminStatus': '1.3.6.1.2.1.2.2.1.7',
+    'ifOperStatus': '1.3.6.1.2.1.2.2.1.8',
+    'ifLastChange': '1.3.6.1.2.1.2.2.1.9',
+    # High-capacity 64-bit countery (ifXTable)
+    'ifHCInOctets': '1.3.6.1.2.1.31.1.1.1.6',
+    'ifHCOutOctets': '1.3.6.1.2.1.31.1.1.1.10',
+    'ifHCInUcastPkts': '1.3.6.1.2.1.31.1.1.1.7',
+    'ifHCOutUcastPkts': '1.3.6.1.2.1.31.1.1.1.11',
+    # Standardní countery pro errors (nemají HC verzi)
+    'ifInErrors': '1.3.6.1.2.1.2.2.1.14',
+    'ifOutErrors': '1.3.6.1.2.1.2.2.1.20',
+    # 32-bit countery ifTable (SNMPv1 nepřenese Counter64)
+    'ifInOctets': '1.3.6.1.2.1.2.2.1.10',
+    'ifInUcastPkts': '1.3.6.1.2.1.2.2.1.11',
+    'ifOutOctets': '1.3.6.1.2.1.2.2.1.16',
+    'ifOutUcastPkts': '1.3.6.1.2.1.2.2.1.17',
+}
+
+
+@dataclass
+class PortStats:
+    """Čítače portu získané jedním SNMP GET"""
+    in_octets: int = 0
+    out_octets: int = 0
+    in_packets: int = 0
+    out_packets: int = 0
+    in_errors: int = 0
+    out_errors: int = 0
+    uptime: int = 0  # sysUpTime agenta v setinách sekundy
+    discontinuity: int = 0  # ifCounterDiscontinuityTime (sysUpTime poslední diskontinuity čítačů)
+
+    def __add__(self, other):
+        """Součet čítačů (souhrn více portů), uptime zůstává"""
+        summed = PortStats(uptime=self.uptime or other.uptime)
+        for field, _ in STATS_FIELDS:
+            setattr(summed, field, getattr(self, field) + getattr(other, field))
+        return summed
+
+
+@dataclass
+class PortRates:
+    """Rychlosti portu mezi dvěma měřeními"""
+    in_rate: float = 0.0   # B/s
+    out_rate: float = 0.0  # B/s
+    in_pps: float = 0.0
+    out_pps: float = 0.0
+    interval: float = 0.0  # Skutečný interval mezi měřeními v sekundách
+
+
+@dataclass
+class Sample:
+    """Jedno měření portu"""
+    host: str
+    ifindex: str
+    timestamp: float  # time.time() přijetí odpovědi
+    stats: PortStats
+    rates: PortRates = None  # U prvního měření None
+    port: int = 161  # UDP port agenta (více agentů na jedné adrese)
+
+
+# Pole PortStats -> klíč OID (pořadí varbindů v dávkovém GET)
+STATS_FIELDS = (
+    ('in_octets', 'ifHCInOctets'),
+    ('out_octets', 'ifHCOutOctets'),
+    ('in_packets', 'ifHCInUcastPkts'),
+    ('out_packets', 'ifHCOutUcastPkts'),
+    ('in_errors', 'ifInErrors'),
+    ('out_errors', 'ifOutErrors'),
+)
+
+# SNMPv1 nezná Counter64 - agent HC countery odmítne (noSuchName), čtou se 32bitové z ifTable
+STATS_FIELDS_V1 = (
+    ('in_octets', 'ifInOctets'),
+    ('out_octets', 'ifOutOctets'),
+    ('in_packets', 'ifInUcastPkts'),
+    ('out_packets', 'ifOutUcastPkts'),
+    ('in_errors', 'ifInErrors'),
+    ('out_errors', 'ifOutErrors'),
+)
+
+# Šířka čítačů v bitech podle STATS_FIELDS (HC countery z ifXTable jsou Counter64,
+# ifIn/OutErrors Counter32), u SNMPv1 jsou všechny Counter32
+COUNTER_BITS = (64, 64, 64, 64, 32, 32)
+COUNTER_MASKS = tuple((1 << bits) - 1 for bits in COUNTER_BITS)
+COUNTER_BITS_V1 = (32,) * len(STATS_FIELDS_V1)
+
+# Counter32, který klesl o víc než polovinu rozsahu, se bere jako reset, ne přetečení
+# (skutečné přetečení dává malý rozdíl). Counter64 za běhu prakticky nepřeteče,
+# jeho pokles je vždy reset.
+WRAP_LIMIT = 1 << 31
+
+
+def to_int(val):
+    """Převede hodnotu varbindu na int (chybějící hodnota = 0)"""
+    return int(val) if val and val.isdigit() else 0
+
+
+def stats_fields(version):
+    """Pole PortStats -> klíč OID pro verzi SNMP cíle"""
+    return STATS_FIELDS_V1 if version == 'v1' else STATS_FIELDS
+
+
+def stats_oids(indices, version='v2c'):
+    """OID pro dávkový GET: sysUpTime + countery a ifCounterDiscontinuityTime všech portů"""
+    fields = stats_fields(version)
+    oids = [OID['sysUpTime']]
+    for idx in indices:
+        oids += [f"{OID[key]}.{idx}" for _, key in fields]
+        oids.append(f"{OID['ifCounterDiscontinuityTime']}.{idx}")
+    return oids
+
+
+def parse_stats(values, indices, version='v2c'):
+    """Výsledek dávkového GET -> {ifIndex: PortStats}"""
+    fields = stats_fields(version)
+    uptime = to_int(values.get(OID['sysUpTime']))
+    result = {}
+    for idx in indices:
+        stats = PortStats(uptime=uptime)
+        for field, key in fields:
+            setattr(stats, field, to_int(values.get(f"{OID[key]}.{idx}")))
+        stats.discontinuity = to_int(values.get(f"{OID['ifCounterDiscontinuityTime']}.{idx}"))
+        result[idx] = stats
+    return result
+
+
+async def fetch_stats(client, target, indices):
+    """Načte countery všech portů jedním dávkovým GET (dělí se jen podle velikosti PDU)
+
+    Vrací Response {ifIndex: PortStats} s časem přijetí odpovědi (čas měření).
+    """
+    values = await client.get(target, stats_oids(indices, target.version))
+    return Response(parse_stats(values, indices, target.version), values.timestamp)
+
+
+def uptime_interval(prev_uptime, uptime, local):
+    """Interval mezi měřeními podle sysUpTime agenta (s), jinak lokální interval
+
+    sysUpTime přichází ve stejném PDU jako countery, takže neobsahuje jitter
+    sítě a plánování. Použije se jen pokud roste a od lokálního intervalu se
+    neliší o víc než polovinu (restart agenta, přetečení, hrubé hodiny agenta).
+    """
+    if prev_uptime and uptime > prev_uptime:
+        interval = (uptime - prev_uptime) / 100
+        if abs(interval - local) <= local / 2:
+            return interval
+    return local
+
+
+def counter_deltas(prev, cur, widths=COUNTER_BITS):
+    """Rozdíly řádku čítačů (pořadí STATS_FIELDS) modulo šířka čítače, None při resetu"""
+    deltas = []
+    for p, c, bits in zip(prev, cur, widths):
+        delta = (c - p) & ((1 << bits) - 1)
+        if c < p and (bits == 64 or delta >= WRAP_LIMIT):
+            return None
+        deltas.append(delta)
+    return deltas
+
+
+def stats_values(stats):
+    """Countery PortStats v pořadí STATS_FIELDS"""
+    return (stats.in_octets, stats.out_octets, stats.in_packets, stats.out_packets,
+            stats.in_errors, stats.out_errors)
+
+
+def stats_deltas(prev, stats):
+    """Rozdíly čítačů dvou měření, None při diskontinuitě
+
+    Diskontinuita je restart agenta (sysUpTime klesl), změna
+    ifCounterDiscontinuityTime nebo reset čítače.
+    """
+    if stats.uptime < prev.uptime or stats.discontinuity != prev.discontinuity:
+        return None
+    return counter_deltas(stats_values(prev), stats_values(stats))
+
+
+class PortTracker:
+    """Stav jednoho portu mezi měřeními: předchozí countery, min/max rychlostí
+    a průběžné statistiky (průměr, EWMA, p95/p99) v rx_stats/tx_stats"""
+
+    def __init__(self):
+        self.prev_stats = None
+        self.prev_time = None
+        self.rates = None
+        self.rx_min = float('inf')
+        self.rx_max = 0
+        self.tx_min = float('inf')
+        self.tx_max = 0
+        self.rx_stats = StreamStats()
+        self.tx_stats = StreamStats()
+
+    def update(self, stats, now):
+        """Zapíše nové měření, vrátí PortRates (u prvního měření a po diskontinuitě None)
+
+        Počítá jeden port; dávky rozhraní počítá CounterBank a výsledek
+        zapisuje přes record().
+        """
+        rates = None
+        if self.prev_stats is not None and now > self.prev_time:
+            deltas = stats_deltas(self.prev_stats, stats)
+            if deltas is not None:
+                interval = uptime_interval(self.prev_stats.uptime, stats.uptime, now - self.prev_time)
+                rates = PortRates(deltas[0] / interval, deltas[1] / interval,
+                                  deltas[2] / interval, deltas[3] / interval, interval)
+        self.record(stats, now, rates)
+        return rates
+
+    def record(self, stats, now, rates):
+        """Zapíše měření s již spočtenou rychlostí a aktualizuje min/max a statistiky"""
+        if rates is not None:
+            # Statistiky včetně nul - idle čas patří do 95. percentilu
+            self.rx_stats.add(rates.in_rate, rates.interval, now)
+            self.tx_stats.add(rates.out_rate, rates.interval, now)
+
+            # Min/max - nulové hodnoty se ignorují
+            if rates.in_rate > 0:
+                self.rx_min = min(self.rx_min, rates.in_rate)
+                self.rx_max = max(self.rx_max, rates.in_rate)
+            if rates.out_rate > 0:
+                self.tx_min = min(self.tx_min, rates.out_rate)
+                self.tx_max = max(self.tx_max, rates.out_rate)
+
+        self.prev_stats = stats
+        self.prev_time = now
+        self.rates = rates
@@ -0,0 +1,244 @@
+"""
+Dávkový výpočet rozdílů čítačů a rychlostí
+Předchozí čítače všech rozhraní leží v souvislých polích (řádek = rozhraní,
+sloupce podle STATS_FIELDS). Rozdíly s korekcí přetečení 32/64bitových
+čítačů, detekce diskontinuity (restart agenta podle sysUpTime, změna
+ifCounterDiscontinuityTime, reset čítače) a rychlosti se počítají jedním
+krokem pro celou dávku - s numpy vektorově, bez něj stejným algoritmem
+ve smyčce nad array.
+"""
+
+from array import array
+
+from .counters import (
+    COUNTER_BITS, COUNTER_BITS_V1, COUNTER_MASKS, STATS_FIELDS, WRAP_LIMIT,
+    PortRates, counter_deltas, stats_values, uptime_interval,
+)
+
+# numpy je volitelná závislost - bez něj funguje vše, jen pomaleji. Importuje se
+# až s prvním CounterBank (~30 ms), ne při importu modulu.
+np = None
+_numpy_loaded = False
+
+
+def _load_numpy():
+    global np, _numpy_loaded
+    if not _numpy_loaded:
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        _numpy_loaded = True
+    return np
+
+
+WIDTH = len(STATS_FIELDS)
+
+
+def batch_counters(stats_list):
+    """PortStats dávky -> (ploché čítače, sysUpTime, ifCounterDiscontinuityTime) pro CounterBank.update"""
+    counters, uptime, discontinuity = [], [], []
+    for stats in stats_list:
+        counters += stats_values(stats)
+        uptime.append(stats.uptime)
+        discontinuity.append(stats.discontinuity)
+    return counters, uptime, discontinuity
+
+
+class BatchResult:
+    """Výsledek jedné dávky: rozdíly, intervaly, platnost a rychlosti po řádcích
+
+    Neplatný řádek (první měření, restart agenta, diskontinuita, reset
+    čítače) nemá rychlost - stejně jako první měření portu - a jeho rozdíly
+    jsou nulové.
+    """
+
+    __slots__ = ('deltas', 'intervals', 'valid', 'rates')
+
+    def __init__(self, deltas, intervals, valid, rates):
+        self.deltas = deltas        # n x WIDTH rozdílů čítačů
+        self.intervals = intervals  # n intervalů (s)
+        self.valid = valid          # n příznaků platnosti
+        self.rates = rates          # n x 4 rychlostí (oktety a pakety in/out za sekundu)
+
+    def __len__(self):
+        return len(self.valid)
+
+    def _lists(self):
+        if np is not None and isinstance(self.valid, np.ndarray):
+            return self.deltas.tolist(), self.intervals.tolist(), self.valid.tolist(), self.rates.tolist()
+        return self.deltas, self.intervals, self.valid, self.rates
+
+    def port_rates(self):
+        """Seznam PortRates (neplatné řádky None) a seznam rozdílů pro HistoryStore"""
+        deltas, intervals, valid, rates = self._lists()
+        port_rates = [
+            PortRates(*row, interval) if ok else None
+            for row, interval, ok in zip(rates, intervals, valid)
+        ]
+        return port_rates, deltas
+
+    def total(self):
+        """Součet platných řádků: (rozdíly, interval, PortRates) nebo None
+
+        Souhrn se sčítá z rozdílů portů, takže přetečení nebo reset jednoho
+        portu souhrn nezkreslí; interval je průměr intervalů platných řádků.
+        """
+        if np is not None and isinstance(self.valid, np.ndarray):
+            count = int(self.valid.sum())
+            if not count:
+                return None
+            deltas = self.deltas[self.valid].sum(axis=0, dtype=np.float64).tolist()
+            interval = float(self.intervals[self.valid].mean())
+        else:
+            rows = [(row, interval) for row, interval, ok in zip(self.deltas, self.intervals, self.valid) if ok]
+            if not rows:
+                return None
+            deltas = [float(sum(column)) for column in zip(*(row for row, _ in rows))]
+            interval = sum(interval for _, interval in rows) / len(rows)
+        rates = PortRates(
+            deltas[0] / interval, deltas[1] / interval, deltas[2] / interval, deltas[3] / interval, interval
+        )
+        return deltas, interval, rates
+
+
+class CounterBank:
+    """Předchozí čítače libovolného počtu rozhraní v souvislých polích
+
+    Rozhraní se adresují řádkem z rows(keys); update() přijme aktuální
+    čítače dávky řádků jako plochou sekvenci (řádek po řádku, sloupce podle
+    STATS_FIELDS), zapíše je jako předchozí a vrátí BatchResult. Řádky
+    z rows(keys, narrow=True) mají všechny čítače 32bitové (SNMPv1).
+    """
+
+    def __init__(self, capacity=256):
+        self.index = {}  # klíč -> řádek
+        self.capacity = 0
+        if _load_numpy() is not None:
+            self._counters = np.zeros((0, WIDTH), dtype=np.uint64)
+            self._uptime = np.zeros(0, dtype=np.int64)
+            self._discontinuity = np.zeros(0, dtype=np.int64)
+            self._time = np.zeros(0, dtype=np.float64)
+            self._seen = np.zeros(0, dtype=bool)
+            self._narrow = np.zeros(0, dtype=bool)
+        else:
+            self._counters = array('Q')
+            self._uptime = array('q')
+            self._discontinuity = array('q')
+            self._time = array('d')
+            self._seen = bytearray()
+            self._narrow = bytearray()
+        self._grow(capacity)
+
+    def __len__(self):
+        return len(self.index)
+
+    def _grow(self, capacity):
+        extra = capacity - self.capacity
+        if np is not None:
+            self._counters = np.concatenate([self._counters, np.zeros((extra, WIDTH), dtype=np.uint64)])
+            self._uptime = np.concatenate([self._uptime, np.zeros(extra, dtype=np.int64)])
+            self._discontinuity = np.concatenate([self._discontinuity, np.zeros(extra, dtype=np.int64)])
+            self._time = np.concatenate([self._time, np.zeros(extra, dtype=np.float64)])
+            self._seen = np.concatenate([self._seen, np.zeros(extra, dtype=bool)])
+            self._narrow = np.concatenate([self._narrow, np.zeros(extra, dtype=bool)])
+        else:
+            self._counters.extend([0] * (WIDTH * extra))
+            self._uptime.extend([0] * extra)
+            self._discontinuity.extend([0] * extra)
+            self._time.extend([0.0] * extra)
+            self._seen.extend(bytes(extra))
+            self._narrow.extend(bytes(extra))
+        self.capacity = capacity
+
+    def rows(self, keys, narrow=False):
+        """Řádky pro klíče (nové klíče dostanou nový řádek)
+
+        narrow=True: čítače klíčů jsou Counter32 i pro oktety a pakety (SNMPv1).
+        """
+        rows = []
+        for key in keys:
+            row = self.index.get(key)
+            if row is None:
+                row = self.index[key] = len(self.index)
+            rows.append(row)
+        if len(self.index) > self.capacity:
+            self._grow(max(len(self.index), 2 * self.capacity))
+        for row in rows:
+            self._narrow[row] = narrow
+        return rows
+
+    def forget(self, keys):
+        """Další měření těchto klíčů bude jako první (bez rychlosti)"""
+        for key in keys:
+            row = self.index.get(key)
+            if row is not None:
+                self._seen[row] = False
+
+    def update(self, rows, counters, uptime, discontinuity, now):
+        """Jeden krok pro dávku řádků
+
+        counters je plochá sekvence len(rows) * WIDTH čítačů, uptime a
+        discontinuity (sysUpTime, ifCounterDiscontinuityTime) po řádcích,
+        now je čas měření (time.time()) společný celé dávce.
+        """
+        if np is not None:
+            return self._update_numpy(rows, counters, uptime, discontinuity, now)
+        return self._update_python(rows, counters, uptime, discontinuity, now)
+
+    def _update_numpy(self, rows, counters, uptime, discontinuity, now):
+        rows = np.asarray(rows, dtype=np.intp)
+        cur = np.asarray(counters, dtype=np.uint64).reshape(len(rows), WIDTH)
+        uptime = np.asarray(uptime, dtype=np.int64)
+        discontinuity = np.asarray(discontinuity, dtype=np.int64)
+        narrow = self._narrow[rows][:, None]
+        masks = np.where(narrow, np.uint64((1 << 32) - 1), np.array(COUNTER_MASKS, dtype=np.uint64))
+        wide = np.array([bits == 64 for bits in COUNTER_BITS]) & ~narrow
+
+        prev = self._counters[rows]
+        deltas = (cur - prev) & masks  # uint64 odečítání je modulo 2^64
+        backwards = cur < prev
+        reset = (backwards & (wide | (deltas >= WRAP_LIMIT))).any(axis=1)
+
+        prev_uptime = self._uptime[rows]
+        local = now - self._time[rows]
+        valid = (self._seen[rows] & ~reset & (local > 0)
+                 & (uptime >= prev_uptime) & (discontinuity == self._discontinuity[rows]))
+
+        by_uptime = (uptime - prev_uptime) / 100
+        use_uptime = (prev_uptime > 0) & (uptime > prev_uptime) & (np.abs(by_uptime - local) <= local / 2)
+        intervals = np.where(use_uptime, by_uptime, local)
+        deltas[~valid] = 0  # Neplatné řádky nemají rozdíly (stejně jako _update_python)
+        rates = deltas[:, :4] / np.where(valid, intervals, 1.0)[:, None]
+
+        self._counters[rows] = cur
+        self._uptime[rows] = uptime
+        self._discontinuity[rows] = discontinuity
+        self._time[rows] = now
+        self._seen[rows] = True
+        return BatchResult(deltas, intervals, valid, rates)
+
+    def _update_python(self, rows, counters, uptime, discontinuity, now):
+        all_deltas, intervals, valid, rates = [], [], [], []
+        for i, row in enumerate(rows):
+            cur = counters[i * WIDTH:(i + 1) * WIDTH]
+            base = row * WIDTH
+            prev_uptime = self._uptime[row]
+            local = now - self._time[row]
+            widths = COUNTER_BITS_V1 if self._narrow[row] else COUNTER_BITS
+            deltas = counter_deltas(self._counters[base:base + WIDTH], cur, widths)
+            ok = (deltas is not None and self._seen[row] and local > 0
+                  and uptime[i] >= prev_uptime and discontinuity[i] == self._discontinuity[row])
+            interval = uptime_interval(prev_uptime, uptime[i], local)
+            deltas = deltas if ok else [0] * WIDTH  # Rozdíl přes restart/reset nic neznamená
+            all_deltas.append(deltas)
+            intervals.append(interval)
+            valid.append(ok)
+            rates.append([delta / interval for delta in deltas[:4]] if ok else [0.0] * 4)
+
+            self._counters[base:base + WIDTH] = array('Q', cur)
+            self._uptime[row] = uptime[i]
+            self._discontinuity[row] = discontinuity[i]
+            self._time[row] = now
+            self._seen[row] = 1
+        return BatchResult(all_deltas, intervals, valid, rates)
@@ -0,0 +1,42 @@
+"""
+Decimace časových řad pro grafy
+Largest-Triangle-Three-Buckets (Steinarsson 2013) - zachovává tvar křivky i špičky
+"""
+
+
+def lttb(xs, ys, threshold):
+    """Vybere threshold bodů z řady (xs, ys), vrací (xs, ys) jako seznamy
+
+    První a poslední bod zůstávají; z každého bucketu se vezme bod, který
+    s předchozím vybraným bodem a průměrem dalšího bucketu tvoří největší
+    trojúhelník. Kratší řady se vrací beze změny.
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(xs), list(ys)
+
+    every = (n - 2) / (threshold - 2)
+    out_x = [xs[0]]
+    out_y = [ys[0]]
+    a = 0
+    for i in range(threshold - 2):
+        # Průměr dalšího bucketu (u posledního je to poslední bod)
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        count = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / count
+        avg_y = sum(ys[next_start:next_end]) / count
+
+        ax, ay = xs[a], ys[a]
+        best, best_area = next_start - 1, -1.0
+        for j in range(int(i * every) + 1, next_start):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        out_x.append(xs[best])
+        out_y.append(ys[best])
+        a = best
+
+    out_x.append(xs[-1])
+    out_y.append(ys[-1])
+    return out_x, out_y
@@ -0,0 +1,132 @@
+"""
+OpenMetrics exporter
+HTTP endpoint /metrics obsluhovaný z posledních měření v paměti - scrape
+nikdy nevyvolá SNMP dotaz a vyrenderovaný payload se mezi scrapy znovu používá.
+"""
+
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# (jméno rodiny, typ, nápověda, funkce Sample -> hodnota nebo None)
+METRICS = (
+    ('snmpmon_if_in_octets', 'counter', 'Received octets (ifHCInOctets)', lambda s: s.stats.in_octets),
+    ('snmpmon_if_out_octets', 'counter', 'Sent octets (ifHCOutOctets)', lambda s: s.stats.out_octets),
+    ('snmpmon_if_in_packets', 'counter', 'Received unicast packets (ifHCInUcastPkts)', lambda s: s.stats.in_packets),
+    ('snmpmon_if_out_packets', 'counter', 'Sent unicast packets (ifHCOutUcastPkts)', lambda s: s.stats.out_packets),
+    ('snmpmon_if_in_errors', 'counter', 'Inbound errors (ifInErrors)', lambda s: s.stats.in_errors),
+    ('snmpmon_if_out_errors', 'counter', 'Outbound errors (ifOutErrors)', lambda s: s.stats.out_errors),
+    ('snmpmon_if_in_rate_bytes', 'gauge', 'Receive rate over the last poll interval in bytes per second',
+     lambda s: s.rates and s.rates.in_rate),
+    ('snmpmon_if_out_rate_bytes', 'gauge', 'Send rate over the last poll interval in bytes per second',
+     lambda s: s.rates and s.rates.out_rate),
+    ('snmpmon_if_in_pps', 'gauge', 'Receive rate over the last poll interval in packets per second',
+     lambda s: s.rates and s.rates.in_pps),
+    ('snmpmon_if_out_pps', 'gauge', 'Send rate over the last poll interval in packets per second',
+     lambda s: s.rates and s.rates.out_pps),
+    ('snmpmon_if_last_poll_timestamp_seconds', 'gauge', 'Time of the last successful poll', lambda s: s.timestamp),
+)
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_value(value):
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+class MetricsCache:
+    """Poslední vzorek každého portu jako řádky OpenMetrics
+
+    update() přepočítá jen řádky daného portu; render() je spojí do payloadu,
+    který se drží, dokud nepřijde další vzorek.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lines = {}  # (host, port, ifindex) -> řádek pro každou rodinu z METRICS
+        self._version = 0
+        self._payload = None  # (verze, bytes, gzip bytes nebo None)
+
+    def __len__(self):
+        return len(self._lines)
+
+    def update(self, sample):
+        labels = (
+            f'{{host="{escape_label(sample.host)}",port="{sample.port}",'
+            f'ifindex="{escape_label(sample.ifindex)}"}}'
+        )
+        lines = []
+        for name, kind, _, value_of in METRICS:
+            value = value_of(sample)
+            if value is None:
+                lines.append('')
+            else:
+                suffix = '_total' if kind == 'counter' else ''
+                lines.append(f'{name}{suffix}{labels} {format_value(value)}\n')
+        with self._lock:
+            self._lines[(sample.host, sample.port, sample.ifindex)] = lines
+            self._version += 1
+
+    def render(self, compress=False):
+        """Payload /metrics (bytes); stejná verze dat se renderuje jen jednou"""
+        with self._lock:
+            payload = self._payload
+            if payload is None or payload[0] != self._version:
+                parts = []
+                rows = list(self._lines.values())
+                for i, (name, kind, help_text, _) in enumerate(METRICS):
+                    parts.append(f'# TYPE {name} {kind}\n# HELP {name} {help_text}\n')
+                    parts.extend(row[i] for row in rows)
+                parts.append('# EOF\n')
+                payload = self._payload = (self._version, ''.join(parts).encode(), None)
+            if compress and payload[2] is None:
+                payload = self._payload = (payload[0], payload[1], gzip.compress(payload[1], compresslevel=1))
+        return payload[2] if compress else payload[1]
+
+
+class MetricsExporter:
+    """HTTP server s /metrics ve vlastním vlákně"""
+
+    def __init__(self, cache, host='', port=9116):
+        self.cache = cache
+        self.scrapes = 0
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                exporter.scrapes += 1
+                compress = 'gzip' in self.headers.get('Accept-Encoding', '')
+                body = exporter.cache.render(compress)
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                if compress:
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapy se nelogují
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
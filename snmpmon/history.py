@@ -0,0 +1,181 @@
+"""
+Historie měření v paměti
+Kruhové buffery s pevnou kapacitou (sloupce array.array) a automatické
+agregace: jednotlivá měření -> 1 min -> 1 h
+"""
+
+from array import array
+from itertools import chain
+
+from .counters import STATS_FIELDS
+
+# Sloupce historie: rozdíly čítačů za interval měření + délka intervalu
+COLUMNS = tuple(field for field, _ in STATS_FIELDS) + ('interval',)
+
+# (rozlišení v sekundách, kapacita); rozlišení 0 = jednotlivá měření
+# 10 min měření po 1 s, 12 h po minutách, 8 dní po hodinách ~ 54 kB na port
+DEFAULT_TIERS = ((0, 600), (60, 720), (3600, 192))
+
+
+class RingBuffer:
+    """Časová řada s pevnou kapacitou - append O(1), nejstarší záznam se přepíše
+
+    Čas je array 'd', ostatní sloupce 'f' (rozdíly čítačů za interval se do
+    float32 vejdou s relativní chybou ~1e-7).
+    """
+
+    __slots__ = ('capacity', 'timestamps', 'data', 'start', 'count')
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.data = tuple(array('f', bytes(4 * capacity)) for _ in COLUMNS)
+        self.start = 0  # Fyzická pozice nejstaršího záznamu
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self):
+        return sum(col.itemsize * len(col) for col in (self.timestamps,) + self.data)
+
+    def append(self, timestamp, values):
+        """Přidá záznam, values v pořadí COLUMNS"""
+        pos = (self.start + self.count) % self.capacity
+        if self.count == self.capacity:
+            self.start = (self.start + 1) % self.capacity
+        else:
+            self.count += 1
+        self.timestamps[pos] = timestamp
+        for col, value in zip(self.data, values):
+            col[pos] = value
+
+    def _time_at(self, i):
+        return self.timestamps[(self.start + i) % self.capacity]
+
+    def _bisect(self, timestamp):
+        """Logický index prvního záznamu s časem >= timestamp"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._time_at(mid) < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _segments(self, start, end):
+        """Fyzické rozsahy [a, b) logického okna start..end (nejvýše dva)"""
+        first = self._bisect(start) if start is not None else 0
+        last = self._bisect(end) if end is not None else self.count
+        if first >= last:
+            return []
+        a = (self.start + first) % self.capacity
+        b = a + (last - first)
+        if b <= self.capacity:
+            return [(a, b)]
+        return [(a, self.capacity), (0, b - self.capacity)]
+
+    def window(self, start=None, end=None):
+        """Záznamy se start <= čas < end jako souvislé úseky bez kopírování
+
+        Vrací seznam (timestamps, {sloupec: hodnoty}) s memoryview do bufferu;
+        přetočený buffer dává nejvýše dva úseky.
+        """
+        ts = memoryview(self.timestamps)
+        data = [memoryview(col) for col in self.data]
+        return [
+            (ts[a:b], {name: col[a:b] for name, col in zip(COLUMNS, data)})
+            for a, b in self._segments(start, end)
+        ]
+
+    def series(self, column, start=None, end=None, per_second=False):
+        """Iterátor (čas, hodnota) jednoho sloupce, per_second dělí délkou intervalu"""
+        index = COLUMNS.index(column)
+        interval = COLUMNS.index('interval')
+        ts, values, intervals = memoryview(self.timestamps), memoryview(self.data[index]), memoryview(self.data[interval])
+        segments = self._segments(start, end)
+        if not per_second:
+            return chain.from_iterable(zip(ts[a:b], values[a:b]) for a, b in segments)
+        return chain.from_iterable(
+            ((t, v / dt if dt > 0 else 0.0) for t, v, dt in zip(ts[a:b], values[a:b], intervals[a:b]))
+            for a, b in segments
+        )
+
+
+class SeriesHistory:
+    """Historie jednoho portu: jednotlivá měření a jejich agregace
+
+    Agregace sčítá rozdíly i délky intervalů do bucketu daného rozlišení;
+    bucket se zapíše (s časem začátku bucketu) až když přijde měření z dalšího.
+    """
+
+    __slots__ = ('tiers', '_buckets', '_pending')
+
+    def __init__(self, tiers=DEFAULT_TIERS):
+        self.tiers = {resolution: RingBuffer(capacity) for resolution, capacity in tiers}
+        self._buckets = {resolution: None for resolution in self.tiers if resolution}
+        self._pending = {resolution: [0.0] * len(COLUMNS) for resolution in self._buckets}
+
+    def __getitem__(self, resolution):
+        return self.tiers[resolution]
+
+    @property
+    def nbytes(self):
+        return sum(tier.nbytes for tier in self.tiers.values())
+
+    def covering(self, start):
+        """Nejjemnější úroveň, která obsahuje data od start (nebo ještě nic nezahodila)"""
+        tiers = sorted(self.tiers.items())
+        for _, tier in tiers:
+            if tier.count < tier.capacity or tier.timestamps[tier.start] <= start:
+                return tier
+        return tiers[-1][1]
+
+    def append(self, timestamp, values):
+        """Zapíše jedno měření (rozdíly v pořadí COLUMNS) do všech úrovní"""
+        self.tiers[0].append(timestamp, values)
+        for resolution, bucket in self._buckets.items():
+            current = timestamp // resolution * resolution
+            pending = self._pending[resolution]
+            if current != bucket:
+                if bucket is not None:
+                    self.tiers[resolution].append(bucket, pending)
+                self._buckets[resolution] = current
+                pending[:] = values
+            else:
+                for i, value in enumerate(values):
+                    pending[i] += value
+
+
+class HistoryStore:
+    """Historie všech sledovaných portů podle klíče
+
+    Klíčem je stejný klíč jako u PortTracker (ifIndex v monitoru,
+    (host, port, ifIndex) v polleru).
+    """
+
+    def __init__(self, tiers=DEFAULT_TIERS):
+        self.tiers = tiers
+        self.series = {}
+
+    def __contains__(self, key):
+        return key in self.series
+
+    def __getitem__(self, key):
+        return self.series[key]
+
+    def __len__(self):
+        return len(self.series)
+
+    @property
+    def nbytes(self):
+        return sum(history.nbytes for history in self.series.values())
+
+    def record(self, key, timestamp, deltas, interval):
+        """Zapíše rozdíly čítačů za interval (pořadí STATS_FIELDS, už s korekcí přetečení)"""
+        history = self.series.get(key)
+        if history is None:
+            history = self.series[key] = SeriesHistory(self.tiers)
+        history.append(timestamp, list(deltas) + [interval])
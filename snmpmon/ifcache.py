@@ -0,0 +1,141 @@
+"""
+Cache metadat rozhraní (ifDescr, ifAdminStatus, ifOperStatus, ifAlias)
+Trvalá cache na disku pro každé zařízení; shodu zařízení bez restartu ověří
+jeden GET (sysObjectID, sysUpTime), stav portů se přečte jedním průchodem
+GETBULK a popisy se znovu načtou jen u řádků se změněným ifLastChange.
+"""
+
+import json
+import os
+
+from .counters import OID, to_int
+from .target import device_name
+
+# Sloupce řádku cache -> klíč OID
+ROW_COLUMNS = (
+    ('descr', 'ifDescr'),
+    ('admin', 'ifAdminStatus'),
+    ('oper', 'ifOperStatus'),
+    ('alias', 'ifAlias'),
+    ('last_change', 'ifLastChange'),
+)
+
+CHECK_OIDS = ('sysObjectID', 'sysUpTime', 'ifNumber', 'ifTableLastChange')
+
+# Sloupce, které se při platné cache čtou vždy znovu (stav portů a ifLastChange)
+STATUS_COLUMNS = (
+    ('admin', 'ifAdminStatus'),
+    ('oper', 'ifOperStatus'),
+    ('last_change', 'ifLastChange'),
+)
+
+BOOT_TOLERANCE = 5.0  # Povolený rozdíl odhadu času startu agenta (s)
+
+
+class InterfaceCache:
+    """Metadata rozhraní zařízení v JSON souborech <directory>/<zařízení>.json"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, target):
+        return os.path.join(self.directory, f"{device_name(target)}.json")
+
+    def get(self, target):
+        """Uložený záznam zařízení nebo None"""
+        try:
+            with open(self._path(target), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, target, entry):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(target)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(path + '.tmp', path)
+
+
+class MemoryInterfaceCache(InterfaceCache):
+    """InterfaceCache jen v paměti - nic nečte ani nezapisuje na disk"""
+
+    def __init__(self):
+        super().__init__(None)
+        self.entries = {}
+
+    def get(self, target):
+        return self.entries.get(device_name(target))
+
+    def put(self, target, entry):
+        self.entries[device_name(target)] = entry
+
+
+def cached_rows(cache, target):
+    """Řádky z cache bez jakéhokoli SNMP dotazu (např. při startu GUI)"""
+    entry = cache.get(target) if cache is not None else None
+    return entry['rows'] if entry else None
+
+
+def _state(values, now):
+    """Stav agenta z kontrolního GET; boot = odhad času startu agenta"""
+    uptime = to_int(values.get(OID['sysUpTime']))
+    return {
+        'object_id': values.get(OID['sysObjectID'], ''),
+        'boot': now - uptime / 100,
+        'if_number': values.get(OID['ifNumber'], ''),
+        'table_last_change': values.get(OID['ifTableLastChange'], ''),
+    }
+
+
+def _same_agent(entry, state):
+    """Stejné zařízení bez restartu od uložení cache"""
+    return (entry['object_id'] == state['object_id']
+            and abs(entry['boot'] - state['boot']) <= BOOT_TOLERANCE)
+
+
+async def fetch_interfaces(client, target, cache=None, max_repetitions=25):
+    """Metadata rozhraní, vrací (rows, source)
+
+    rows je {ifIndex: {descr, admin, oper, alias, last_change}} seřazené podle
+    ifIndexu, source je 'cache' (popisy z cache, stav portů znovu), 'partial'
+    (navíc GET řádků se změněným ifLastChange nebo změna sady řádků) nebo
+    'full' (walk celé tabulky - první načtení, restart nebo jiné zařízení).
+
+    ifTableLastChange se mění jen při vzniku a zániku řádků, ne při změně
+    ifOperStatus/ifAdminStatus - stav portů se proto s platnou cache čte vždy
+    (jeden průchod GETBULK třemi sloupci).
+    """
+    values = await client.get(target, [OID[key] for key in CHECK_OIDS])
+    state = _state(values, values.timestamp)  # Čas odpovědi (u přehrávání ze záznamu)
+    entry = cache.get(target) if cache is not None else None
+
+    if entry and _same_agent(entry, state):
+        table = await client.table(target, [OID[key] for _, key in STATUS_COLUMNS], max_repetitions)
+        indices = dict.fromkeys(idx for _, key in STATUS_COLUMNS for idx in table[OID[key]])
+        old = entry['rows']
+        rows = {}
+        for idx in indices:
+            status = {field: table[OID[key]].get(idx, '') for field, key in STATUS_COLUMNS}
+            if idx in old and old[idx]['last_change'] == status['last_change']:
+                rows[idx] = {**old[idx], **status}
+        changed = [idx for idx in indices if idx not in rows]
+        if changed:
+            oids = [f"{OID[key]}.{idx}" for idx in changed for _, key in ROW_COLUMNS]
+            row_values = await client.get(target, oids)
+            for idx in changed:
+                rows[idx] = {field: row_values.get(f"{OID[key]}.{idx}", '') for field, key in ROW_COLUMNS}
+        source = 'cache' if not changed and rows.keys() == old.keys() else 'partial'
+    else:
+        source = 'full'
+        columns = [OID[key] for _, key in ROW_COLUMNS]
+        table = await client.table(target, columns, max_repetitions)
+        rows = {
+            idx: {field: table[OID[key]].get(idx, '') for field, key in ROW_COLUMNS}
+            for idx in table[OID['ifDescr']]
+        }
+
+    rows = {idx: rows[idx] for idx in sorted(rows, key=lambda idx: tuple(map(int, idx.split('.'))))}
+    if cache is not None:
+        cache.put(target, {**state, 'rows': rows})
+    return rows, source
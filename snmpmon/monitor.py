@@ -0,0 +1,114 @@
+"""
+Monitor vybraných portů jednoho zařízení
+Jádro sdílené GUI a CLI - bez závislosti na tkinter
+"""
+
+import abc
+import time
+
+from .counters import OID, PortStats, PortTracker, Sample, fetch_stats
+from .deltas import CounterBank, batch_counters
+from .target import device_name
+
+
+class PeriodicPoller(abc.ABC):
+    """Opakuje poll() s pevným intervalem
+
+    Podtřídy nastaví interval (s) a missed = 0 (zmeškané cykly) a
+    implementují poll(), který vrací n-tici argumentů pro on_poll.
+    """
+
+    @abc.abstractmethod
+    def poll(self):
+        """Jeden cyklus měření - n-tice argumentů pro on_poll"""
+
+    def run(self, on_poll, stop_event, on_error=None, paced=True):
+        """Měří do nastavení stop_event, výsledek poll() předává on_poll(*výsledek)
+
+        Cykly běží podle monotónních termínů start + n * interval, takže délka
+        pollu se do periody nepřičítá. Zmeškané termíny se nedohání, jen se
+        započítají do missed. S paced=False (přehrávání záznamu, tempo určuje
+        ReplayClient) jdou cykly hned po sobě. EOFError z poll() (konec
+        záznamu) běh ukončí.
+        """
+        deadline = time.monotonic()
+        while not stop_event.is_set():
+            try:
+                on_poll(*self.poll())
+            except EOFError:
+                return
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(e)
+
+            if not paced:
+                continue
+            deadline += self.interval
+            now = time.monotonic()
+            if deadline < now:
+                skipped = int((now - deadline) // self.interval) + 1
+                self.missed += skipped
+                deadline += skipped * self.interval
+            stop_event.wait(deadline - now)
+
+
+class PortMonitor(PeriodicPoller):
+    """Periodicky měří vybrané porty jednoho zařízení přes SnmpSession
+
+    Každý cyklus je jeden dávkový GET pro všechny porty; výsledkem jsou
+    vzorky jednotlivých portů a souhrnný vzorek (součet portů). Rychlosti
+    všech portů počítá jedním krokem CounterBank; souhrn se sčítá z rozdílů
+    portů, takže ho přetečení nebo reset jednoho portu nezkreslí. S history
+    (HistoryStore) se rozdíly čítačů ukládají pod ifIndexem a TOTAL,
+    s archive (ArchiveWriter) se vzorky portů zapisují na disk.
+    """
+
+    TOTAL = 'total'  # ifindex souhrnného vzorku
+
+    def __init__(self, session, target, indices, interval=2.0, history=None, archive=None):
+        self.session = session
+        self.target = target
+        self.indices = list(indices)
+        self.interval = interval
+        self.trackers = {idx: PortTracker() for idx in self.indices}  # Min/max rychlostí
+        self.bank = CounterBank(len(self.indices))
+        self._rows = self.bank.rows(self.indices, narrow=target.version == 'v1')
+        self.total = PortTracker()
+        self.history = history
+        self.archive = archive
+        self.missed = 0  # Zmeškané cykly (poll trval déle než interval)
+
+    def poll(self):
+        """Jedno měření - vrací (seznam Sample portů, souhrnný Sample)"""
+        stats = self.session.call(fetch_stats(self.session.client, self.target, self.indices))
+        now = stats.timestamp
+
+        port_stats = [stats[idx] for idx in self.indices]
+        result = self.bank.update(self._rows, *batch_counters(port_stats), now)
+        port_rates, deltas = result.port_rates()
+        samples = [
+            self._record(idx, self.trackers[idx], port_stats[i], now, port_rates[i], deltas[i])
+            for i, idx in enumerate(self.indices)
+        ]
+        if self.archive is not None:
+            device = device_name(self.target)
+            for sample in samples:
+                self.archive.add(sample, device)
+
+        total = result.total()
+        total_deltas, total_rates = (None, None) if total is None else (total[0], total[2])
+        total_stats = sum(port_stats, PortStats())
+        return samples, self._record(self.TOTAL, self.total, total_stats, now, total_rates, total_deltas)
+
+    def _record(self, key, tracker, stats, now, rates, deltas):
+        tracker.record(stats, now, rates)
+        if rates is not None and self.history is not None:
+            self.history.record(key, now, deltas, rates.interval)
+        return Sample(self.target.host, key, now, stats, rates, self.target.port)
+
+
+def discover_ports(session, target):
+    """Seznam všech ifIndexů zařízení (podle ifDescr)"""
+    table = session.table(target, [OID['ifDescr']])
+    return list(table[OID['ifDescr']])
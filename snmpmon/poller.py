@@ -0,0 +1,247 @@
+"""
+Asynchronní poller více zařízení
+Inventář zařízení/portů v JSON, omezená souběžnost, jitter, timeout a retry
+
+Formát inventáře:
+
+    {
+      "defaults": {"community": "public", "version": "v2c", "interval": 10},
+      "devices": [
+        {"host": "10.0.0.1", "ports": ["1", "2", "49"]},
+        {"host": "10.0.0.2", "community": "noc", "interval": 30},
+        {"host": "10.0.0.3", "version": "v3", "user": "monitor", "auth_protocol": "SHA",
+         "auth_key": "...", "priv_protocol": "AES", "priv_key": "...", "context": ""}
+      ]
+    }
+
+Zařízení bez "ports" se při startu projde (ifDescr) a sledují se všechny porty.
+S PollPolicy.adaptive (AdaptivePolicy) je "interval" základní interval portu,
+skutečný interval každého portu volí AdaptiveScheduler (poller.schedulers).
+"""
+
+import asyncio
+import json
+import random
+from dataclasses import dataclass, field, replace
+
+from .adaptive import AdaptiveScheduler, TokenBucket
+from .counters import OID, Sample, fetch_stats, parse_stats, stats_oids
+from .deltas import CounterBank, batch_counters
+from .session import SnmpClient
+from .target import SnmpError, SnmpTarget, SnmpTimeout, device_name
+
+
+# Klíče inventáře pro SNMPv3 (pole SnmpTarget)
+V3_FIELDS = ('user', 'auth_protocol', 'auth_key', 'priv_protocol', 'priv_key', 'context')
+
+
+@dataclass
+class Device:
+    """Zařízení z inventáře"""
+    target: SnmpTarget
+    ports: list = field(default_factory=list)
+    interval: float = 10.0
+
+
+@dataclass
+class PollPolicy:
+    """Parametry plánování a souběžnosti polleru"""
+    timeout: float = 2.0          # Timeout jednoho SNMP pokusu (s)
+    retries: int = 2              # Počet opakování po timeoutu/chybě
+    backoff: float = 0.5          # Základ exponenciálního čekání mezi pokusy (s)
+    jitter: float = 0.1           # Náhodný posun každého cyklu (podíl intervalu)
+    max_inflight: int = 256       # Max souběžných požadavků celkem
+    max_inflight_device: int = 4  # Max souběžných požadavků na jedno zařízení
+    ports_per_request: int = 10   # Portů v jednom požadavku (7 varbindů na port)
+    adaptive: object = None       # AdaptivePolicy = adaptivní intervaly portů
+
+
+def load_inventory(path):
+    """Načte inventář z JSON souboru, vrací seznam Device"""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+
+    defaults = data.get('defaults', {})
+    devices = []
+    for entry in data['devices']:
+        conf = {**defaults, **entry}
+        target = SnmpTarget(
+            conf['host'],
+            community=conf.get('community', 'public'),
+            version=conf.get('version', 'v2c'),
+            port=int(conf.get('port', 161)),
+            **{key: conf[key] for key in V3_FIELDS if key in conf},
+        )
+        devices.append(Device(
+            target,
+            ports=[str(idx) for idx in conf.get('ports', [])],
+            interval=float(conf.get('interval', 10)),
+        ))
+    return devices
+
+
+class AsyncPoller:
+    """Periodicky polluje countery portů všech zařízení v jedné smyčce asyncio
+
+    Rychlosti všech portů jedné odpovědi se počítají jedním krokem v
+    CounterBank (korekce přetečení, diskontinuity) a vzorky se předají
+    callbacku on_sample(Sample). S history (HistoryStore) se rozdíly čítačů
+    ukládají pod klíčem (host, port, ifIndex), s archive (ArchiveWriter)
+    se vzorky zapisují na disk.
+    """
+
+    def __init__(self, devices, on_sample, policy=None, client=None, history=None, archive=None):
+        self.devices = devices
+        self.on_sample = on_sample
+        self.policy = policy or PollPolicy()
+        self.client = client or SnmpClient()
+        self.bank = CounterBank()  # Předchozí čítače podle (host, port, ifIndex)
+        self.schedulers = {}  # (host, port) -> AdaptiveScheduler
+        self.history = history
+        self.archive = archive
+
+        # Statistiky běhu
+        self.requests = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.retries = 0
+        self.samples = 0
+        self.missed = 0
+
+        self._global_sem = None
+        self._device_sems = {}
+
+    def _target(self, device):
+        # Opakování řídí poller, pysnmp dostane jen timeout jednoho pokusu
+        return replace(device.target, timeout=self.policy.timeout, retries=0)
+
+    async def run(self, stop_event=None):
+        """Polluje do nastavení stop_event (nebo navždy)"""
+        self._global_sem = asyncio.Semaphore(self.policy.max_inflight)
+        stop_event = stop_event or asyncio.Event()
+        tasks = [asyncio.create_task(self._device_loop(device, stop_event)) for device in self.devices]
+        try:
+            await stop_event.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _device_loop(self, device, stop_event):
+        loop = asyncio.get_running_loop()
+        target = self._target(device)
+        self._device_sems[target] = asyncio.Semaphore(self.policy.max_inflight_device)
+        adaptive = self.policy.adaptive
+        if adaptive is not None:
+            # Rozpočet PDU zařízení platí pro všechny požadavky včetně discovery a opakování
+            self.client.budgets[target] = TokenBucket(adaptive.budget_rps, adaptive.budget_burst)
+
+        if not device.ports:
+            device.ports = await self._discover(target)
+
+        if adaptive is not None:
+            await self._adaptive_loop(device, target, stop_event)
+            return
+
+        step = self.policy.ports_per_request
+        groups = [device.ports[i:i + step] for i in range(0, len(device.ports), step)]
+
+        # Rozprostření startů zařízení přes celý interval
+        next_time = loop.time() + random.uniform(0, device.interval)
+        jitter = 0.0
+        while not stop_event.is_set():
+            await asyncio.sleep(max(0.0, next_time + jitter - loop.time()))
+            await asyncio.gather(*(self._poll(target, group) for group in groups))
+
+            next_time += device.interval
+            now = loop.time()
+            if next_time < now:
+                # Poll trval déle než interval - vynechané cykly se nedohání
+                skipped = int((now - next_time) // device.interval) + 1
+                self.missed += skipped
+                next_time += skipped * device.interval
+            # Jitter posouvá jen jednotlivý cyklus, nekumuluje se do rozvrhu
+            jitter = random.uniform(-1, 1) * self.policy.jitter * device.interval
+
+    async def _adaptive_loop(self, device, target, stop_event):
+        """Polling s adaptivními intervaly - každé probuzení polluje jen splatné porty"""
+        loop = asyncio.get_running_loop()
+        adaptive = self.policy.adaptive
+        scheduler = AdaptiveScheduler(
+            device.ports, device.interval, adaptive, loop.time() + random.uniform(0, device.interval)
+        )
+        self.schedulers[(target.host, target.port)] = scheduler
+
+        # Rychlost linek pro výpočet vytížení (ifHighSpeed v Mb/s)
+        async with self._global_sem:
+            table = await self._with_retries(lambda: self.client.table(target, [OID['ifHighSpeed']]))
+        for idx, speed in (table[OID['ifHighSpeed']] if table else {}).items():
+            if idx in scheduler.ports and speed.isdigit():
+                scheduler.set_speed(idx, int(speed))
+
+        step = adaptive.ports_per_request
+        while not stop_event.is_set():
+            await asyncio.sleep(max(0.0, scheduler.next_wakeup() - loop.time()))
+            due = scheduler.due(loop.time())
+            groups = [due[i:i + step] for i in range(0, len(due), step)]
+            await asyncio.gather(*(self._poll(target, group, scheduler) for group in groups))
+
+    async def _discover(self, target):
+        async with self._global_sem:
+            table = await self._with_retries(lambda: self.client.table(target, [OID['ifDescr']]))
+        return list(table[OID['ifDescr']]) if table else []
+
+    async def _with_retries(self, make_request):
+        """Zavolá požadavek s opakováním a exponenciálním čekáním, při neúspěchu vrátí None"""
+        for attempt in range(self.policy.retries + 1):
+            if attempt:
+                self.retries += 1
+                await asyncio.sleep(self.policy.backoff * 2 ** (attempt - 1))
+            self.requests += 1
+            try:
+                return await make_request()
+            except SnmpTimeout:
+                self.timeouts += 1
+            except SnmpError:
+                self.errors += 1
+        return None
+
+    async def _poll(self, target, indices, scheduler=None):
+        if scheduler is None:
+            async with self._global_sem, self._device_sems[target]:
+                stats = await self._with_retries(lambda: fetch_stats(self.client, target, indices))
+            if stats is None:
+                return
+            now = stats.timestamp
+        else:
+            # Adaptivní režim čte i ifOperStatus (down porty se odsouvají)
+            oper_oids = [f"{OID['ifOperStatus']}.{idx}" for idx in indices]
+            async with self._global_sem, self._device_sems[target]:
+                values = await self._with_retries(
+                    lambda: self.client.get(target, stats_oids(indices, target.version) + oper_oids)
+                )
+            if values is None:
+                for idx in indices:
+                    scheduler.postpone(idx, asyncio.get_running_loop().time())
+                return
+            stats = parse_stats(values, indices, target.version)
+            now = values.timestamp
+
+        device = device_name(target)
+        keys = [(target.host, target.port, idx) for idx in stats]
+        rows = self.bank.rows(keys, narrow=target.version == 'v1')
+        result = self.bank.update(rows, *batch_counters(stats.values()), now)
+        port_rates, deltas = result.port_rates()
+        for key, port_stats, rates, port_deltas in zip(keys, stats.values(), port_rates, deltas):
+            idx = key[2]
+            if rates is not None and self.history is not None:
+                self.history.record(key, now, port_deltas, rates.interval)
+            sample = Sample(target.host, idx, now, port_stats, rates, target.port)
+            if self.archive is not None:
+                self.archive.add(sample, device)
+            self.samples += 1
+            self.on_sample(sample)
+            if scheduler is not None:
+                oper = values.get(f"{OID['ifOperStatus']}.{idx}")
+                scheduler.update(idx, rates, oper, asyncio.get_running_loop().time())
+
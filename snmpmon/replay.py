@@ -0,0 +1,213 @@
+"""
+Záznam a přehrávání SNMP odpovědí
+Recorder zapisuje surové odpovědi SnmpClient (GET, walk, tabulky) s časem
+přijetí do souboru gzip s JSON lines. ReplayClient má API SnmpClient a
+odpovědi ze záznamu vrací bez sítě - v reálném čase (speed 1), zrychleně
+nebo co nejrychleji (speed 0). Přehrávání prochází stejnou cestou jako živý
+polling (fetch_stats, parse_stats, CounterBank, trackery, GUI), takže burst,
+přetečení i reset čítačů se dají zopakovat deterministicky.
+
+Formát souboru (řádek = JSON pole):
+
+    ["snmprec", 1]                               hlavička
+    [id, kind, host, port, request]               nový tvar požadavku (OID / seznam OID)
+    [id, timestamp, response]                     odpověď na požadavek tvaru id
+
+Odpověď GET je seznam hodnot v pořadí OID požadavku (null = OID chybí),
+walk slovník index -> hodnota, tabulka seznam takových slovníků po sloupcích.
+"""
+
+import asyncio
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict, deque
+
+from .stats import ClientStats
+from .target import Response
+
+MAGIC = 'snmprec'
+VERSION = 1
+
+
+class ReplayFinished(EOFError):
+    """Záznam už neobsahuje další odpověď na požadavek"""
+
+
+class Recorder:
+    """Zapisuje odpovědi klienta do záznamu (SnmpClient.recorder)
+
+    Tvar požadavku (druh, cíl, OID) se zapíše jednou, každá další odpověď
+    jen s jeho id - záznam pollingu je tak hlavně sekvence hodnot čítačů.
+    """
+
+    def __init__(self, path, compresslevel=6):
+        self.path = path
+        self.records = 0
+        self._shapes = {}  # (kind, host, port, request) -> id
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, 'wt', encoding='utf-8', compresslevel=compresslevel)
+        self._write([MAGIC, VERSION])
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+    def record(self, kind, target, request, response, timestamp=None):
+        """Zapíše jednu odpověď (request je OID nebo seznam OID, response výsledek klienta)"""
+        timestamp = time.time() if timestamp is None else timestamp
+        if kind == 'get':
+            response = [response.get(oid) for oid in request]
+        elif kind == 'table':
+            response = [response[column] for column in request]
+        key = (kind, target.host, target.port, request if isinstance(request, str) else tuple(request))
+        with self._lock:
+            if self._file is None:
+                return
+            shape = self._shapes.get(key)
+            if shape is None:
+                shape = self._shapes[key] = len(self._shapes)
+                self._write([shape, kind, target.host, target.port, request])
+            self._write([shape, timestamp, response])
+            self.records += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class ReplayClient:
+    """Klient, který místo sítě vrací odpovědi ze záznamu (API SnmpClient)
+
+    Každý tvar požadavku (druh, cíl, OID) má vlastní frontu odpovědí v pořadí
+    záznamu. Požadavek na podmnožinu zaznamenaných OID nebo sloupců (např.
+    méně portů než při záznamu) dostane odpovídající část odpovědi. Po
+    vyčerpání záznamu vyhodí ReplayFinished.
+
+    speed 1 přehrává podle zaznamenaných časů, 2 dvojnásobnou rychlostí,
+    0 bez čekání. Výsledky (Response) nesou čas odpovědi ze záznamu, takže
+    rychlosti a časy vzorků odpovídají původnímu měření. S recorder se
+    přehrané odpovědi zapisují do nového záznamu (např. výřez portů).
+    """
+
+    def __init__(self, path, speed=1.0, stats=None):
+        self.path = path
+        self.speed = speed
+        self.stats = stats or ClientStats()
+        self.recorder = None
+        self.budgets = {}  # Jen kvůli API SnmpClient - přehrávání řídí časy záznamu
+        self.replayed = 0
+        self._file = gzip.open(path, 'rt', encoding='utf-8')
+        header = json.loads(self._file.readline() or 'null')
+        if header != [MAGIC, VERSION]:
+            self._file.close()
+            raise ValueError(f"{path}: neznámý formát záznamu")
+        self._shapes = {}                  # (kind, host, port) -> [(id, request)]
+        self._queues = defaultdict(deque)  # id -> deque[(timestamp, response)]
+        self._resolved = {}                # požadavek -> (id, pozice v odpovědi nebo None)
+        self._start = None                 # (monotonic, čas záznamu) první odpovědi
+
+    def _read(self):
+        """Načte další řádek záznamu, False na konci"""
+        line = self._file.readline() if self._file is not None else ''
+        if not line:
+            return False
+        record = json.loads(line)
+        if len(record) == 5:
+            shape, kind, host, port, request = record
+            self._shapes.setdefault((kind, host, port), []).append(
+                (shape, request if isinstance(request, str) else tuple(request))
+            )
+        else:
+            shape, timestamp, response = record
+            self._queues[shape].append((timestamp, response))
+        return True
+
+    def _match(self, kind, target, request):
+        """Id tvaru, který pokrývá požadavek, a pozice požadovaných položek v odpovědi
+
+        Přednost má tvar přesně shodný s požadavkem, jinak nadmnožina
+        s nepřehranými odpověďmi (nebo první nadmnožina).
+        """
+        shapes = self._shapes.get((kind, target.host, target.port), ())
+        for shape, recorded in shapes:
+            if recorded == request:
+                return shape, None
+        if kind == 'walk':
+            return None
+        covering = [(shape, recorded) for shape, recorded in shapes if set(request) <= set(recorded)]
+        if not covering:
+            return None
+        shape, recorded = next(((s, r) for s, r in covering if self._queues[s]), covering[0])
+        positions = {item: i for i, item in enumerate(recorded)}
+        return shape, [positions[item] for item in request]
+
+    async def _next(self, kind, target, request):
+        key = (kind, target.host, target.port, request)
+        found = self._resolved.get(key)
+        # Bez přesné shody se tvar hledá znovu - přesný tvar může být dál v záznamu
+        while found is None or found[1] is not None and not self._queues[found[0]]:
+            found = self._match(kind, target, request)
+            if (found is None or found[1] is not None and not self._queues[found[0]]) and not self._read():
+                if found is None:
+                    raise ReplayFinished(f"Záznam neobsahuje {kind} pro {target.host}:{target.port}")
+                raise ReplayFinished(f"Konec záznamu ({self.replayed} odpovědí)")
+        if found[1] is None:
+            self._resolved[key] = found
+        shape, positions = found
+
+        queue = self._queues[shape]
+        while not queue:
+            if not self._read():
+                raise ReplayFinished(f"Konec záznamu ({self.replayed} odpovědí)")
+        timestamp, response = queue.popleft()
+        await self._pace(timestamp)
+        self.replayed += 1
+        return timestamp, response, positions
+
+    async def _pace(self, timestamp):
+        """Počká do času odpovědi podle rychlosti přehrávání"""
+        if self._start is None:
+            self._start = (time.monotonic(), timestamp)
+        elif self.speed:
+            delay = self._start[0] + (timestamp - self._start[1]) / self.speed - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    async def prewarm(self):
+        pass
+
+    def _received(self, kind, target, request, results, timestamp):
+        if self.recorder is not None:
+            self.recorder.record(kind, target, request, results, timestamp)
+        return Response(results, timestamp)
+
+    async def get(self, target, oids):
+        oids = tuple(oids)
+        timestamp, response, positions = await self._next('get', target, oids)
+        if positions is not None:
+            response = [response[i] for i in positions]
+        results = {oid: value for oid, value in zip(oids, response) if value is not None}
+        return self._received('get', target, oids, results, timestamp)
+
+    async def walk(self, target, oid):
+        timestamp, response, _ = await self._next('walk', target, oid)
+        return self._received('walk', target, oid, dict(response), timestamp)
+
+    async def table(self, target, columns, max_repetitions=None):
+        columns = tuple(columns)
+        timestamp, response, positions = await self._next('table', target, columns)
+        if positions is not None:
+            response = [response[i] for i in positions]
+        results = {column: dict(rows) for column, rows in zip(columns, response)}
+        return self._received('table', target, columns, results, timestamp)
+
+    def forget(self, target):
+        pass
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
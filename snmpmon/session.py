@@ -0,0 +1,375 @@
+"""
+Trvalá SNMP session
+Jedna smyčka asyncio v pozadí, SnmpEngine a transport se cachují pro každý cíl
+(u SNMPv3 i zjištěný engine ID agenta a lokalizované klíče, viz usm.py)
+"""
+
+import asyncio
+import functools
+import threading
+import time
+
+from pysnmp.hlapi.v3arch import (
+    get_cmd, next_cmd, bulk_cmd,
+    SnmpEngine, ContextData,
+    ObjectType, ObjectIdentity,
+    EndOfMibView, NoSuchInstance, NoSuchObject
+)
+from pysnmp.proto import errind
+from pysnmp.smi.compiler import DEFAULT_DEST, add_mib_compiler
+
+from .stats import ClientStats, MeteredTransportTarget, begin_request, end_request
+from .target import Response, SnmpError, SnmpTarget, SnmpTimeout  # SnmpTarget jen pro zpětnou kompatibilitu importu odsud
+from .usm import EngineCache, prime_engine, watch_engine
+
+# SNMP error-status kódy, na které dávkový GET reaguje
+SNMP_ERR_TOO_BIG = 1
+SNMP_ERR_NO_SUCH_NAME = 2
+
+# Výchozí max počet varbindů v jednom PDU, při tooBig se zmenší
+DEFAULT_MAX_VARBINDS = 64
+
+# Výchozí max-repetitions pro GETBULK
+DEFAULT_MAX_REPETITIONS = 25
+
+# Hodnoty, které neznamenají data (konec MIB, neexistující objekt)
+EXCEPTION_VALUES = (EndOfMibView, NoSuchInstance, NoSuchObject)
+
+# Chybové indikace, po kterých cachovaný engine ID / čas agenta neplatí
+STALE_ENGINE_ERRORS = (errind.UnknownEngineID, errind.NotInTimeWindow, errind.WrongDigest, errind.DecryptionError)
+
+
+# MIB kompilátor pysmi sdílený všemi enginy procesu (viz new_engine)
+_mib_compiler = None
+
+
+def new_engine():
+    """SnmpEngine se sdíleným MIB kompilátorem
+
+    hlapi při prvním požadavku každého enginu připojí k jeho MIB builderu
+    nový kompilátor pysmi (generování tabulek parseru, ~80 ms CPU), i když
+    se číselná OID nepřekládají. Kompilátor se proto sestaví jednou a další
+    enginy dostanou ten samý.
+    """
+    global _mib_compiler
+    engine = SnmpEngine()
+    builder = engine.get_mib_builder()
+    if _mib_compiler is None:
+        add_mib_compiler(builder, ifAvailable=True, ifNotAdded=True)
+        _mib_compiler = builder.get_mib_compiler()
+    else:
+        builder.set_mib_compiler(_mib_compiler, DEFAULT_DEST)
+    return engine
+
+
+@functools.lru_cache(maxsize=65536)
+def object_type(oid):
+    """ObjectType pro OID - cachuje se, pysnmp pak již vyřešený objekt neprochází MIB znovu"""
+    return ObjectType(ObjectIdentity(oid))
+
+
+def indication_error(errorIndication):
+    """SnmpError (u timeoutu SnmpTimeout) nesoucí původní errorIndication"""
+    cls = SnmpTimeout if isinstance(errorIndication, errind.RequestTimedOut) else SnmpError
+    return cls(str(errorIndication), errorIndication)
+
+
+def oid_tuple(oid):
+    """'1.3.6.1' -> (1, 3, 6, 1)"""
+    return tuple(int(arc) for arc in oid.strip('.').split('.'))
+
+
+class _Peer:
+    """Cachovaný engine, autentizace a transport pro jeden cíl"""
+    __slots__ = ('engine', 'auth', 'transport', 'context', 'max_varbinds', 'meter', 'target', 'engines', 'stale',
+                 'rejected', 'budget')
+
+    def __init__(self, engine, auth, transport, meter, target, engines=None, budget=None):
+        self.engine = engine
+        self.auth = auth
+        self.transport = transport
+        self.context = ContextData(contextName=target.context)
+        self.max_varbinds = DEFAULT_MAX_VARBINDS
+        self.meter = meter
+        self.target = target
+        self.engines = engines  # EngineCache u SNMPv3, jinak None
+        self.stale = False      # Engine ID / hodiny agenta přestaly platit - engine se zahodí
+        self.rejected = set()   # OID odmítnutá agentem SNMPv1 (noSuchName) - dál se neposílají
+        self.budget = budget    # TokenBucket - každé PDU čeká na token
+
+    def prime(self):
+        """SNMPv3: doplní pysnmp známý engine ID a hodiny agenta (bez discovery)"""
+        if self.engines is not None:
+            info = self.engines.get(self.target)
+            if info is not None:
+                prime_engine(self.engine, self.transport, info)
+
+    def check(self, errorIndication):
+        """SNMPv3: po chybě engine ID / času zahodí cache agenta i engine"""
+        if self.engines is not None and isinstance(errorIndication, STALE_ENGINE_ERRORS):
+            self.engines.drop(self.target)
+            self.stale = True
+
+    async def request(self, kind, command, *args, **kwargs):
+        """Jeden SNMP příkaz s měřením (latence, chyby, čas kódování)"""
+        if self.budget is not None:
+            await self.budget.acquire()
+        self.prime()
+        request, token = begin_request()
+        try:
+            result = await command(self.engine, self.auth, self.transport, self.context, *args, **kwargs)
+        finally:
+            end_request(token)
+        errorIndication, errorStatus = result[0], result[1]
+        self.check(errorIndication)
+        self.meter.observe(kind, request, time.perf_counter() - request.start, errorIndication, errorStatus)
+        return result
+
+
+class SnmpClient:
+    """Asynchronní SNMP klient vázaný na jednu smyčku asyncio
+
+    Všechny požadavky se měří do stats (ClientStats, snapshot() pro čtení).
+    SNMPv3 agenti si engine ID a hodiny pamatují v engines (EngineCache,
+    s adresářem i mezi běhy). S recorder (replay.Recorder) se odpovědi
+    zapisují pro pozdější přehrání. Cíl s TokenBucket v budgets posílá PDU
+    jen v jeho rozpočtu (adaptivní poller).
+    """
+
+    def __init__(self, stats=None, engines=None):
+        self._peers = {}
+        self.budgets = {}  # SnmpTarget -> TokenBucket
+        self._spare = None  # SnmpEngine připravený prewarm() pro první nový cíl
+        self.stats = stats or ClientStats()
+        self.engines = engines or EngineCache()
+        self.recorder = None
+
+    def _received(self, kind, target, request, results):
+        """Výsledek s časem přijetí odpovědi (Response), zapsaný i do záznamu
+
+        Stejný čas dostane i záznam odpovědi, takže přehrání dá stejné
+        rychlosti jako původní měření.
+        """
+        response = Response(results, time.time())
+        if self.recorder is not None:
+            self.recorder.record(kind, target, request, results, response.timestamp)
+        return response
+
+    async def prewarm(self):
+        """Připraví engine do zásoby (MIB moduly a kompilátor pysnmp) dřív, než je potřeba"""
+        if self._spare is None:
+            self._spare = new_engine()
+
+    async def peer(self, target):
+        """Vrátí (a případně vytvoří) cachovaný engine a transport pro cíl"""
+        peer = self._peers.get(target)
+        if peer is not None and peer.stale:
+            self.forget(target)
+            peer = None
+        if peer is None:
+            transport = await MeteredTransportTarget.create(
+                (target.host, target.port), timeout=target.timeout, retries=target.retries
+            )
+            transport.meter = self.stats.device(target)
+            engine = self._spare if self._spare is not None else new_engine()
+            self._spare = None
+            engines = None
+            if target.version == 'v3':
+                engines = self.engines
+                watch_engine(engine, target, engines)
+            peer = _Peer(engine, target.auth_data(), transport, transport.meter, target, engines,
+                         self.budgets.get(target))
+            self._peers[target] = peer
+        return peer
+
+    def forget(self, target):
+        """Zahodí cachovaný engine cíle (např. po změně konfigurace)"""
+        peer = self._peers.pop(target, None)
+        if peer is not None:
+            peer.engine.close_dispatcher()
+
+    def close(self):
+        for target in list(self._peers):
+            self.forget(target)
+        self._spare = None
+
+    async def get(self, target, oids):
+        """SNMP GET více OID v jednom PDU - při tooBig se dávka rozdělí
+
+        Vrací slovník OID -> hodnota (str). OID odmítnuté agentem SNMPv1
+        (noSuchName) ve výsledku chybí.
+        """
+        peer = await self.peer(target)
+        results = {}
+        pending = [oid for oid in oids if oid not in peer.rejected]
+
+        while pending:
+            chunk = pending[:peer.max_varbinds]
+            errorIndication, errorStatus, errorIndex, varBinds = await peer.request(
+                'get', get_cmd,
+                *[object_type(oid) for oid in chunk],
+                lookupMib=False
+            )
+
+            if errorIndication:
+                raise indication_error(errorIndication)
+            elif errorStatus == SNMP_ERR_TOO_BIG and len(chunk) > 1:
+                # Odpověď se nevešla do PDU zařízení - zmenši dávku a zkus znovu
+                peer.max_varbinds = max(1, len(chunk) // 2)
+                continue
+            elif errorStatus == SNMP_ERR_NO_SUCH_NAME and 0 < int(errorIndex) <= len(chunk):
+                # SNMPv1 odmítne celé PDU kvůli jednomu OID - vyřaď ho a pokračuj. Peer si ho
+                # pamatuje, další GET ho už neposílá (forget() cíle cache zahodí).
+                oid = chunk[int(errorIndex) - 1]
+                peer.rejected.add(oid)
+                pending.remove(oid)
+                continue
+            elif errorStatus:
+                raise SnmpError(f"{errorStatus.prettyPrint()} at {errorIndex}")
+
+            for oid, varBind in zip(chunk, varBinds):
+                results[oid] = str(varBind[1])
+            del pending[:len(chunk)]
+
+        return self._received('get', target, oids, results)
+
+    async def walk(self, target, oid):
+        """SNMP WALK jednoho sloupce - vrací slovník index -> hodnota (str)
+
+        Každý krok walku je jeden GETNEXT přes peer.request - měří se zvlášť
+        a čerpá rozpočet cíle (budgets) jako ostatní PDU.
+        """
+        peer = await self.peer(target)
+        prefix = cursor = oid_tuple(oid)
+        results = {}
+
+        while True:
+            errorIndication, errorStatus, errorIndex, varBinds = await peer.request(
+                'walk', next_cmd,
+                ObjectType(ObjectIdentity(cursor)), lookupMib=False
+            )
+            if errorIndication:
+                raise indication_error(errorIndication)
+            elif errorStatus == SNMP_ERR_NO_SUCH_NAME and target.version == 'v1':
+                # SNMPv1 hlásí konec MIB jako noSuchName
+                break
+            elif errorStatus:
+                raise SnmpError(errorStatus.prettyPrint())
+            if not varBinds:
+                break
+            name, value = varBinds[0]
+            next_oid = tuple(name)
+            if (isinstance(value, EXCEPTION_VALUES) or next_oid[:len(prefix)] != prefix
+                    or next_oid <= cursor):
+                break
+            results[str(name).split('.')[-1]] = str(value)
+            cursor = next_oid
+
+        return self._received('walk', target, oid, results)
+
+    async def table(self, target, columns, max_repetitions=DEFAULT_MAX_REPETITIONS):
+        """Načte více sloupců tabulky najednou
+
+        SNMPv2c používá GETBULK se všemi sloupci v jednom PDU, SNMPv1 GETNEXT
+        (také všechny sloupce v jednom PDU). Vrací slovník
+        OID sloupce -> {index: hodnota (str)}, index je OID suffix za sloupcem.
+        """
+        peer = await self.peer(target)
+        prefixes = {column: oid_tuple(column) for column in columns}
+        results = {column: {} for column in columns}
+        cursor = {column: prefix for column, prefix in prefixes.items()}
+        active = list(columns)
+
+        while active:
+            varBinds = [ObjectType(ObjectIdentity(cursor[column])) for column in active]
+            if target.version == 'v1':
+                errorIndication, errorStatus, errorIndex, varBinds = await peer.request(
+                    'getnext', next_cmd,
+                    *varBinds, lookupMib=False
+                )
+            else:
+                errorIndication, errorStatus, errorIndex, varBinds = await peer.request(
+                    'getbulk', bulk_cmd,
+                    0, max_repetitions, *varBinds, lookupMib=False
+                )
+
+            if errorIndication:
+                raise indication_error(errorIndication)
+            elif errorStatus == SNMP_ERR_NO_SUCH_NAME and 0 < int(errorIndex) <= len(active):
+                # SNMPv1 hlásí konec MIB jako noSuchName - sloupec je dočtený
+                del active[int(errorIndex) - 1]
+                continue
+            elif errorStatus == SNMP_ERR_TOO_BIG and max_repetitions > 1:
+                max_repetitions //= 2
+                continue
+            elif errorStatus:
+                raise SnmpError(f"{errorStatus.prettyPrint()} at {errorIndex}")
+            elif not varBinds:
+                break
+
+            # Odpověď je po řádcích: varbind i patří sloupci active[i % len(active)]
+            done = set()
+            for i, (name, value) in enumerate(varBinds):
+                column = active[i % len(active)]
+                if column in done:
+                    continue
+                oid = tuple(name)
+                prefix = prefixes[column]
+                if (isinstance(value, EXCEPTION_VALUES) or oid[:len(prefix)] != prefix
+                        or oid <= cursor[column]):
+                    done.add(column)
+                    continue
+                results[column]['.'.join(map(str, oid[len(prefix):]))] = str(value)
+                cursor[column] = oid
+
+            active = [column for column in active if column not in done]
+
+        return self._received('table', target, columns, results)
+
+
+class SnmpSession:
+    """Trvalá SNMP session se smyčkou asyncio v samostatném vlákně
+
+    Metody lze volat z libovolného vlákna; všechny požadavky sdílí jednu
+    smyčku a cachované enginy klienta (nebo client, např. replay.ReplayClient).
+    """
+
+    def __init__(self, engines=None, client=None):
+        self.loop = asyncio.new_event_loop()
+        self.client = client or SnmpClient(engines=engines)
+        self._thread = threading.Thread(target=self._run, name="snmp-session", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """Naplánuje korutinu na smyčku session, vrací concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call(self, coro, timeout=None):
+        """Spustí korutinu na smyčce session a počká na výsledek"""
+        return self.submit(coro).result(timeout)
+
+    def get(self, target, oids):
+        return self.call(self.client.get(target, oids))
+
+    def walk(self, target, oid):
+        return self.call(self.client.walk(target, oid))
+
+    def table(self, target, columns, max_repetitions=DEFAULT_MAX_REPETITIONS):
+        return self.call(self.client.table(target, columns, max_repetitions))
+
+    def close(self):
+        """Zavře enginy a zastaví smyčku"""
+        if not self.loop.is_running():
+            return
+
+        async def shutdown():
+            self.client.close()
+
+        self.call(shutdown())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
@@ -0,0 +1,240 @@
+"""
+Sharding pollingu přes více procesů
+BER kódování v pysnmp je čistý Python, takže jeden proces vytíží jedno jádro
+dřív než síť. ShardedPoller rozdělí inventář mezi pracovní procesy (každý má
+vlastní smyčku asyncio, SNMP enginy a AsyncPoller) a vzorky od nich dostává
+rourou jako dávky záznamů pevné délky. Spadlý worker se znovu spustí.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import signal
+import struct
+import time
+from multiprocessing.connection import wait
+
+from .counters import PortRates, PortStats, Sample
+from .poller import AsyncPoller, PollPolicy
+from .session import SnmpClient
+from .target import device_name
+from .usm import EngineCache
+
+# Záznam vzorku v rouře: id agenta (host, port) v shardu, ifIndex, pak pole jako archive.FIELDS (rychlosti v double)
+WIRE_RECORD = struct.Struct('<HId6QI5d')
+# Hlavička dávky: kumulativní čítače workeru (vzorky, požadavky, timeouty, chyby, opakování, vynechané cykly)
+WIRE_HEADER = struct.Struct('<6Q')
+COUNTERS = ('samples', 'requests', 'timeouts', 'errors', 'retries', 'missed')
+
+FLUSH_INTERVAL = 0.1       # Jak často worker posílá dávku (s)
+FLUSH_BYTES = 1 << 16      # Dávka se pošle dřív, když přeroste tuto velikost
+RESTART_DELAY = 1.0        # Čekání před restartem spadlého workeru, roste při opakovaných pádech
+RESTART_DELAY_MAX = 30.0
+STABLE_RUN = 60.0          # Worker, který běžel aspoň takhle dlouho, se restartuje hned
+
+
+def device_load(device):
+    """Odhad zátěže zařízení: porty za sekundu (bez seznamu portů 48 portů)"""
+    return (len(device.ports) or 48) / device.interval
+
+
+def shard_devices(devices, count):
+    """Rozdělí zařízení do count skupin s co nejpodobnější zátěží (LPT)"""
+    shards = [[] for _ in range(count)]
+    loads = [0.0] * count
+    for device in sorted(devices, key=device_load, reverse=True):
+        i = loads.index(min(loads))
+        shards[i].append(device)
+        loads[i] += device_load(device)
+    return [shard for shard in shards if shard]
+
+
+def shard_hosts(devices):
+    """Agenti (host, port) shardu v pořadí id záznamu (worker i rodič počítají stejně)"""
+    return list(dict.fromkeys((device.target.host, device.target.port) for device in devices))
+
+
+def pack_wire(host_id, sample):
+    stats, rates = sample.stats, sample.rates
+    rate_values = (0.0,) * 5 if rates is None else (
+        rates.in_rate, rates.out_rate, rates.in_pps, rates.out_pps, rates.interval
+    )
+    return WIRE_RECORD.pack(
+        host_id, int(sample.ifindex), sample.timestamp,
+        stats.in_octets, stats.out_octets, stats.in_packets, stats.out_packets,
+        stats.in_errors, stats.out_errors, stats.uptime,
+        *rate_values,
+    )
+
+
+def unpack_wire(data, hosts):
+    """Dávka z roury -> (čítače workeru, seznam Sample); hosts z shard_hosts"""
+    view = memoryview(data)
+    counters = WIRE_HEADER.unpack_from(view)
+    samples = []
+    for host_id, ifindex, timestamp, *values in WIRE_RECORD.iter_unpack(view[WIRE_HEADER.size:]):
+        rates = PortRates(*values[7:]) if values[11] else None
+        host, port = hosts[host_id]
+        samples.append(Sample(host, str(ifindex), timestamp, PortStats(*values[:7]), rates, port))
+    return counters, samples
+
+
+def run_worker(devices, policy, conn, stop, engine_dir=None):
+    """Hlavní funkce procesu workeru"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C řeší rodič přes stop
+    host_ids = {host: i for i, host in enumerate(shard_hosts(devices))}
+    buffer = bytearray()
+
+    def on_sample(sample):
+        buffer.extend(pack_wire(host_ids[(sample.host, sample.port)], sample))
+
+    poller = AsyncPoller(devices, on_sample, policy, SnmpClient(engines=EngineCache(engine_dir)))
+
+    def flush():
+        header = WIRE_HEADER.pack(*(getattr(poller, name) for name in COUNTERS))
+        conn.send_bytes(header + buffer)
+        buffer.clear()
+
+    async def main():
+        stopped = asyncio.Event()
+        task = asyncio.create_task(poller.run(stopped))
+        last = time.monotonic()
+        while not stop.is_set() and not task.done():
+            await asyncio.sleep(FLUSH_INTERVAL / 4)
+            if len(buffer) >= FLUSH_BYTES or time.monotonic() - last >= FLUSH_INTERVAL:
+                flush()
+                last = time.monotonic()
+        stopped.set()
+        await task
+
+    try:
+        asyncio.run(main())
+        flush()
+    except (BrokenPipeError, EOFError):
+        pass  # Rodič skončil
+    finally:
+        conn.close()
+
+
+class _Worker:
+    """Proces jednoho shardu a jeho stav v rodiči"""
+
+    def __init__(self, devices):
+        self.devices = devices
+        self.hosts = shard_hosts(devices)
+        self.targets = {(device.target.host, device.target.port): device.target for device in devices}
+        self.process = None
+        self.conn = None
+        self.started = 0.0
+        self.restart_at = None  # Monotonic čas plánovaného restartu
+        self.delay = RESTART_DELAY
+        self.counters = (0,) * len(COUNTERS)   # Poslední hlášené čítače běžícího procesu
+        self.finished = (0,) * len(COUNTERS)   # Součet čítačů předchozích (spadlých) procesů
+
+
+class ShardedPoller:
+    """AsyncPoller rozdělený do workers procesů
+
+    on_sample(Sample), archive a čítače (samples, requests, ...) se chovají
+    jako u AsyncPoller, jen běží v rodiči; run() blokuje do nastavení
+    stop_event (threading.Event). Workery startují metodou spawn, takže
+    nedědí vlákna rodiče (archiv, exporter).
+    """
+
+    def __init__(self, devices, on_sample, policy=None, workers=None, archive=None, engine_dir=None):
+        self.on_sample = on_sample
+        self.policy = policy or PollPolicy()
+        self.archive = archive
+        self.engine_dir = engine_dir
+        self.restarts = 0
+        self._context = multiprocessing.get_context('spawn')
+        self._stop = self._context.Event()
+        count = max(1, min(workers or os.cpu_count() or 1, len(devices)))
+        self.workers = [_Worker(shard) for shard in shard_devices(devices, count)]
+
+    def _total(self, name):
+        """Součet čítače přes všechny workery včetně jejich spadlých předchůdců"""
+        i = COUNTERS.index(name)
+        return sum(worker.finished[i] + worker.counters[i] for worker in self.workers)
+
+    samples = property(lambda self: self._total('samples'))
+    requests = property(lambda self: self._total('requests'))
+    timeouts = property(lambda self: self._total('timeouts'))
+    errors = property(lambda self: self._total('errors'))
+    retries = property(lambda self: self._total('retries'))
+    missed = property(lambda self: self._total('missed'))
+
+    def _start(self, worker):
+        receiver, sender = self._context.Pipe(duplex=False)
+        worker.process = self._context.Process(
+            target=run_worker, args=(worker.devices, self.policy, sender, self._stop, self.engine_dir),
+            name=f"snmpmon-shard-{self.workers.index(worker)}", daemon=True,
+        )
+        worker.process.start()
+        sender.close()  # Rodič drží jen čtecí konec - EOF po konci workeru
+        worker.conn = receiver
+        worker.started = time.monotonic()
+        worker.restart_at = None
+
+    def _receive(self, worker):
+        """Zpracuje jednu dávku workeru; False po EOF (worker skončil)"""
+        try:
+            data = worker.conn.recv_bytes()
+        except (EOFError, OSError):
+            return False
+        worker.counters, samples = unpack_wire(data, worker.hosts)
+        for sample in samples:
+            if self.archive is not None:
+                self.archive.add(sample, device_name(worker.targets[(sample.host, sample.port)]))
+            self.on_sample(sample)
+        return True
+
+    def _reap(self, worker, now):
+        """Worker skončil - naplánuje restart s rostoucím zpožděním"""
+        worker.conn.close()
+        worker.conn = None
+        worker.process.join()
+        worker.finished = tuple(a + b for a, b in zip(worker.finished, worker.counters))
+        worker.counters = (0,) * len(COUNTERS)
+        if now - worker.started >= STABLE_RUN:
+            worker.delay = RESTART_DELAY
+        worker.restart_at = now + worker.delay
+        worker.delay = min(RESTART_DELAY_MAX, worker.delay * 2)
+        self.restarts += 1
+
+    def run(self, stop_event):
+        for worker in self.workers:
+            self._start(worker)
+        try:
+            while not stop_event.is_set():
+                now = time.monotonic()
+                for worker in self.workers:
+                    if worker.conn is None and worker.restart_at is not None and now >= worker.restart_at:
+                        self._start(worker)
+                conns = [worker.conn for worker in self.workers if worker.conn is not None]
+                if not conns:
+                    time.sleep(0.2)  # Všechny workery čekají na restart
+                    continue
+                for conn in wait(conns, timeout=0.2):
+                    worker = next(w for w in self.workers if w.conn is conn)
+                    if not self._receive(worker):
+                        self._reap(worker, time.monotonic())
+        finally:
+            self._shutdown()
+
+    def _shutdown(self, timeout=5.0):
+        """Požádá workery o konec, dočte poslední dávky a počká na ně"""
+        self._stop.set()
+        deadline = time.monotonic() + timeout
+        for worker in self.workers:
+            if worker.conn is None:
+                continue
+            while worker.conn.poll(max(0.0, deadline - time.monotonic())):
+                if not self._receive(worker):
+                    break
+            worker.conn.close()
+            worker.conn = None
+            worker.process.join(max(0.0, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                worker.process.terminate()
+                worker.process.join()
@@ -0,0 +1,132 @@
+"""
+Průběžné statistiky rychlostí v konstantní paměti
+DDSketch (kvantily s relativní chybou, slučitelný) a StreamStats (průměr,
+EWMA a sketch jedné řady). Stačí na 95. percentil pro billing i p99 bez
+ukládání jednotlivých měření.
+"""
+
+import math
+
+
+class DDSketch:
+    """Kvantilový sketch s relativní chybou relative_accuracy (DDSketch)
+
+    Hodnota v padne do bucketu ceil(log_gamma(v)), odhad kvantilu má
+    relativní chybu nejvýše relative_accuracy. Buckety mají váhu (u rychlostí
+    délku intervalu), takže kvantil je časově vážený. Nad max_buckets se
+    slučují nejnižší buckety - horní kvantily zůstávají přesné. Dva sketche
+    se stejnou přesností se slučují merge() (např. hodinová okna do měsíce).
+    """
+
+    __slots__ = ('relative_accuracy', 'max_buckets', '_gamma', '_log_gamma', 'buckets', 'zero', 'count')
+
+    MIN_VALUE = 1e-3  # Menší hodnoty (včetně nuly) se počítají jako 0
+
+    def __init__(self, relative_accuracy=0.01, max_buckets=1024):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets = {}  # klíč -> váha
+        self.zero = 0.0    # Váha nulových hodnot
+        self.count = 0.0   # Celková váha
+
+    def __len__(self):
+        return len(self.buckets)
+
+    def add(self, value, weight=1.0):
+        if value < self.MIN_VALUE:
+            self.zero += weight
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[key] = self.buckets.get(key, 0.0) + weight
+            if len(self.buckets) > self.max_buckets:
+                self._collapse()
+        self.count += weight
+
+    def merge(self, other):
+        """Přičte jiný sketch se stejnou relative_accuracy"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Sketche s různou přesností nelze sloučit")
+        for key, weight in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0.0) + weight
+        self.zero += other.zero
+        self.count += other.count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        """Sloučí nejnižší buckety do nejnižšího ponechaného"""
+        keys = sorted(self.buckets)
+        excess = keys[:len(keys) - self.max_buckets]
+        target = keys[len(excess)]
+        self.buckets[target] += sum(self.buckets.pop(key) for key in excess)
+
+    def quantile(self, q):
+        """Odhad q-tého kvantilu (0..1), bez dat None"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = self.zero
+        if seen >= rank and self.zero:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen >= rank:
+                return 2 * self._gamma ** key / (self._gamma + 1)
+        return 2 * self._gamma ** max(self.buckets) / (self._gamma + 1)
+
+
+class StreamStats:
+    """Průměr, EWMA a kvantily jedné řady rychlostí
+
+    Průměr i sketch jsou vážené délkou intervalu (průměr = přenesená data /
+    čas), EWMA má časovou konstantu tau sekund. merge() sloučí statistiky
+    jiného okna; EWMA se převezme z novějšího z nich.
+    """
+
+    __slots__ = ('tau', 'count', 'duration', 'mean', 'ewma', 'last', 'sketch')
+
+    def __init__(self, tau=60.0, relative_accuracy=0.01):
+        self.tau = tau
+        self.count = 0
+        self.duration = 0.0  # Součet intervalů (s)
+        self.mean = 0.0
+        self.ewma = None
+        self.last = None     # Čas posledního měření
+        self.sketch = DDSketch(relative_accuracy)
+
+    def add(self, value, interval, now):
+        self.count += 1
+        self.duration += interval
+        self.mean += (value - self.mean) * interval / self.duration
+        if self.ewma is None:
+            self.ewma = value
+        else:
+            self.ewma += (value - self.ewma) * (1 - math.exp(-interval / self.tau))
+        self.last = now
+        self.sketch.add(value, interval)
+
+    def merge(self, other):
+        if not other.count:
+            return
+        duration = self.duration + other.duration
+        self.mean = (self.mean * self.duration + other.mean * other.duration) / duration if duration else 0.0
+        self.duration = duration
+        self.count += other.count
+        if self.last is None or other.last >= self.last:
+            self.ewma, self.last = other.ewma, other.last
+        self.sketch.merge(other.sketch)
+
+    def quantile(self, q):
+        return self.sketch.quantile(q)
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'ewma': self.ewma,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+        }
@@ -0,0 +1,202 @@
+"""
+Instrumentace SNMP klienta
+Histogramy latence po zařízeních a typech požadavků, timeouty, opakování,
+error-status, bajty na drátě a čas v BER kódování/dekódování vs čekání na síť.
+"""
+
+import contextvars
+import time
+
+from pysnmp.carrier.asyncio.dgram import udp
+from pysnmp.hlapi.v3arch import UdpTransportTarget
+from pysnmp.proto import errind
+
+# Horní meze bucketů histogramu latence (s): 0.5 ms .. ~8 s, poslední bucket je +Inf
+HISTOGRAM_BOUNDS = tuple(0.0005 * 2 ** i for i in range(15))
+
+# Právě běžící požadavek v tasku klienta - transport podle něj pozná první odeslání
+_current = contextvars.ContextVar('snmpmon_request', default=None)
+
+
+class LatencyHistogram:
+    """Histogram latence s pevnými exponenciálními buckety"""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        i = 0
+        while i < len(HISTOGRAM_BOUNDS) and seconds > HISTOGRAM_BOUNDS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q):
+        """Horní mez bucketu, ve kterém leží q-tý kvantil (0..1)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return HISTOGRAM_BOUNDS[i] if i < len(HISTOGRAM_BOUNDS) else self.max
+        return self.max
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'max': self.max,
+            'p50': self.percentile(0.5),
+            'p99': self.percentile(0.99),
+            'buckets': dict(zip(map(str, HISTOGRAM_BOUNDS + (float('inf'),)), self.counts)),
+        }
+
+
+class DeviceStats:
+    """Čítače jednoho zařízení (host:port)"""
+
+    __slots__ = (
+        'latency', 'requests', 'timeouts', 'retransmits', 'errors',
+        'bytes_out', 'bytes_in', 'encode_time', 'decode_time', 'request_time',
+    )
+
+    def __init__(self):
+        self.latency = {}       # Typ požadavku -> LatencyHistogram
+        self.requests = 0
+        self.timeouts = 0
+        self.retransmits = 0    # Opakovaná odeslání pysnmp po timeoutu
+        self.errors = {}        # error-status / errorIndication -> počet
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.encode_time = 0.0  # Od začátku požadavku po odeslání PDU
+        self.decode_time = 0.0  # Zpracování přijaté odpovědi (BER dekódování, dispatch)
+        self.request_time = 0.0  # Součet latencí
+
+    @property
+    def wait_time(self):
+        """Čekání na síť a agenta = latence bez CPU klienta"""
+        return max(0.0, self.request_time - self.encode_time - self.decode_time)
+
+    def observe(self, kind, request, elapsed, error_indication, error_status):
+        histogram = self.latency.get(kind)
+        if histogram is None:
+            histogram = self.latency[kind] = LatencyHistogram()
+        histogram.observe(elapsed)
+        self.requests += 1
+        self.request_time += elapsed
+        if request.sent is not None:
+            self.encode_time += request.sent - request.start
+
+        if error_indication:
+            if isinstance(error_indication, errind.RequestTimedOut):
+                self.timeouts += 1
+            else:
+                name = str(error_indication)
+                self.errors[name] = self.errors.get(name, 0) + 1
+        elif error_status:
+            name = error_status.prettyPrint()
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'timeouts': self.timeouts,
+            'retransmits': self.retransmits,
+            'errors': dict(self.errors),
+            'bytes_out': self.bytes_out,
+            'bytes_in': self.bytes_in,
+            'encode_time': self.encode_time,
+            'decode_time': self.decode_time,
+            'wait_time': self.wait_time,
+            'latency': {kind: histogram.as_dict() for kind, histogram in self.latency.items()},
+        }
+
+
+class ClientStats:
+    """Statistiky všech zařízení jednoho SnmpClient"""
+
+    def __init__(self):
+        self.devices = {}
+
+    def device(self, target):
+        key = f"{target.host}:{target.port}"
+        stats = self.devices.get(key)
+        if stats is None:
+            stats = self.devices[key] = DeviceStats()
+        return stats
+
+    def snapshot(self):
+        """Kopie všech čítačů jako slovník (pro JSON, export, UI)"""
+        return {key: stats.as_dict() for key, stats in self.devices.items()}
+
+
+class Request:
+    """Jeden SNMP požadavek (PDU) v průběhu"""
+
+    __slots__ = ('start', 'sent')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.sent = None
+
+
+def begin_request():
+    """Začne měřit požadavek v aktuálním tasku, vrací (Request, token)"""
+    request = Request()
+    return request, _current.set(request)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+class MeteredUdpTransport(udp.UdpAsyncioTransport):
+    """UDP transport pysnmp, který počítá bajty, opakování a čas dekódování"""
+
+    meter = None  # DeviceStats, nastaví MeteredTransportTarget
+
+    def send_message(self, outgoingMessage, transportAddress):
+        meter = self.meter
+        if meter is not None:
+            meter.bytes_out += len(outgoingMessage)
+            request = _current.get()
+            if request is None or request.sent is not None:
+                # Odesláno z časovače pysnmp mimo task požadavku = opakování
+                meter.retransmits += 1
+            else:
+                request.sent = time.perf_counter()
+        super().send_message(outgoingMessage, transportAddress)
+
+    def datagram_received(self, datagram, transportAddress):
+        if self.meter is not None:
+            self.meter.bytes_in += len(datagram)
+        self.loop.call_soon(self._timed_receive, transportAddress, datagram)
+
+    def _timed_receive(self, transportAddress, datagram):
+        start = time.perf_counter()
+        try:
+            self._callback_function(self, transportAddress, datagram)
+        finally:
+            if self.meter is not None:
+                self.meter.decode_time += time.perf_counter() - start
+
+
+class MeteredTransportTarget(UdpTransportTarget):
+    """UdpTransportTarget s měřeným transportem"""
+
+    PROTO_TRANSPORT = MeteredUdpTransport
+    meter = None
+
+    def open_client_mode(self):
+        transport = super().open_client_mode()
+        transport.meter = self.meter
+        return transport
@@ -0,0 +1,77 @@
+"""
+SNMP cíl a chyba požadavku
+Bez importu pysnmp - cíl lze sestavit (a podle něj číst cache) dřív, než
+se načte SNMP stack; pysnmp objekty vytváří až auth_data().
+"""
+
+import re
+from dataclasses import dataclass, field
+
+
+class SnmpError(Exception):
+    """Chyba SNMP požadavku (errorIndication nebo errorStatus)
+
+    indication je původní errorIndication pysnmp (None u errorStatus).
+    """
+
+    def __init__(self, message, indication=None):
+        super().__init__(message)
+        self.indication = indication
+
+
+class SnmpTimeout(SnmpError):
+    """Agent neodpověděl do timeoutu (errind.RequestTimedOut)"""
+
+
+class Response(dict):
+    """Výsledek SNMP požadavku (slovník) s časem přijetí odpovědi
+
+    timestamp je time.time() přijetí (poslední) odpovědi právě tohoto
+    požadavku, u přehrávání čas ze záznamu - čas měření jeho čítačů.
+    """
+
+    __slots__ = ('timestamp',)
+
+    def __init__(self, items=(), timestamp=None):
+        super().__init__(items)
+        self.timestamp = timestamp
+
+
+@dataclass(frozen=True)
+class SnmpTarget:
+    """Adresa a přihlašovací údaje SNMP agenta
+
+    Pro version 'v3' se místo community použije USM uživatel user s protokoly
+    podle usm.AUTH_PROTOCOLS / PRIV_PROTOCOLS; prázdné auth_key znamená
+    noAuthNoPriv, prázdné priv_key authNoPriv.
+    """
+    host: str
+    community: str = 'public'
+    version: str = 'v2c'
+    port: int = 161
+    timeout: float = 1.0
+    retries: int = 5
+    user: str = ''
+    auth_protocol: str = 'SHA'
+    auth_key: str = field(default='', repr=False)
+    priv_protocol: str = 'AES'
+    priv_key: str = field(default='', repr=False)
+    context: str = ''
+
+    @property
+    def mp_model(self):
+        return 0 if self.version == 'v1' else 1
+
+    def auth_data(self):
+        """CommunityData nebo UsmUserData pro pysnmp"""
+        if self.version == 'v3':
+            from .usm import usm_user
+            return usm_user(self)
+        from pysnmp.hlapi.v3arch import CommunityData
+        return CommunityData(self.community, mpModel=self.mp_model)
+
+
+def device_name(target):
+    """Jméno zařízení pro adresáře a soubory (port agenta jen pokud není 161)"""
+    name = target.host if target.port == 161 else f"{target.host}_{target.port}"
+    return re.sub(r'[^A-Za-z0-9._-]', '_', name)
@@ -0,0 +1,188 @@
+"""
+SNMPv3 USM
+Protokoly auth/priv podle jména, hash hesel jednou pro každou sadu údajů
+(ne pro každé zařízení) a cache engine ID a boots/time agentů, díky které
+odpadá discovery při startu i periodické znovuzjišťování v pysnmp.
+
+pysnmp se importuje až ve funkcích, které ho potřebují - seznamy protokolů
+a EngineCache jsou k dispozici bez něj (výběr v GUI, argumenty CLI).
+"""
+
+import functools
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+
+from .target import device_name
+
+# Jméno protokolu -> konstanta v pysnmp.entity.config
+AUTH_PROTOCOLS = {
+    'none': 'USM_AUTH_NONE',
+    'MD5': 'USM_AUTH_HMAC96_MD5',
+    'SHA': 'USM_AUTH_HMAC96_SHA',
+    'SHA224': 'USM_AUTH_HMAC128_SHA224',
+    'SHA256': 'USM_AUTH_HMAC192_SHA256',
+    'SHA384': 'USM_AUTH_HMAC256_SHA384',
+    'SHA512': 'USM_AUTH_HMAC384_SHA512',
+}
+
+PRIV_PROTOCOLS = {
+    'none': 'USM_PRIV_NONE',
+    'DES': 'USM_PRIV_CBC56_DES',
+    '3DES': 'USM_PRIV_CBC168_3DES',
+    'AES': 'USM_PRIV_CFB128_AES',
+    'AES192': 'USM_PRIV_CFB192_AES',
+    'AES256': 'USM_PRIV_CFB256_AES',
+}
+
+
+@functools.lru_cache(maxsize=256)
+def master_keys(auth_protocol, auth_key, priv_protocol, priv_key):
+    """Master klíče z hesel (RFC 3414 A.2 - ~1 MB hashování na každé heslo)
+
+    Sdílí se všemi enginy a zařízeními se stejnými údaji; lokalizaci pro
+    engine ID agenta (jeden krátký hash) udělá pysnmp při prvním požadavku
+    a drží ji v tabulce uživatelů enginu.
+    """
+    from pysnmp.entity import config
+    from pysnmp.proto.rfc1902 import OctetString
+
+    auth = getattr(config, AUTH_PROTOCOLS[auth_protocol])
+    priv = getattr(config, PRIV_PROTOCOLS[priv_protocol])
+    auth_master = priv_master = None
+    if auth_key and auth != config.USM_AUTH_NONE:
+        auth_master = config.AUTH_SERVICES[auth].hash_passphrase(OctetString(auth_key))
+        if priv_key and priv != config.USM_PRIV_NONE:
+            priv_master = config.PRIV_SERVICES[priv].hash_passphrase(auth, OctetString(priv_key))
+    return auth_master, priv_master
+
+
+def usm_user(target):
+    """UsmUserData pro cíl s již zahashovanými (master) klíči"""
+    from pysnmp.entity import config
+    from pysnmp.hlapi.v3arch import USM_KEY_TYPE_MASTER, UsmUserData
+
+    auth_master, priv_master = master_keys(
+        target.auth_protocol, target.auth_key, target.priv_protocol, target.priv_key
+    )
+    return UsmUserData(
+        target.user,
+        authKey=auth_master,
+        privKey=priv_master,
+        authProtocol=getattr(config, AUTH_PROTOCOLS[target.auth_protocol]) if auth_master is not None else None,
+        privProtocol=getattr(config, PRIV_PROTOCOLS[target.priv_protocol]) if priv_master is not None else None,
+        authKeyType=USM_KEY_TYPE_MASTER,
+        privKeyType=USM_KEY_TYPE_MASTER,
+    )
+
+
+@dataclass
+class EngineInfo:
+    """Engine ID a hodiny autoritativního enginu agenta"""
+    engine_id: str   # hex
+    boots: int       # snmpEngineBoots
+    time: int        # snmpEngineTime v okamžiku seen
+    seen: float      # time.time() poslední autentizované odpovědi
+
+    def estimated_time(self, now):
+        return self.time + int(now - self.seen)
+
+
+class EngineCache:
+    """Engine ID a boots/time agentů, volitelně i na disku
+
+    Ukládá se jen identita a hodiny agenta, žádné klíče. Na disk se zapisuje
+    jen při změně engine ID nebo boots, ne po každé odpovědi.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._entries = {}
+
+    def _path(self, target):
+        return os.path.join(self.directory, f"{device_name(target)}.json")
+
+    def get(self, target):
+        key = (target.host, target.port)
+        info = self._entries.get(key)
+        if info is None and self.directory:
+            try:
+                with open(self._path(target), encoding='utf-8') as f:
+                    info = self._entries[key] = EngineInfo(**json.load(f))
+            except (OSError, ValueError, TypeError):
+                return None
+        return info
+
+    def update(self, target, engine_id, boots, engine_time, now=None):
+        now = time.time() if now is None else now
+        old = self.get(target)
+        info = EngineInfo(engine_id, boots, engine_time, now)
+        self._entries[(target.host, target.port)] = info
+        if self.directory and (old is None or (old.engine_id, old.boots) != (engine_id, boots)):
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(target)
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(asdict(info), f)
+            os.replace(path + '.tmp', path)
+
+    def drop(self, target):
+        self._entries.pop((target.host, target.port), None)
+        if self.directory:
+            try:
+                os.remove(self._path(target))
+            except OSError:
+                pass
+
+
+def watch_engine(engine, target, cache):
+    """Zapisuje engine ID a hodiny agenta z každé autentizované odpovědi do cache"""
+    def observe(snmpEngine, execpoint, variables, cbCtx):
+        cache.update(
+            target, variables['securityEngineId'].asOctets().hex(),
+            int(variables['snmpEngineBoots']), int(variables['snmpEngineTime'])
+        )
+
+    engine.observer.register_observer(observe, 'rfc3414.processIncomingMsg')
+
+
+def _engine_tables(engine):
+    """Vnitřní cache pysnmp: (engine ID podle adresy, hodiny podle engine ID)"""
+    mp = engine.message_processing_subsystems.get(3)
+    usm = engine.security_models.get(3)
+    return (getattr(mp, '_SnmpV3MessageProcessingModel__engineIdCache', None),
+            getattr(usm, '_SnmpUSMSecurityModel__timeline', None))
+
+
+def prime_engine(engine, transport, info, now=None):
+    """Vloží známý engine ID a boots/time agenta do pysnmp místo discovery
+
+    pysnmp drží obojí ve vnitřních slovnících a po 300 s je zahazuje, takže
+    by se discovery opakovala; volá se před každým požadavkem a doplní jen
+    to, co chybí. Bez těchto slovníků (jiná verze pysnmp) nechá discovery
+    na pysnmp.
+    """
+    from pysnmp.proto.rfc1902 import OctetString
+
+    engine_ids, timeline = _engine_tables(engine)
+    if engine_ids is None or timeline is None:
+        return
+
+    address = transport.get_transport_info()
+    known = engine_ids.get(address)
+    if known is not None:
+        engine_id = known['securityEngineId']  # Co pysnmp zjistil sám, má přednost
+        if engine_id in timeline:
+            return
+    else:
+        engine_id = OctetString(hexValue=info.engine_id)
+        engine_ids[address] = {
+            'securityEngineId': engine_id,
+            'contextEngineId': engine_id,
+            'contextName': OctetString(''),
+        }
+
+    now = time.time() if now is None else now
+    if engine_id not in timeline and engine_id.asOctets().hex() == info.engine_id:
+        engine_time = info.estimated_time(now)
+        timeline[engine_id] = (info.boots, engine_time, engine_time, int(now))
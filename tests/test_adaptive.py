@@ -0,0 +1,106 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+from snmpmon.adaptive import AdaptivePolicy, AdaptiveScheduler, TokenBucket
+from snmpmon.counters import PortRates
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'bench'))
+
+
+def test_token_bucket_spaces_pdus():
+    bucket = TokenBucket(5.0)
+    delays = [bucket.reserve(10.0) for _ in range(6)]
+    assert delays == pytest.approx([0.0, 0.2, 0.4, 0.6, 0.8, 1.0])
+    # Po pauze se naplní jen do burst, ne za celou dobu nečinnosti
+    assert bucket.reserve(100.0) == 0.0
+    assert bucket.reserve(100.0) == pytest.approx(0.2)
+
+
+def test_token_bucket_burst():
+    bucket = TokenBucket(2.0, burst=3.0)
+    assert [bucket.reserve(0.0) for _ in range(4)] == pytest.approx([0.0, 0.0, 0.0, 0.5])
+
+
+def test_scheduler_scales_to_budget():
+    policy = AdaptivePolicy(budget_rps=5.0, ports_per_request=10)
+    scheduler = AdaptiveScheduler([str(i) for i in range(200)], 2.0, policy, 0.0)
+    # 200 portů / 2 s = 10 požadavků/s -> intervaly dvojnásobné
+    assert scheduler.scale == pytest.approx(2.0)
+    scheduler.update('0', PortRates(in_rate=1e6, interval=2.0), '1', 0.0)
+    assert scheduler.ports['0'].next_due == pytest.approx(scheduler.ports['0'].interval * scheduler.scale)
+
+
+def test_adaptive_poller_stays_within_pdu_budget(monkeypatch):
+    bench_suite = pytest.importorskip('bench_suite')
+    from snmpmon import stats
+    from snmpmon.poller import AsyncPoller, Device, PollPolicy
+    from snmpmon.session import SnmpClient
+    from snmpmon.target import SnmpTarget
+
+    sent = []
+    original = stats.MeteredUdpTransport.send_message
+
+    def send_message(transport, message, address):
+        sent.append(asyncio.get_running_loop().time())
+        return original(transport, message, address)
+
+    monkeypatch.setattr(stats.MeteredUdpTransport, 'send_message', send_message)
+
+    budget = 5.0
+    duration = 6.0
+    proc, port = bench_suite.start_agent_process(200, 0.0, 0.0)
+    try:
+        policy = PollPolicy(adaptive=AdaptivePolicy(min_interval=1.0, max_interval=10.0, budget_rps=budget))
+        device = Device(SnmpTarget('127.0.0.1', port=port), interval=1.0)  # Discovery + ifHighSpeed + GET
+        poller = AsyncPoller([device], lambda sample: None, policy, SnmpClient())
+
+        async def main():
+            stop = asyncio.Event()
+            asyncio.get_running_loop().call_later(duration, stop.set)
+            await poller.run(stop)
+            poller.client.close()
+
+        asyncio.run(main())
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    assert poller.samples > 0 and poller.errors == 0
+    # Rozpočet TokenBucket: v okně T sekund nejvýš burst + rate * T PDU (na drátě)
+    assert len(sent) <= budget * duration + 1
+    for i, start in enumerate(sent):
+        assert sum(1 for t in sent[i:] if t <= start + 1.0) <= budget + 1
+
+
+def test_walk_steps_draw_from_budget():
+    bench_suite = pytest.importorskip('bench_suite')
+    from snmpmon.counters import OID
+    from snmpmon.session import SnmpClient
+    from snmpmon.target import SnmpTarget
+
+    proc, port = bench_suite.start_agent_process(10, 0.0, 0.0)
+    try:
+        async def main(version):
+            client = SnmpClient()
+            target = SnmpTarget('127.0.0.1', port=port, version=version)
+            client.budgets[target] = TokenBucket(20.0)
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            descr = await client.walk(target, OID['ifDescr'])
+            elapsed = loop.time() - start
+            walks = client.stats.device(target).latency['walk'].count
+            client.close()
+            return descr, elapsed, walks
+
+        for version in ('v2c', 'v1'):
+            descr, elapsed, walks = asyncio.run(main(version))
+            # 10 řádků + GETNEXT za konec sloupce, každý krok čeká na token (20/s)
+            assert list(descr) == [str(i) for i in range(1, 11)]
+            assert walks == 11
+            assert elapsed >= 10 / 20.0 - 0.05
+    finally:
+        proc.terminate()
+        proc.wait()
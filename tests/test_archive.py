@@ -0,0 +1,68 @@
+import os
+
+from snmpmon.archive import RECORD, ArchivePolicy, ArchiveWriter, append_records, compact_segment, maintain, scan_segment
+from snmpmon.counters import PortRates, PortStats, Sample
+
+DAY = 86400 * 20000  # 2024-10-04 UTC, půlnoc
+
+
+def record(timestamp, in_octets, in_rate, interval=1.0):
+    return RECORD.pack(timestamp, in_octets, 0, 0, 0, 0, 0, 0, in_rate, 0.0, 0.0, 0.0, interval)
+
+
+def test_compact_merges_existing_aggregate(tmp_path):
+    path = str(tmp_path / '2024-10-04.bin')
+    append_records(path, b''.join(record(DAY + i, 100 * i, 100.0) for i in range(60)))
+    compact_segment(path, 60)
+    # Pozdě dopsaná měření téhož dne (např. po restartu) - druhá kompakce
+    append_records(path, b''.join(record(DAY + 60 + i, 6000 + 300 * i, 300.0) for i in range(30)))
+    append_records(path, record(DAY + 120, 20000, 50.0, 2.0))
+    compact_segment(path, 60)
+
+    assert not os.path.exists(path)
+    records = list(scan_segment(str(tmp_path / '2024-10-04.60s.bin')))
+    assert [r[0] for r in records] == [DAY + 59, DAY + 89, DAY + 120]
+    assert records[0][8] == 100.0 and records[0][12] == 60.0
+    assert records[1][8] == 300.0 and records[1][12] == 30.0
+    assert records[2][1] == 20000 and records[2][12] == 2.0
+
+
+def test_compact_merge_weights_by_interval(tmp_path):
+    path = str(tmp_path / '2024-10-04.bin')
+    append_records(path, record(DAY + 10, 1000, 100.0, 30.0))
+    compact_segment(path, 60)
+    append_records(path, record(DAY + 20, 2000, 400.0, 10.0))
+    compact_segment(path, 60)
+
+    (merged,) = scan_segment(str(tmp_path / '2024-10-04.60s.bin'))
+    assert merged[1] == 2000
+    assert merged[8] == (100.0 * 30 + 400.0 * 10) / 40
+    assert merged[12] == 40.0
+
+
+def test_maintain_reports_and_continues(tmp_path):
+    directory = tmp_path / 'dev' / '1'
+    directory.mkdir(parents=True)
+    (directory / '2024-10-01.bin').write_bytes(b'NOTARCHIVE' * 4)  # Cizí formát
+    append_records(str(directory / '2024-10-02.bin'), record(DAY - 2 * 86400, 1, 1.0))
+    errors = []
+    maintain(str(tmp_path), ArchivePolicy(retention_days=0, compact_after_days=1), now=DAY, on_error=errors.append)
+
+    assert len(errors) == 1
+    assert sorted(os.listdir(directory)) == ['2024-10-01.bin', '2024-10-02.60s.bin']
+
+
+def test_writer_survives_write_errors(tmp_path):
+    blocker = tmp_path / 'dev'
+    blocker.write_text('soubor místo adresáře')  # Zápis do dev/1/... selže
+    errors = []
+    policy = ArchivePolicy(retention_days=0, compact_after_days=0)
+    writer = ArchiveWriter(str(tmp_path), policy, flush_interval=0.01, on_error=errors.append)
+    sample = Sample('h', '1', DAY, PortStats(in_octets=1), PortRates(interval=1.0))
+    writer.add(sample, 'dev')
+    writer.add(sample, 'ok')
+    writer.close()
+
+    assert writer.errors == len(errors) == 1
+    assert writer.dropped == 1 and writer.written == 1
+    assert len(list(scan_segment(str(tmp_path / 'ok' / '1' / '2024-10-04.bin')))) == 1
@@ -0,0 +1,129 @@
+import pytest
+
+from snmpmon import deltas as deltas_module
+from snmpmon.counters import WRAP_LIMIT
+from snmpmon.deltas import CounterBank
+
+# Řádky: (klíč, narrow), každý krok: (čas, {klíč: (čítače, sysUpTime, diskontinuita)})
+ROWS = [('wrap32', False), ('reset64', False), ('restart', False), ('disc', False), ('limit', False), ('v1', True)]
+STEPS = [
+    (1000.0, {
+        'wrap32': ([10, 20, 30, 40, 2 ** 32 - 100, 0], 100000, 0),
+        'reset64': ([5000, 5000, 50, 50, 0, 0], 100000, 0),
+        'restart': ([100, 100, 1, 1, 0, 0], 100000, 0),
+        'disc': ([100, 100, 1, 1, 0, 0], 100000, 0),
+        'limit': ([0, 0, 0, 0, WRAP_LIMIT + 10, WRAP_LIMIT + 11], 100000, 0),
+        'v1': ([2 ** 32 - 500, 2 ** 32 - 10, 7, 7, 0, 0], 100000, 0),
+    }),
+    (1010.0, {
+        'wrap32': ([1010, 2020, 40, 50, 50, 0], 101000, 0),         # in_errors přetekl o 150
+        'reset64': ([100, 5100, 60, 60, 0, 0], 101000, 0),          # Counter64 klesl = reset
+        'restart': ([200, 200, 2, 2, 0, 0], 50, 0),                 # sysUpTime od nuly
+        'disc': ([200, 200, 2, 2, 0, 0], 101000, 4242),             # ifCounterDiscontinuityTime
+        'limit': ([0, 0, 0, 0, 10, 9], 101000, 0),                  # pokles o 2^31 = reset
+        'v1': ([1500, 90, 8, 8, 0, 0], 101000, 0),                  # Counter32 oktety přetekly
+    }),
+    (1020.0, {
+        'wrap32': ([2010, 3020, 50, 60, 60, 1], 102010, 0),
+        'reset64': ([1100, 6100, 70, 70, 0, 0], 102000, 0),
+        'restart': ([1200, 1200, 3, 3, 0, 0], 1050, 0),
+        'disc': ([1200, 1200, 3, 3, 0, 0], 102000, 4242),
+        'limit': ([0, 0, 0, 0, WRAP_LIMIT + 20, 9], 102000, 0),     # Růst o víc než 2^31 je pořád růst
+        'v1': ([2500, 1090, 9, 9, 0, 0], 102000, 0),
+    }),
+]
+
+
+def run(monkeypatch, numpy):
+    """Projde STEPS jednou CounterBank, vrací výsledky kroků jako seznamy"""
+    with monkeypatch.context() as m:
+        if not numpy:
+            m.setattr(deltas_module, 'np', None)
+            m.setattr(deltas_module, '_numpy_loaded', True)
+        bank = CounterBank(capacity=2)  # Růst polí během běhu
+        results = []
+        for now, values in STEPS:
+            rows = []
+            for key, narrow in ROWS:
+                rows += bank.rows([key], narrow=narrow)
+            counters, uptime, discontinuity = [], [], []
+            for key, _ in ROWS:
+                row_counters, row_uptime, row_discontinuity = values[key]
+                counters += row_counters
+                uptime.append(row_uptime)
+                discontinuity.append(row_discontinuity)
+            result = bank.update(rows, counters, uptime, discontinuity, now)
+            port_rates, port_deltas = result.port_rates()
+            results.append((
+                [list(map(int, row)) for row in port_deltas],
+                [float(interval) for interval in result.intervals],
+                [bool(ok) for ok in result.valid],
+                port_rates,
+                result.total(),
+            ))
+        return results
+
+
+def by_key(result):
+    deltas, intervals, valid, rates, _ = result
+    return {key: (d, i, v, r) for (key, _), d, i, v, r in zip(ROWS, deltas, intervals, valid, rates)}
+
+
+def test_python_backend(monkeypatch):
+    first, second, third = run(monkeypatch, numpy=False)
+    assert first[2] == [False] * len(ROWS)
+    assert all(row == [0] * 6 for row in first[0])
+    assert first[4] is None
+
+    step = by_key(second)
+    assert step['wrap32'][0] == [1000, 2000, 10, 10, 150, 0]
+    assert step['wrap32'][1] == 10.0
+    assert step['wrap32'][3].in_rate == 100.0
+    assert step['v1'][0] == [2000, 100, 1, 1, 0, 0]
+    for key in ('reset64', 'restart', 'disc', 'limit'):
+        deltas, _, ok, rates = step[key]
+        assert not ok and rates is None
+        assert deltas == [0] * 6  # Žádné rozdíly přes restart/reset (historie, souhrn)
+
+    # Po restartu, resetu a diskontinuitě se rychlosti počítají od nových hodnot
+    step = by_key(third)
+    assert third[2] == [True] * len(ROWS)
+    assert step['restart'][0][0] == 1000 and step['restart'][1] == 10.0
+    assert step['limit'][0][4] == WRAP_LIMIT + 10
+    assert step['wrap32'][1] == pytest.approx(10.1)  # Interval podle sysUpTime agenta
+
+
+def test_backends_agree(monkeypatch):
+    pytest.importorskip('numpy')
+    python = run(monkeypatch, numpy=False)
+    vectorized = run(monkeypatch, numpy=True)
+    for (pd, pi, pv, pr, pt), (vd, vi, vv, vr, vt) in zip(python, vectorized):
+        assert pd == vd
+        assert pi == pytest.approx(vi)
+        assert pv == vv
+        assert pr == vr
+        if pt is None:
+            assert vt is None
+        else:
+            assert pt[0] == pytest.approx(vt[0])
+            assert pt[1] == pytest.approx(vt[1])
+            assert pt[2] == vt[2]
+
+
+def test_wrap_limit_boundary(monkeypatch):
+    """Counter32, který klesl o víc než polovinu rozsahu, přetekl; menší pokles je reset"""
+    for numpy in (False, True):
+        if numpy:
+            pytest.importorskip('numpy')
+        with monkeypatch.context() as m:
+            if not numpy:
+                m.setattr(deltas_module, 'np', None)
+                m.setattr(deltas_module, '_numpy_loaded', True)
+            bank = CounterBank()
+            rows = bank.rows(['wrap', 'reset'])
+            bank.update(rows, [0, 0, 0, 0, WRAP_LIMIT + 11, 0] * 2, [100, 100], [0, 0], 0.0)
+            # Pokles o 2^31 + 1 (rozdíl WRAP_LIMIT - 1) vs. pokles o 2^31 (rozdíl WRAP_LIMIT)
+            result = bank.update(rows, [0, 0, 0, 0, 10, 0] + [0, 0, 0, 0, 11, 0], [200, 200], [0, 0], 1.0)
+            port_rates, port_deltas = result.port_rates()
+            assert port_rates[0] is not None and int(port_deltas[0][4]) == WRAP_LIMIT - 1
+            assert port_rates[1] is None and list(map(int, port_deltas[1])) == [0] * 6
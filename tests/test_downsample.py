@@ -0,0 +1,39 @@
+import math
+
+from snmpmon.downsample import lttb
+
+
+def test_empty_and_single_point():
+    assert lttb([], [], 100) == ([], [])
+    assert lttb([1.0], [5.0], 100) == ([1.0], [5.0])
+    assert lttb([1.0], [5.0], 1) == ([1.0], [5.0])
+
+
+def test_threshold_not_below_length_returns_copy():
+    xs, ys = (0, 1, 2, 3), (4, 5, 6, 7)
+    for threshold in (4, 5, 1000):
+        out = lttb(xs, ys, threshold)
+        assert out == ([0, 1, 2, 3], [4, 5, 6, 7])
+        assert isinstance(out[0], list)
+
+
+def test_threshold_below_three_returns_input():
+    xs = list(range(10))
+    assert lttb(xs, xs, 2) == (xs, xs)
+
+
+def test_keeps_endpoints_and_spike():
+    xs = list(range(1000))
+    ys = [math.sin(x / 50) for x in xs]
+    ys[437] = 25.0
+    out_x, out_y = lttb(xs, ys, 50)
+    assert len(out_x) == len(out_y) == 50
+    assert (out_x[0], out_x[-1]) == (0, 999)
+    assert out_x == sorted(out_x)
+    assert 437 in out_x and max(out_y) == 25.0
+
+
+def test_memoryview_input():
+    xs = memoryview(bytearray(range(10)))
+    out_x, out_y = lttb(xs, xs, 5)
+    assert len(out_x) == 5 and out_x[0] == 0 and out_x[-1] == 9
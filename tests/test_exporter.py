@@ -0,0 +1,20 @@
+from snmpmon.counters import PortRates, PortStats, Sample
+from snmpmon.exporter import MetricsCache
+
+
+def sample(port, in_octets):
+    return Sample('10.0.0.1', '1', 1700000000.0, PortStats(in_octets=in_octets), PortRates(interval=1.0), port)
+
+
+def test_agents_on_one_host_are_separate_series():
+    cache = MetricsCache()
+    cache.update(sample(161, 100))
+    cache.update(sample(16100, 200))
+    cache.update(sample(161, 300))
+
+    payload = cache.render().decode()
+    assert len(cache) == 2
+    assert 'snmpmon_if_in_octets_total{host="10.0.0.1",port="161",ifindex="1"} 300\n' in payload
+    assert 'snmpmon_if_in_octets_total{host="10.0.0.1",port="16100",ifindex="1"} 200\n' in payload
+    assert payload.endswith('# EOF\n')
+
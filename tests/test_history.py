@@ -0,0 +1,68 @@
+import pytest
+
+from snmpmon.history import COLUMNS, HistoryStore, RingBuffer, SeriesHistory
+
+
+def values(in_octets, interval=1.0):
+    return [in_octets, 0, 0, 0, 0, 0, interval]
+
+
+def test_ring_buffer_overwrites_oldest():
+    ring = RingBuffer(4)
+    for t in range(6):
+        ring.append(float(t), values(t * 10))
+    assert len(ring) == 4
+    assert list(ring.series('in_octets')) == [(2.0, 20.0), (3.0, 30.0), (4.0, 40.0), (5.0, 50.0)]
+
+
+def test_ring_buffer_window_of_wrapped_buffer():
+    ring = RingBuffer(4)
+    for t in range(6):
+        ring.append(float(t), values(t))
+    # Fyzicky přetočený buffer - okno ze dvou úseků bez kopírování
+    segments = ring.window(3.0, 5.0)
+    assert [list(ts) for ts, _ in segments] == [[3.0], [4.0]]
+    assert [list(data['in_octets']) for _, data in segments] == [[3.0], [4.0]]
+    assert ring.window(10.0) == []
+
+
+def test_series_per_second():
+    ring = RingBuffer(8)
+    ring.append(0.0, values(500, interval=5.0))
+    ring.append(5.0, values(100, interval=0.0))  # Nulový interval nedělí nulou
+    assert list(ring.series('in_octets', per_second=True)) == [(0.0, 100.0), (5.0, 0.0)]
+
+
+def test_rollups_sum_buckets():
+    history = SeriesHistory(((0, 600), (60, 10), (3600, 4)))
+    for t in range(0, 180, 10):
+        history.append(float(t), values(100, interval=10.0))
+    history.append(3600.0, values(7, interval=10.0))
+
+    # Bucket se zapíše až s měřením z dalšího, s časem začátku bucketu
+    minutes = list(zip(history[60].series('in_octets'), history[60].series('interval')))
+    assert minutes == [((0.0, 600.0), (0.0, 60.0)), ((60.0, 600.0), (60.0, 60.0)), ((120.0, 600.0), (120.0, 60.0))]
+    assert list(history[3600].series('in_octets')) == [(0.0, 1800.0)]
+    assert len(history[0]) == 19
+
+
+def test_covering_picks_finest_tier_with_data():
+    history = SeriesHistory(((0, 5), (60, 100)))
+    for t in range(10):
+        history.append(float(t * 30), values(1))
+    assert history.covering(200.0) is history[0]   # Měření od 150 s jsou ještě v bufferu
+    assert history.covering(0.0) is history[60]
+
+
+def test_store_records_by_key():
+    store = HistoryStore(((0, 10),))
+    store.record(('h', 161, '1'), 1.0, [1, 2, 3, 4, 5, 6], 1.0)
+    assert ('h', 161, '1') in store and len(store) == 1
+    assert list(store[('h', 161, '1')][0].series('interval')) == [(1.0, 1.0)]
+    assert store.nbytes == 10 * (8 + 4 * len(COLUMNS))
+
+
+def test_float32_columns_precision():
+    ring = RingBuffer(1)
+    ring.append(0.0, values(123456789012))
+    assert next(ring.series('in_octets'))[1] == pytest.approx(123456789012, rel=1e-7)
@@ -0,0 +1,119 @@
+import asyncio
+
+from snmpmon.counters import OID
+from snmpmon.ifcache import (
+    CHECK_OIDS, ROW_COLUMNS, STATUS_COLUMNS, InterfaceCache, MemoryInterfaceCache, cached_rows, fetch_interfaces,
+)
+from snmpmon.replay import Recorder, ReplayClient, ReplayFinished
+from snmpmon.target import SnmpTarget
+
+TARGET = SnmpTarget('192.0.2.1')
+CHECK = [OID[key] for key in CHECK_OIDS]
+FULL = [OID[key] for _, key in ROW_COLUMNS]
+STATUS = [OID[key] for _, key in STATUS_COLUMNS]
+BOOT = 1000000.0
+
+
+def check(recorder, now, object_id='1.3.6.1.4.1.9'):
+    """Kontrolní GET agenta nastartovaného v BOOT"""
+    recorder.record('get', TARGET, CHECK, {
+        OID['sysObjectID']: object_id, OID['sysUpTime']: str(int((now - BOOT) * 100)),
+        OID['ifNumber']: '2', OID['ifTableLastChange']: '0',
+    }, now)
+
+
+def full(recorder, now, oper='1'):
+    recorder.record('table', TARGET, FULL, {
+        OID['ifDescr']: {'1': 'eth0', '2': 'eth1'},
+        OID['ifAdminStatus']: {'1': '1', '2': '1'},
+        OID['ifOperStatus']: {'1': oper, '2': '1'},
+        OID['ifAlias']: {'1': 'uplink', '2': ''},
+        OID['ifLastChange']: {'1': '100', '2': '200'},
+    }, now)
+
+
+def status(recorder, now, oper, last_change):
+    recorder.record('table', TARGET, STATUS, {
+        OID['ifAdminStatus']: {idx: '1' for idx in oper},
+        OID['ifOperStatus']: oper,
+        OID['ifLastChange']: last_change,
+    }, now)
+
+
+def load(path, cache):
+    """Všechna načtení ze záznamu se stejnou cache, vrací [(rows, source)]"""
+    client = ReplayClient(path, speed=0)
+    results = []
+    try:
+        while True:
+            results.append(asyncio.run(fetch_interfaces(client, TARGET, cache)))
+    except ReplayFinished:
+        return results
+    finally:
+        client.close()
+
+
+def test_full_then_cache_rereads_port_status(tmp_path):
+    path = str(tmp_path / 'a.rec.gz')
+    recorder = Recorder(path)
+    check(recorder, BOOT + 100)
+    full(recorder, BOOT + 100)
+    # Port 1 spadl: ifTableLastChange ani ifNumber se nezměnily, ifLastChange u tohoto agenta ano.
+    # U portu 2 se změnil jen ifAdminStatus bez ifLastChange - stav se přesto převezme.
+    check(recorder, BOOT + 200)
+    status(recorder, BOOT + 200, {'1': '1', '2': '2'}, {'1': '100', '2': '200'})
+    recorder.close()
+
+    cache = MemoryInterfaceCache()
+    (rows, source), (cached, cached_source) = load(path, cache)
+    assert source == 'full'
+    assert rows['1'] == {'descr': 'eth0', 'admin': '1', 'oper': '1', 'alias': 'uplink', 'last_change': '100'}
+    assert cached_source == 'cache'
+    assert cached['2']['oper'] == '2' and cached['2']['descr'] == 'eth1'
+    assert cached_rows(cache, TARGET) == cached
+
+
+def test_partial_refetches_changed_rows(tmp_path):
+    path = str(tmp_path / 'b.rec.gz')
+    recorder = Recorder(path)
+    check(recorder, BOOT + 100)
+    full(recorder, BOOT + 100)
+    check(recorder, BOOT + 200)
+    status(recorder, BOOT + 200, {'1': '2', '2': '1', '3': '1'}, {'1': '15000', '2': '200', '3': '15000'})
+    changed = [f"{OID[key]}.{idx}" for idx in ('1', '3') for _, key in ROW_COLUMNS]
+    recorder.record('get', TARGET, changed, {
+        **{f"{OID[key]}.1": value for (_, key), value in zip(ROW_COLUMNS, ('eth0', '1', '2', 'uplink', '15000'))},
+        **{f"{OID[key]}.3": value for (_, key), value in zip(ROW_COLUMNS, ('eth2', '1', '1', 'new', '15000'))},
+    }, BOOT + 200)
+    recorder.close()
+
+    (_, _), (rows, source) = load(path, MemoryInterfaceCache())
+    assert source == 'partial'
+    assert list(rows) == ['1', '2', '3']
+    assert rows['1']['oper'] == '2' and rows['1']['last_change'] == '15000'
+    assert rows['3']['descr'] == 'eth2'
+    assert rows['2']['alias'] == ''
+
+
+def test_restarted_agent_reads_full_table(tmp_path):
+    path = str(tmp_path / 'c.rec.gz')
+    recorder = Recorder(path)
+    check(recorder, BOOT + 100)
+    full(recorder, BOOT + 100)
+    recorder.record('get', TARGET, CHECK, {
+        OID['sysObjectID']: '1.3.6.1.4.1.9', OID['sysUpTime']: '500',  # Restart - sysUpTime 5 s
+        OID['ifNumber']: '2', OID['ifTableLastChange']: '0',
+    }, BOOT + 300)
+    full(recorder, BOOT + 300, oper='2')
+    recorder.close()
+
+    sources = [source for _, source in load(path, MemoryInterfaceCache())]
+    assert sources == ['full', 'full']
+
+
+def test_disk_cache_round_trip(tmp_path):
+    cache = InterfaceCache(str(tmp_path / 'ifcache'))
+    assert cache.get(TARGET) is None and cached_rows(cache, TARGET) is None
+    cache.put(TARGET, {'rows': {'1': {'descr': 'eth0'}}})
+    assert InterfaceCache(str(tmp_path / 'ifcache')).get(TARGET) == {'rows': {'1': {'descr': 'eth0'}}}
+    assert cached_rows(None, TARGET) is None
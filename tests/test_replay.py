@@ -0,0 +1,99 @@
+import asyncio
+import gzip
+
+import pytest
+
+from snmpmon.counters import OID, fetch_stats, stats_oids
+from snmpmon.ifcache import CHECK_OIDS, ROW_COLUMNS, MemoryInterfaceCache, fetch_interfaces
+from snmpmon.replay import Recorder, ReplayClient, ReplayFinished
+from snmpmon.target import SnmpTarget
+
+A = SnmpTarget('192.0.2.1')
+B = SnmpTarget('192.0.2.1', port=16100)
+
+
+def test_each_response_carries_its_own_timestamp(tmp_path):
+    path = str(tmp_path / 'two.rec.gz')
+    oids = stats_oids(['1', '2'])
+    recorder = Recorder(path)
+    # Odpovědi dvou agentů prokládané v čase
+    for n, (target, timestamp) in enumerate([(A, 100.0), (B, 100.4), (A, 101.0), (B, 101.4)]):
+        values = {oid: str(1000 * n + i) for i, oid in enumerate(oids)}
+        recorder.record('get', target, oids, values, timestamp)
+    recorder.close()
+
+    client = ReplayClient(path, speed=0)
+
+    async def main():
+        # Souběžné požadavky - čas odpovědi jednoho nesmí dostat druhý
+        first = await asyncio.gather(fetch_stats(client, A, ['1', '2']), fetch_stats(client, B, ['1', '2']))
+        second = await asyncio.gather(fetch_stats(client, B, ['2']), fetch_stats(client, A, ['2']))
+        return first + second
+
+    stats = asyncio.run(main())
+    assert [s.timestamp for s in stats] == [100.0, 100.4, 101.4, 101.0]
+    assert stats[0]['2'].in_octets == 8          # sysUpTime je první OID, port 2 začíná na 8
+    assert list(stats[2]) == ['2'] and stats[2]['2'].in_octets == 3008  # Podmnožina portů záznamu
+    with pytest.raises(ReplayFinished):
+        asyncio.run(fetch_stats(client, A, ['1']))
+    client.close()
+
+
+def test_rerecording_keeps_timestamps(tmp_path):
+    source, copy = str(tmp_path / 'a.rec.gz'), str(tmp_path / 'b.rec.gz')
+    recorder = Recorder(source)
+    recorder.record('walk', A, '1.3.6.1.2.1.2.2.1.2', {'1': 'eth0'}, 1700000000.123456789)
+    recorder.close()
+
+    client = ReplayClient(source, speed=0)
+    client.recorder = Recorder(copy)
+    first = asyncio.run(client.walk(A, '1.3.6.1.2.1.2.2.1.2'))
+    client.recorder.close()
+    replayed = asyncio.run(ReplayClient(copy, speed=0).walk(A, '1.3.6.1.2.1.2.2.1.2'))
+    assert first == replayed == {'1': 'eth0'}
+    assert first.timestamp == replayed.timestamp == 1700000000.123456789
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / 'x.gz'
+    with gzip.open(path, 'wt') as f:
+        f.write('["other", 1]\n')
+    with pytest.raises(ValueError):
+        ReplayClient(str(path))
+
+
+def test_interfaces_replay_in_memory_cache(tmp_path):
+    path = str(tmp_path / 'ports.rec.gz')
+    check = [OID[key] for key in CHECK_OIDS]
+    columns = [OID[key] for _, key in ROW_COLUMNS]
+    recorder = Recorder(path)
+    recorder.record('get', A, check, {OID['sysObjectID']: '1.3.6.1.4.1.9', OID['sysUpTime']: '360000',
+                                      OID['ifNumber']: '1', OID['ifTableLastChange']: '100'}, 5000.0)
+    recorder.record('table', A, columns, {column: {'1': 'x'} for column in columns}, 5000.5)
+    recorder.close()
+
+    cache = MemoryInterfaceCache()
+    rows, source = asyncio.run(fetch_interfaces(ReplayClient(path, speed=0), A, cache))
+    assert source == 'full' and list(rows) == ['1']
+    assert cache.get(A)['boot'] == 5000.0 - 3600  # Start agenta podle času odpovědi ze záznamu
+    assert cache.directory is None
+
+
+def test_exact_shape_later_in_recording_wins(tmp_path):
+    path = str(tmp_path / 'shapes.rec.gz')
+    recorder = Recorder(path)
+    recorder.record('table', A, ['1.1', '1.2', '1.3'], {'1.1': {'1': 'a'}, '1.2': {'1': 'b'}, '1.3': {'1': 'c'}}, 1.0)
+    recorder.record('table', A, ['1.2', '1.3'], {'1.2': {'1': 'B'}, '1.3': {'1': 'C'}}, 2.0)
+    recorder.close()
+
+    client = ReplayClient(path, speed=0)
+
+    async def main():
+        wide = await client.table(A, ['1.1', '1.2', '1.3'])
+        # Nadmnožina je vyčerpaná - podmnožina dostane svůj vlastní pozdější tvar
+        narrow = await client.table(A, ['1.2', '1.3'])
+        return wide, narrow
+
+    wide, narrow = asyncio.run(main())
+    assert wide['1.2'] == {'1': 'b'}
+    assert narrow == {'1.2': {'1': 'B'}, '1.3': {'1': 'C'}} and narrow.timestamp == 2.0
@@ -0,0 +1,61 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+from snmpmon.counters import OID
+from snmpmon.session import SnmpClient
+from snmpmon.target import SnmpTarget
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'bench'))
+agent = pytest.importorskip('agent')
+
+
+def run_table(columns, version='v2c', max_repetitions=4, interfaces=30, prepare=None):
+    """SnmpClient.table proti agentovi z bench/agent.py na stejné smyčce"""
+    async def main():
+        transport, simulated, port = await agent.start_agent(interfaces=interfaces)
+        if prepare is not None:
+            prepare(simulated.mib)
+            simulated.mib.oids = sorted(simulated.mib.values)
+        client = SnmpClient()
+        target = SnmpTarget('127.0.0.1', port=port, version=version)
+        try:
+            table = await client.table(target, [OID[name] for name in columns], max_repetitions)
+            return table, client.stats.device(target)
+        finally:
+            client.close()
+            transport.close()
+
+    return asyncio.run(main())
+
+
+def test_table_pages_stop_at_column_end():
+    table, stats = run_table(['ifDescr', 'ifHighSpeed'])
+    # 30 řádků po 4 na stránku, za koncem sloupce nic z dalších sloupců
+    assert stats.latency['getbulk'].count > 30 // 4
+    assert list(table[OID['ifDescr']]) == [str(i) for i in range(1, 31)]
+    assert table[OID['ifDescr']]['30'] == 'GigabitEthernet1/0/30'
+    assert table[OID['ifHighSpeed']] == {str(i): '1000' for i in range(1, 31)}
+
+
+def test_table_sparse_rows():
+    def drop_alias(mib):
+        del mib.values[agent.IFX_ENTRY + (18, 5)]
+
+    table, _ = run_table(['ifDescr', 'ifAlias'], prepare=drop_alias)
+    aliases = table[OID['ifAlias']]
+    assert '5' not in aliases and len(aliases) == 29
+    assert aliases['6'] == '' and aliases['7'] == 'port 7'
+    assert len(table[OID['ifDescr']]) == 30
+
+
+def test_table_v1_getnext():
+    # SNMPv1 čte GETNEXT; Counter64 sloupec agent v1 nevrací - prázdný sloupec
+    table, stats = run_table(['ifDescr', 'ifHCInOctets', 'ifAlias'], version='v1', interfaces=5)
+    assert 'getbulk' not in stats.latency
+    assert stats.latency['getnext'].count == 6
+    assert list(table[OID['ifDescr']]) == ['1', '2', '3', '4', '5']
+    assert table[OID['ifHCInOctets']] == {}
+    assert table[OID['ifAlias']]['5'] == 'port 5'
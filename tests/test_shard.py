@@ -0,0 +1,70 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from snmpmon.counters import PortRates, PortStats, Sample
+from snmpmon.poller import Device, PollPolicy
+from snmpmon.shard import WIRE_HEADER, ShardedPoller, pack_wire, shard_hosts, unpack_wire
+from snmpmon.target import SnmpTarget
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'bench'))
+
+
+def sample(port, in_octets):
+    return Sample('10.0.0.1', '1', 1700000000.0, PortStats(in_octets=in_octets), PortRates(interval=1.0), port)
+
+
+def test_shard_wire_keeps_agent_port():
+    devices = [Device(SnmpTarget('10.0.0.1')), Device(SnmpTarget('10.0.0.1', port=16100))]
+    hosts = shard_hosts(devices)
+    assert hosts == [('10.0.0.1', 161), ('10.0.0.1', 16100)]
+
+    ids = {agent: i for i, agent in enumerate(hosts)}
+    sent = [sample(16100, 5), sample(161, 7)]
+    data = WIRE_HEADER.pack(*(0,) * 6) + b''.join(pack_wire(ids[(s.host, s.port)], s) for s in sent)
+    _, received = unpack_wire(data, hosts)
+    assert [(s.host, s.port, s.stats.in_octets) for s in received] == [('10.0.0.1', 16100, 5), ('10.0.0.1', 161, 7)]
+
+
+def wait_for(condition, timeout):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def test_killed_worker_restarts_and_polls_again():
+    bench_suite = pytest.importorskip('bench_suite')
+    agents = [bench_suite.start_agent_process(4, 0.0, 0.0) for _ in range(2)]
+    devices = [Device(SnmpTarget('127.0.0.1', port=port), ['1', '2'], interval=0.5) for _, port in agents]
+    seen = []  # (monotonic čas, port agenta)
+    poller = ShardedPoller(devices, lambda s: seen.append((time.monotonic(), s.port)), PollPolicy(timeout=0.5), 2)
+    stop = threading.Event()
+    thread = threading.Thread(target=poller.run, args=(stop,))
+    thread.start()
+    try:
+        # Worker startuje metodou spawn (import pysnmp) - první vzorky až po pár sekundách
+        assert wait_for(lambda: {port for _, port in seen} == {port for _, port in agents}, 30.0)
+        victim = poller.workers[0]
+        victim_port = victim.hosts[0][1]
+        old_process = victim.process
+        samples_before = poller.samples
+        old_process.kill()
+        killed = time.monotonic()
+
+        assert wait_for(lambda: poller.restarts == 1, 10.0)
+        assert wait_for(lambda: any(t > killed + 0.5 and port == victim_port for t, port in seen), 30.0)
+        assert victim.process is not old_process and victim.process.is_alive()
+        assert poller.restarts == 1 and poller.samples >= samples_before  # Čítače spadlého procesu se neztratí
+    finally:
+        stop.set()
+        thread.join()
+        for proc, _ in agents:
+            proc.terminate()
+            proc.wait()
+    assert all(not worker.process.is_alive() for worker in poller.workers)
@@ -0,0 +1,97 @@
+import math
+import random
+
+import pytest
+
+from snmpmon.sketch import DDSketch, StreamStats
+
+
+def exact(values, q):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+@pytest.mark.parametrize('accuracy', [0.01, 0.05])
+def test_quantile_relative_error(accuracy):
+    rng = random.Random(7)
+    values = [rng.lognormvariate(15, 2) for _ in range(20000)]
+    sketch = DDSketch(accuracy)
+    for value in values:
+        sketch.add(value)
+    for q in (0.01, 0.25, 0.5, 0.9, 0.95, 0.99, 1.0):
+        assert sketch.quantile(q) == pytest.approx(exact(values, q), rel=accuracy)
+
+
+def test_constant_stream():
+    sketch = DDSketch(0.01)
+    for _ in range(1000):
+        sketch.add(125e6)
+    assert len(sketch) == 1
+    for q in (0.0, 0.5, 0.95, 0.99, 1.0):
+        assert sketch.quantile(q) == pytest.approx(125e6, rel=0.01)
+
+
+def test_zeros_and_empty():
+    sketch = DDSketch()
+    assert sketch.quantile(0.5) is None
+    for value in (0.0, 0.0, 0.0, 1000.0):
+        sketch.add(value)
+    assert sketch.quantile(0.5) == 0.0
+    assert sketch.quantile(0.95) == pytest.approx(1000.0, rel=0.01)
+
+
+def test_weights_are_time():
+    # 95 s provozu na 10 MB/s a 5 s špičky - 95. percentil je ještě bez špičky
+    sketch = DDSketch()
+    sketch.add(10e6, 95.0)
+    sketch.add(900e6, 5.0)
+    assert sketch.quantile(0.95) == pytest.approx(10e6, rel=0.01)
+    assert sketch.quantile(0.96) == pytest.approx(900e6, rel=0.01)
+
+
+def test_collapse_keeps_upper_quantiles():
+    sketch = DDSketch(0.01, max_buckets=64)
+    values = [1.5 ** i for i in range(200)]
+    for value in values:
+        sketch.add(value)
+    assert len(sketch) == 64
+    assert sketch.quantile(0.99) == pytest.approx(exact(values, 0.99), rel=0.01)
+
+
+def test_merge_matches_single_sketch():
+    rng = random.Random(3)
+    values = [rng.uniform(1, 1e9) for _ in range(5000)]
+    whole, first, second = DDSketch(), DDSketch(), DDSketch()
+    for i, value in enumerate(values):
+        whole.add(value)
+        (first if i % 2 else second).add(value)
+    first.merge(second)
+    assert first.buckets == whole.buckets and first.count == whole.count
+    with pytest.raises(ValueError):
+        first.merge(DDSketch(0.05))
+
+
+def test_stream_mean_and_ewma():
+    stats = StreamStats(tau=60.0)
+    stats.add(100.0, 10.0, 10.0)
+    assert stats.ewma == 100.0  # První měření EWMA nastaví
+    stats.add(400.0, 30.0, 40.0)
+    assert stats.mean == pytest.approx((100 * 10 + 400 * 30) / 40)  # Vážený časem
+    assert stats.ewma == pytest.approx(100 + 300 * (1 - math.exp(-0.5)))
+
+    # Skok na konstantu: po 5 tau je EWMA u nové hodnoty, nezávisle na délce intervalů
+    stats = StreamStats(tau=10.0)
+    stats.add(0.0, 1.0, 0.0)
+    for t in range(1, 51):
+        stats.add(1000.0, 1.0, float(t))
+    assert stats.ewma == pytest.approx(1000 * (1 - math.exp(-5)))
+
+
+def test_stream_merge_takes_newer_ewma():
+    older, newer = StreamStats(), StreamStats()
+    older.add(100.0, 10.0, 10.0)
+    newer.add(300.0, 30.0, 50.0)
+    older.merge(newer)
+    assert older.ewma == 300.0 and older.last == 50.0
+    assert older.mean == pytest.approx(250.0)
+    assert older.as_dict()['count'] == 2
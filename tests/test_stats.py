@@ -0,0 +1,40 @@
+import asyncio
+
+from pysnmp.proto import errind
+
+from snmpmon.poller import AsyncPoller, PollPolicy
+from snmpmon.session import indication_error
+from snmpmon.stats import DeviceStats, Request
+from snmpmon.target import SnmpError, SnmpTimeout
+
+
+class TimeoutInText(errind.ErrorIndication):
+    """Chyba, jejíž text obsahuje slovo timeout, ale timeout to není"""
+
+
+def test_observe_classifies_by_indication_type():
+    stats = DeviceStats()
+    stats.observe('get', Request(), 0.01, errind.requestTimedOut, None)
+    stats.observe('get', Request(), 0.01, TimeoutInText('authTimeoutWindow mismatch'), None)
+    stats.observe('get', Request(), 0.01, None, None)
+    assert stats.requests == 3
+    assert stats.timeouts == 1
+    assert stats.errors == {'authTimeoutWindow mismatch': 1}
+
+
+def test_indication_error_keeps_original():
+    error = indication_error(errind.requestTimedOut)
+    assert isinstance(error, SnmpTimeout) and error.indication is errind.requestTimedOut
+    error = indication_error(TimeoutInText('timeout in text'))
+    assert type(error) is SnmpError and isinstance(error.indication, TimeoutInText)
+
+
+def test_poller_counts_timeouts_by_type():
+    poller = AsyncPoller([], lambda sample: None, PollPolicy(retries=2, backoff=0.0))
+    errors = iter([SnmpTimeout('x'), SnmpError('No SNMP response received before timeout'), SnmpTimeout('y')])
+
+    async def request():
+        raise next(errors)
+
+    assert asyncio.run(poller._with_retries(request)) is None
+    assert (poller.requests, poller.timeouts, poller.errors, poller.retries) == (3, 2, 1, 2)
@@ -0,0 +1,72 @@
+import asyncio
+import heapq
+import random
+
+import pytest
+
+from snmpmon.counters import OID, PortStats
+from snmpmon.talkers import SWEEP_COLUMNS, TopTalkers, _push, sweep_counters
+from snmpmon.target import Response, SnmpError, SnmpTarget
+
+
+def sweep(rates, t, errors=None):
+    """{ifIndex: PortStats} po t sekundách konstantní rychlosti rates[ifIndex] (B/s)"""
+    errors = errors or {}
+    return {
+        idx: PortStats(in_octets=int(rate * t), out_octets=int(rate * t / 2),
+                       in_errors=errors.get(idx, 0) * t, uptime=100000 + int(t * 100))
+        for idx, rate in rates.items()
+    }
+
+
+def test_push_keeps_n_largest():
+    rng = random.Random(1)
+    items = [(rng.random(), str(i)) for i in range(1000)]
+    heap = []
+    for item in items:
+        _push(heap, 10, item)
+    assert sorted(heap, reverse=True) == heapq.nlargest(10, items)
+
+
+def test_push_skips_zero():
+    heap = []
+    _push(heap, 3, (0.0, '1'))
+    assert heap == []
+
+
+def test_ranking():
+    rates = {str(i): i * 1000.0 for i in range(1, 51)}
+    rates['7'] = 0.0
+    top = TopTalkers(None, None, n=3)
+    assert top.update(sweep(rates, 0), 0.0) == {'rx': [], 'tx': [], 'errors': []}  # První průchod bez rychlostí
+
+    ranking = top.update(sweep(rates, 10, errors={'7': 2, '9': 5}), 10.0)
+    assert top.ports == 50
+    assert ranking['rx'] == [(50000.0, '50'), (49000.0, '49'), (48000.0, '48')]
+    assert ranking['tx'] == [(25000.0, '50'), (24500.0, '49'), (24000.0, '48')]
+    assert ranking['errors'] == [(5.0, '9'), (2.0, '7')]  # Porty bez chyb se nehodnotí
+
+
+def test_reset_port_is_not_ranked():
+    top = TopTalkers(None, None, n=2)
+    rates = {'1': 1000.0, '2': 2000.0, '3': 500.0}
+    top.update(sweep(rates, 0), 0.0)
+    stats = sweep(rates, 10)
+    stats['2'].in_octets = 5  # Counter64 klesl - reset, port 2 v tomto průchodu chybí
+    ranking = top.update(stats, 10.0)
+    assert [idx for _, idx in ranking['rx']] == ['1', '3']
+
+
+class TableClient:
+    async def table(self, target, columns, max_repetitions=None):
+        columns = {OID[key]: {'1': str(10 * n), '2': str(20 * n)} for n, (_, key) in enumerate(SWEEP_COLUMNS, 1)}
+        return Response(columns, 1234.5)
+
+
+def test_sweep_counters():
+    stats = asyncio.run(sweep_counters(TableClient(), SnmpTarget('192.0.2.1')))
+    assert stats['1'] == PortStats(in_octets=10, out_octets=20, in_errors=30, out_errors=40)
+    assert stats['2'].out_errors == 80
+    assert stats.timestamp == 1234.5  # Čas měření z odpovědi tabulky
+    with pytest.raises(SnmpError):
+        asyncio.run(sweep_counters(TableClient(), SnmpTarget('192.0.2.1', version='v1')))
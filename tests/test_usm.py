@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+from pysnmp.entity import config
+from pysnmp.hlapi.v3arch import SnmpEngine, UdpTransportTarget
+from pysnmp.proto.rfc1902 import OctetString
+
+from snmpmon.target import SnmpTarget
+from snmpmon.usm import AUTH_PROTOCOLS, EngineCache, EngineInfo, _engine_tables, master_keys, prime_engine
+
+A = SnmpTarget('192.0.2.1', version='v3', port=16161)
+ENGINE_ID = '80001f8880aa'
+
+
+def read(cache, target):
+    with open(cache._path(target), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_engine_cache_round_trip(tmp_path):
+    cache = EngineCache(str(tmp_path))
+    cache.update(A, ENGINE_ID, 3, 1000, now=100.0)
+    assert (tmp_path / '192.0.2.1_16161.json').exists()
+
+    loaded = EngineCache(str(tmp_path)).get(A)
+    assert loaded == EngineInfo(ENGINE_ID, 3, 1000, 100.0)
+    assert loaded.estimated_time(160.5) == 1060
+    assert EngineCache(str(tmp_path)).get(SnmpTarget('192.0.2.1', version='v3')) is None
+
+    cache.drop(A)
+    assert cache.get(A) is None and EngineCache(str(tmp_path)).get(A) is None
+
+
+def test_engine_cache_rewrites_on_boots_change(tmp_path):
+    cache = EngineCache(str(tmp_path))
+    cache.update(A, ENGINE_ID, 3, 1000, now=100.0)
+    # Další odpověď se stejnými boots jen posune hodiny v paměti, soubor zůstává
+    cache.update(A, ENGINE_ID, 3, 1050, now=150.0)
+    assert cache.get(A).time == 1050
+    assert read(cache, A)['time'] == 1000
+    # Restart agenta: nové boots, hodiny od nuly - zapíše se hned
+    cache.update(A, ENGINE_ID, 4, 5, now=200.0)
+    assert read(cache, A) == {'engine_id': ENGINE_ID, 'boots': 4, 'time': 5, 'seen': 200.0}
+    assert EngineCache(str(tmp_path)).get(A).boots == 4
+
+
+def test_prime_engine_uses_cached_boots():
+    async def main():
+        engine = SnmpEngine()
+        transport = await UdpTransportTarget.create(('127.0.0.1', A.port))
+        prime_engine(engine, transport, EngineInfo(ENGINE_ID, 4, 5, 200.0), now=230.0)
+        return _engine_tables(engine)
+
+    engine_ids, timeline = asyncio.run(main())
+    engine_id = OctetString(hexValue=ENGINE_ID)
+    assert [entry['securityEngineId'] for entry in engine_ids.values()] == [engine_id]
+    assert timeline[engine_id][:3] == (4, 35, 35)
+
+
+def test_master_keys_localize_to_rfc3414_vectors():
+    # RFC 3414 A.3: heslo "maplesyrup", engine ID 00...02
+    engine_id = OctetString(hexValue='000000000000000000000002')
+    expected = {'MD5': '526f5eed9fcce26f8964c2930787d82b', 'SHA': '6695febc9288e36282235fc7151f128497b38f3f'}
+    for protocol, key in expected.items():
+        auth = getattr(config, AUTH_PROTOCOLS[protocol])
+        for keys in (master_keys(protocol, 'maplesyrup', 'AES', 'maplesyrup'),
+                     master_keys.__wrapped__(protocol, 'maplesyrup', 'AES', 'maplesyrup')):
+            auth_master, priv_master = keys
+            assert config.AUTH_SERVICES[auth].localize_key(auth_master, engine_id).asOctets().hex() == key
+            assert priv_master == auth_master  # Stejné heslo a hash -> stejný master klíč
+    assert master_keys('SHA', 'maplesyrup', 'none', 'x')[1] is None
+    assert master_keys('SHA', '', 'AES', 'x') == (None, None)
@@ -1,61 +1,211 @@
 """
 SNMP Switch Port Monitor
-Pro pysnmp 6.2.6 s Python 3.12
+Pro pysnmp 7.1 (hlapi.v3arch) s Python 3.12
 S grafickým zobrazením trafficu
+
+    python traffic_monitor.py --record incident.rec.gz     zaznamenat SNMP odpovědi
+    python traffic_monitor.py --replay incident.rec.gz     přehrát záznam bez sítě
 """
 
+import argparse
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
+import os
+import queue
 import threading
-import time
 from datetime import datetime
-from collections import deque
 
-# Import pro pysnmp 6.2.6 - funkce jsou v v3arch!
-from pysnmp.hlapi.v3arch import (
-    get_cmd, next_cmd, walk_cmd,
-    SnmpEngine, CommunityData, UdpTransportTarget, ContextData,
-    ObjectType, ObjectIdentity
-)
+# Jen moduly bez pysnmp a numpy - SNMP stack se načte na pozadí až po vykreslení okna (prewarm)
+from snmpmon.archive import ArchiveWriter
+from snmpmon.counters import OID
+from snmpmon.downsample import lttb
+from snmpmon.history import HistoryStore
+from snmpmon.ifcache import InterfaceCache, MemoryInterfaceCache, cached_rows, fetch_interfaces
+from snmpmon.monitor import PortMonitor
+from snmpmon.talkers import TopTalkers
+from snmpmon.target import SnmpTarget
+from snmpmon.usm import AUTH_PROTOCOLS, PRIV_PROTOCOLS, EngineCache
+
+# Verze pysnmp, proti jejímuž API (hlapi.v3arch) je psaná snmpmon.session
+PYSNMP_API = "pysnmp 7.1"
+
+# Překreslování UI - pracovní vlákna jen plní frontu, Tk ji vybírá v after() smyčce
+UI_FPS = 10             # Snímků za sekundu
+LOG_MAX_LINES = 5000    # Starší řádky logu se zahazují
+
+# Graf - historie souhrnu: 4 h měření po 2 s, 24 h po minutách, 8 dní po hodinách
+GRAPH_TIERS = ((0, 7200), (60, 1440), (3600, 192))
+GRAPH_WINDOWS = {"5 min": 300, "1 h": 3600, "24 h": 86400}
+
+# Archiv měření na disku (retence a kompakce podle ArchivePolicy)
+ARCHIVE_DIR = os.path.join(os.path.expanduser("~"), ".snmpmon", "archive")
+
+# Cache metadat rozhraní (seznam portů bez walku, dokud agent nehlásí změnu)
+IFCACHE_DIR = os.path.join(os.path.expanduser("~"), ".snmpmon", "ifcache")
+# Engine ID a hodiny SNMPv3 agentů (bez discovery při dalším startu)
+ENGINE_DIR = os.path.join(os.path.expanduser("~"), ".snmpmon", "engines")
+
+LOAD_SOURCES = {
+    'cache': "z cache, stav portů znovu",
+    'partial': "z cache, změněné řádky znovu",
+    'full': "celá tabulka",
+}
+
+# Nabízené intervaly měření v sekundách (lze zadat i jiný)
+POLL_INTERVALS = ["0.25", "0.5", "1", "2", "5", "10"]
+
+# Top talkers - počet portů v žebříčku a nejkratší interval průchodu celého switche
+TOP_N = 10
+TOP_MIN_INTERVAL = 2.0
+
+
+class TrafficGraph:
+    """Živý graf RX/TX na Canvasu
+
+    Čáry, mřížka a popisky se vytvoří jednou a při každém měření se jen
+    posunou (coords/itemconfig). Delší okna se decimují LTTB na jeden bod
+    na pixel, takže cena překreslení nezávisí na délce historie.
+    """
+
+    PAD_LEFT = 80
+    PAD_RIGHT = 10
+    PAD_Y = 12
+    GRID_LINES = 4
+
+    def __init__(self, parent, height=170):
+        self.canvas = tk.Canvas(parent, height=height, bg="#0a0a0a", highlightthickness=0)
+        self.grid = [self.canvas.create_line(0, 0, 0, 0, fill="#222222") for _ in range(self.GRID_LINES + 1)]
+        self.labels = [
+            self.canvas.create_text(0, 0, anchor="e", fill="#666666", font=("Consolas", 8))
+            for _ in range(self.GRID_LINES + 1)
+        ]
+        self.rx_line = self.canvas.create_line(0, 0, 0, 0, fill="#00ff00", width=1.5)
+        self.tx_line = self.canvas.create_line(0, 0, 0, 0, fill="#00aaff", width=1.5)
+        self.data = None
+        self.canvas.bind("<Configure>", lambda event: self.redraw())
+    
+    def draw(self, rx, tx, start, end):
+        """Vykreslí řady rx, tx ((časy, B/s)) v okně start..end"""
+        self.data = (rx, tx, start, end)
+        self.redraw()
+    
+    def redraw(self):
+        if self.data is None:
+            return
+        rx, tx, start, end = self.data
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        plot_width = max(2, width - self.PAD_LEFT - self.PAD_RIGHT)
+        plot_height = max(2, height - 2 * self.PAD_Y)
+        
+        rx_x, rx_y = lttb(*rx, plot_width)
+        tx_x, tx_y = lttb(*tx, plot_width)
+        top = self.nice_max(max(rx_y + tx_y, default=0))
+        
+        # Mřížka a popisky osy Y (Mbps)
+        for i, (line, label) in enumerate(zip(self.grid, self.labels)):
+            y = self.PAD_Y + plot_height * i / self.GRID_LINES
+            self.canvas.coords(line, self.PAD_LEFT, y, width - self.PAD_RIGHT, y)
+            self.canvas.coords(label, self.PAD_LEFT - 5, y)
+            mbps = top * (self.GRID_LINES - i) / self.GRID_LINES * 8 / 1e6
+            self.canvas.itemconfig(label, text=f"{mbps:g} Mbps")
+        
+        span = max(end - start, 1e-9)
+        for item, xs, ys in ((self.rx_line, rx_x, rx_y), (self.tx_line, tx_x, tx_y)):
+            coords = []
+            for x, y in zip(xs, ys):
+                coords.append(self.PAD_LEFT + (x - start) / span * plot_width)
+                coords.append(self.PAD_Y + plot_height * (1 - y / top))
+            self.canvas.coords(item, *(coords if len(coords) >= 4 else (0, 0, 0, 0)))
+    
+    @staticmethod
+    def nice_max(value):
+        """Horní mez osy: nejbližší vyšší 1/2/5 x 10^n bitů (v B/s)"""
+        bits = max(value * 8, 1000)
+        scale = 10 ** (len(str(int(bits))) - 1)
+        for step in (1, 2, 5, 10):
+            if bits <= step * scale:
+                return step * scale / 8
 
 class SNMPMonitor:
-    def __init__(self, root):
+    def __init__(self, root, record=None, replay=None, speed=1.0):
         self.root = root
-        self.root.title("SNMP Port Monitor (pysnmp 6.2.6)")
-        self.root.geometry("1000x650")
-        
-        self.monitoring = False
+        self.root.title(f"SNMP Port Monitor ({PYSNMP_API})")
+        if replay:
+            self.root.title(f"SNMP Port Monitor - přehrávání {os.path.basename(replay)}")
+        self.root.geometry("1100x1000")
+        
+        self.stop_event = threading.Event()
+        self.monitor = None
+        self.talkers = None
         self.interfaces = {}
-        self.prev_stats = {}
         self.start_time = None
+        self.last_samples = {}  # ifIndex -> poslední Sample (debug výpis rozdílů)
+        self.missed = 0  # Zmeškané cykly už nahlášené v logu
         self.debug_mode = False  # Debug režim
-        
-        # Min/Max hodnoty
-        self.rx_min = float('inf')
-        self.rx_max = 0
-        self.tx_min = float('inf')
-        self.tx_max = 0
+        self._session = None  # SnmpSession - vytváří se líně (property session)
+        self._session_lock = threading.Lock()
+        self.record = record  # Soubor pro záznam SNMP odpovědí
+        self.recorder = None
+        self.replay = replay  # Záznam přehrávaný místo sítě (snmpmon.replay)
+        self.speed = speed
+        self.worker = None  # Vlákno monitoringu / top talkers
+        if record or replay:
+            # Záznam i přehrávání jsou izolované od ~/.snmpmon: záznam začíná s prázdnou cache
+            # metadat (obsahuje celý průchod tabulky rozhraní, který přehrávání zopakuje)
+            # a přehrávání nezapisuje do archivu ani do cache
+            self.ifcache = MemoryInterfaceCache()
+        else:
+            self.ifcache = InterfaceCache(IFCACHE_DIR)
+        self.archive = None  # ArchiveWriter - při přehrávání žádný
+        if not replay:
+            self.archive = ArchiveWriter(ARCHIVE_DIR, on_error=lambda e: self.log(f"⚠ Archiv: {e}"))  # Zápis na disk ve vlastním vlákně
+        self.archive_mode = self.archive is not None
+        self.max_repetitions = 25  # GETBULK max-repetitions při načítání portů
+        self.ui_queue = queue.Queue()  # Log, volání Tk a měření z pracovních vláken
+        self.history = HistoryStore(GRAPH_TIERS)  # Historie měření (kruhové buffery s agregací)
         
         # SNMP OID konstanty
-        self.OID = {
-            'sysDescr': '1.3.6.1.2.1.1.1.0',
-            'ifDescr': '1.3.6.1.2.1.2.2.1.2',
-            'ifAlias': '1.3.6.1.2.1.31.1.1.1.18',
-            'ifAdminStatus': '1.3.6.1.2.1.2.2.1.7',
-            'ifOperStatus': '1.3.6.1.2.1.2.2.1.8',
-            # High-capacity 64-bit countery (ifXTable)
-            'ifHCInOctets': '1.3.6.1.2.1.31.1.1.1.6',
-            'ifHCOutOctets': '1.3.6.1.2.1.31.1.1.1.10',
-            'ifHCInUcastPkts': '1.3.6.1.2.1.31.1.1.1.7',
-            'ifHCOutUcastPkts': '1.3.6.1.2.1.31.1.1.1.11',
-            # Standardní countery pro errors (nemají HC verzi)
-            'ifInErrors': '1.3.6.1.2.1.2.2.1.14',
-            'ifOutErrors': '1.3.6.1.2.1.2.2.1.20',
-        }
+        self.OID = OID
         
         self.setup_ui()
-        self.log("✅ pysnmp 6.2.6 načten úspěšně")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(0, self.drain_ui_queue)
         self.log("📝 Zadejte IP a community, pak klikněte TEST")
+        self.show_cached_ports()
+        self.root.after_idle(self.start_prewarm)  # SNMP stack až po prvním vykreslení okna
+    
+    @property
+    def session(self):
+        """Sdílená smyčka a cachované SNMP enginy - pysnmp se načte při prvním použití"""
+        with self._session_lock:
+            if self._session is None:
+                from snmpmon.replay import Recorder, ReplayClient
+                from snmpmon.session import SnmpSession
+                if self.replay:
+                    self._session = SnmpSession(client=ReplayClient(self.replay, self.speed))
+                else:
+                    self._session = SnmpSession(EngineCache(ENGINE_DIR))
+                if self.record:
+                    self.recorder = self._session.client.recorder = Recorder(self.record)
+            return self._session
+    
+    def start_prewarm(self):
+        thread = threading.Thread(target=self.prewarm, name="snmp-prewarm", daemon=True)
+        thread.start()
+    
+    def prewarm(self):
+        """Na pozadí načte pysnmp a připraví engine, aby první TEST nečekal"""
+        try:
+            session = self.session
+            session.call(session.client.prewarm())
+            self.log(f"✅ {PYSNMP_API} načten úspěšně")
+            if self.replay:
+                self.log(f"📼 Přehrávání záznamu {self.replay} (rychlost {self.speed:g}x, 0 = bez čekání)")
+            if self.record:
+                self.log(f"⏺ SNMP odpovědi se zaznamenávají do {self.record}")
+        except Exception as e:
+            self.log(f"❌ Načtení pysnmp selhalo: {e}")
         
     def setup_ui(self):
         # === KONFIGURACE ===
@@ -73,13 +223,60 @@ class SNMPMonitor:
         self.community.insert(0, "public")
         
         ttk.Label(conf, text="SNMP:", font=("Arial", 10, "bold")).grid(row=0, column=4, sticky="w", padx=5, pady=5)
-        self.version = ttk.Combobox(conf, width=6, values=["v1", "v2c"], state="readonly", font=("Arial", 11))
+        self.version = ttk.Combobox(conf, width=6, values=["v1", "v2c", "v3"], state="readonly", font=("Arial", 11))
         self.version.grid(row=0, column=5, padx=5, pady=5)
         self.version.current(1)
-        
-        ttk.Label(conf, text="Port:", font=("Arial", 10, "bold")).grid(row=1, column=0, sticky="w", padx=5, pady=5)
-        self.port_combo = ttk.Combobox(conf, width=80, state="readonly", font=("Arial", 9))
-        self.port_combo.grid(row=1, column=1, columnspan=5, padx=5, pady=5, sticky="ew")
+        self.version.bind("<<ComboboxSelected>>", self.toggle_v3)
+        
+        ttk.Label(conf, text="Interval:", font=("Arial", 10, "bold")).grid(row=0, column=6, sticky="w", padx=5, pady=5)
+        self.interval = ttk.Combobox(conf, width=6, values=POLL_INTERVALS, font=("Arial", 11))
+        self.interval.grid(row=0, column=7, padx=5, pady=5)
+        self.interval.set("2")
+        
+        # SNMPv3 (USM) - zobrazí se jen pro verzi v3
+        self.v3_frame = ttk.Frame(conf)
+        self.v3_frame.grid(row=1, column=0, columnspan=8, sticky="w")
+        ttk.Label(self.v3_frame, text="Uživatel:", font=("Arial", 10, "bold")).pack(side="left", padx=5)
+        self.v3_user = ttk.Entry(self.v3_frame, width=12, font=("Arial", 11))
+        self.v3_user.pack(side="left", padx=5)
+        ttk.Label(self.v3_frame, text="Auth:", font=("Arial", 10, "bold")).pack(side="left", padx=5)
+        self.auth_protocol = ttk.Combobox(self.v3_frame, width=7, values=list(AUTH_PROTOCOLS), state="readonly",
+                                          font=("Arial", 11))
+        self.auth_protocol.pack(side="left", padx=5)
+        self.auth_protocol.set("SHA")
+        self.auth_key = ttk.Entry(self.v3_frame, width=12, show="•", font=("Arial", 11))
+        self.auth_key.pack(side="left", padx=5)
+        ttk.Label(self.v3_frame, text="Priv:", font=("Arial", 10, "bold")).pack(side="left", padx=5)
+        self.priv_protocol = ttk.Combobox(self.v3_frame, width=7, values=list(PRIV_PROTOCOLS), state="readonly",
+                                          font=("Arial", 11))
+        self.priv_protocol.pack(side="left", padx=5)
+        self.priv_protocol.set("AES")
+        self.priv_key = ttk.Entry(self.v3_frame, width=12, show="•", font=("Arial", 11))
+        self.priv_key.pack(side="left", padx=5)
+        ttk.Label(self.v3_frame, text="Kontext:", font=("Arial", 10, "bold")).pack(side="left", padx=5)
+        self.v3_context = ttk.Entry(self.v3_frame, width=10, font=("Arial", 11))
+        self.v3_context.pack(side="left", padx=5)
+        self.v3_frame.grid_remove()
+        
+        ttk.Label(conf, text="Porty:", font=("Arial", 10, "bold")).grid(row=2, column=0, sticky="nw", padx=5, pady=5)
+        
+        # Výběr více portů (Ctrl/Shift + klik)
+        port_frame = ttk.Frame(conf)
+        port_frame.grid(row=2, column=1, columnspan=7, padx=5, pady=5, sticky="ew")
+        conf.columnconfigure(5, weight=1)
+        
+        self.port_list = ttk.Treeview(port_frame, columns=("port", "alias", "status"), show="headings",
+                                      height=5, selectmode="extended")
+        self.port_list.heading("port", text="Port")
+        self.port_list.heading("alias", text="Popis")
+        self.port_list.heading("status", text="Stav")
+        self.port_list.column("port", width=260)
+        self.port_list.column("alias", width=300)
+        self.port_list.column("status", width=120)
+        port_scroll = ttk.Scrollbar(port_frame, orient="vertical", command=self.port_list.yview)
+        self.port_list.configure(yscrollcommand=port_scroll.set)
+        self.port_list.pack(side="left", fill="x", expand=True)
+        port_scroll.pack(side="left", fill="y")
         
         # === TLAČÍTKA ===
         btn_frame = ttk.Frame(self.root)
@@ -91,6 +288,9 @@ class SNMPMonitor:
         self.start_btn = ttk.Button(btn_frame, text="▶ START", command=self.start, state="disabled", width=15)
         self.start_btn.pack(side="left", padx=3)
         
+        self.top_btn = ttk.Button(btn_frame, text="🏆 Top talkers", command=self.top, width=15)
+        self.top_btn.pack(side="left", padx=3)
+        
         self.stop_btn = ttk.Button(btn_frame, text="■ STOP", command=self.stop, state="disabled", width=15)
         self.stop_btn.pack(side="left", padx=3)
         
@@ -99,6 +299,10 @@ class SNMPMonitor:
         self.debug_check = ttk.Checkbutton(btn_frame, text="🐛 Debug", command=self.toggle_debug)
         self.debug_check.pack(side="right", padx=3)
         
+        self.archive_check = ttk.Checkbutton(btn_frame, text="💾 Archiv", command=self.toggle_archive)
+        self.archive_check.state(["!alternate", "selected" if self.archive_mode else "!selected"])
+        self.archive_check.pack(side="right", padx=3)
+        
         # === HLAVNÍ KONTEJNER ===
         main_container = ttk.Frame(self.root)
         main_container.pack(fill="both", expand=True, padx=10, pady=5)
@@ -127,6 +331,8 @@ class SNMPMonitor:
         self.rx_min_label.pack(side="left", padx=10)
         self.rx_max_label = ttk.Label(rx_minmax_frame, text="Max: -", font=("Arial", 10), foreground="#666666")
         self.rx_max_label.pack(side="left", padx=10)
+        self.rx_pct_label = ttk.Label(rx_frame, text="Ø - | EWMA - | p95 - | p99 -", font=("Arial", 10), foreground="#666666")
+        self.rx_pct_label.pack()
         
         # TX Display (vpravo)
         tx_frame = ttk.Frame(display_container, relief="solid", borderwidth=2)
@@ -145,6 +351,8 @@ class SNMPMonitor:
         self.tx_min_label.pack(side="left", padx=10)
         self.tx_max_label = ttk.Label(tx_minmax_frame, text="Max: -", font=("Arial", 10), foreground="#666666")
         self.tx_max_label.pack(side="left", padx=10)
+        self.tx_pct_label = ttk.Label(tx_frame, text="Ø - | EWMA - | p95 - | p99 -", font=("Arial", 10), foreground="#666666")
+        self.tx_pct_label.pack()
         
         # Čítače (vpravo)
         counters_frame = ttk.LabelFrame(display_container, text="  Counters  ", padding=10)
@@ -177,6 +385,67 @@ class SNMPMonitor:
         self.uptime_label = ttk.Label(counters_frame, text="00:00:00", font=("Consolas", 10, "bold"), foreground="#ffff66")
         self.uptime_label.grid(row=6, column=1, sticky="e", padx=10, pady=3)
         
+        ttk.Separator(counters_frame, orient="horizontal").grid(row=7, column=0, columnspan=2, sticky="ew", pady=5)
+        
+        # Instrumentace SNMP klienta (ClientStats zařízení)
+        self.snmp_stat_labels = {}
+        for row, (key, text) in enumerate((
+            ("latency", "SNMP p50/p99:"),
+            ("timeouts", "Timeout/Retry:"),
+            ("errors", "SNMP chyby:"),
+            ("wire", "Bajty in/out:"),
+            ("cpu", "CPU / síť:"),
+        ), start=8):
+            ttk.Label(counters_frame, text=text, font=counter_style, foreground="#cccccc").grid(row=row, column=0, sticky="w", pady=3)
+            label = ttk.Label(counters_frame, text="-", font=("Consolas", 10, "bold"), foreground="#cccccc")
+            label.grid(row=row, column=1, sticky="e", padx=10, pady=3)
+            self.snmp_stat_labels[key] = label
+        
+        # Graf RX/TX (součet portů)
+        graph_bar = ttk.Frame(display_frame)
+        graph_bar.pack(fill="x", pady=(10, 0))
+        ttk.Label(graph_bar, text="⬇ RX", foreground="#00aa00", font=("Arial", 9, "bold")).pack(side="left", padx=5)
+        ttk.Label(graph_bar, text="⬆ TX", foreground="#0088aa", font=("Arial", 9, "bold")).pack(side="left", padx=5)
+        self.graph_window = ttk.Combobox(graph_bar, width=7, values=list(GRAPH_WINDOWS), state="readonly")
+        self.graph_window.current(0)
+        self.graph_window.bind("<<ComboboxSelected>>", lambda event: self.update_graph())
+        self.graph_window.pack(side="right", padx=5)
+        ttk.Label(graph_bar, text="Okno:").pack(side="right")
+        
+        self.graph = TrafficGraph(display_frame)
+        self.graph.canvas.pack(fill="x", pady=(5, 0))
+        
+        # Tabulka monitorovaných portů (displeje nahoře ukazují jejich součet)
+        self.port_table = ttk.Treeview(
+            display_frame, height=6, show="headings",
+            columns=("port", "rx", "tx", "rx_pps", "tx_pps", "rx_minmax", "tx_minmax", "p95", "errors")
+        )
+        for col, text, width in (
+            ("port", "Port", 200), ("rx", "⬇ RX", 100), ("tx", "⬆ TX", 100),
+            ("rx_pps", "RX pkt/s", 90), ("tx_pps", "TX pkt/s", 90),
+            ("rx_minmax", "RX Min / Max", 170), ("tx_minmax", "TX Min / Max", 170),
+            ("p95", "p95 RX / TX", 170),
+            ("errors", "Errors IN / OUT", 120),
+        ):
+            self.port_table.heading(col, text=text)
+            self.port_table.column(col, width=width, anchor="w" if col == "port" else "e")
+        self.port_table.pack(fill="x", pady=(10, 0))
+        
+        # Žebříček top talkers (místo tabulky portů, řádky se jen přepisují)
+        self.top_table = ttk.Treeview(
+            display_frame, height=TOP_N, show="headings",
+            columns=("rank", "rx_port", "rx", "tx_port", "tx", "err_port", "errors")
+        )
+        for col, text, width in (
+            ("rank", "#", 30), ("rx_port", "⬇ RX port", 190), ("rx", "RX", 100),
+            ("tx_port", "⬆ TX port", 190), ("tx", "TX", 100),
+            ("err_port", "⚠ Errors port", 190), ("errors", "err/s", 80),
+        ):
+            self.top_table.heading(col, text=text)
+            self.top_table.column(col, width=width, anchor="e" if col in ("rx", "tx", "errors") else "w")
+        for rank in range(1, TOP_N + 1):
+            self.top_table.insert("", "end", iid=str(rank), values=(rank,) + ("-",) * 6)
+        
         # === VÝSTUP (dole) ===
         out_frame = ttk.LabelFrame(main_container, text="  📝 Log  ", padding=10)
         out_frame.pack(side="bottom", fill="both", expand=True)
@@ -188,9 +457,48 @@ class SNMPMonitor:
         self.output.pack(fill="both", expand=True)
         
     def log(self, msg):
-        self.output.insert(tk.END, msg + "\n")
+        """Přidá řádek do logu - lze volat z libovolného vlákna"""
+        self.ui_queue.put(('log', msg))
+    
+    def ui_call(self, func, *args):
+        """Zavolá func(*args) v hlavním vlákně (ve stejném pořadí jako log)"""
+        self.ui_queue.put(('call', (func, args)))
+    
+    def drain_ui_queue(self):
+        """Vybere frontu UI - řádky logu jedním vložením, z měření jen poslední"""
+        lines = []
+        poll = None
+        try:
+            while True:
+                kind, item = self.ui_queue.get_nowait()
+                if kind == 'log':
+                    lines.append(item)
+                elif kind == 'poll':
+                    poll = item
+                else:
+                    # Volání Tk musí vidět log vložený před ním
+                    self.flush_log(lines)
+                    lines = []
+                    func, args = item
+                    func(*args)
+        except queue.Empty:
+            pass
+        
+        self.flush_log(lines)
+        if poll is not None:
+            self.render_poll(*poll)
+        self.root.after(1000 // UI_FPS, self.drain_ui_queue)
+    
+    def flush_log(self, lines):
+        """Vloží řádky do logu a ořízne ho na LOG_MAX_LINES"""
+        if not lines:
+            return
+        self.output.insert(tk.END, "\n".join(lines) + "\n")
+        # Text končí prázdným řádkem za posledním "\n"
+        excess = int(self.output.index("end-1c").split(".")[0]) - 1 - LOG_MAX_LINES
+        if excess > 0:
+            self.output.delete("1.0", f"{excess + 1}.0")
         self.output.see(tk.END)
-        self.root.update()
         
     def toggle_debug(self):
         """Přepne debug režim"""
@@ -200,81 +508,67 @@ class SNMPMonitor:
         else:
             self.log("🐛 DEBUG režim VYPNUT")
     
+    def toggle_v3(self, event=None):
+        """Pole USM jen pro SNMPv3"""
+        if self.version.get() == "v3":
+            self.v3_frame.grid()
+        else:
+            self.v3_frame.grid_remove()
+    
+    def toggle_archive(self):
+        """Zapne/vypne archiv pro další START"""
+        if self.archive is None:
+            self.archive_check.state(["!selected"])
+            self.log("💾 Při přehrávání záznamu se archiv nezapisuje")
+            return
+        self.archive_mode = not self.archive_mode
+        if self.archive_mode:
+            self.log(f"💾 Archiv ZAPNUT ({ARCHIVE_DIR})")
+        else:
+            self.log("💾 Archiv VYPNUT")
+    
+    def on_close(self):
+        """Zavření okna - ukončí SNMP smyčku a pak dopíše archiv"""
+        self.stop_event.set()
+        if self.worker is not None:
+            self.worker.join(timeout=10)  # Poslední vzorky smyčky ještě jdou do archivu
+        if self._session is not None:
+            self._session.close()
+        if self.archive is not None:
+            self.archive.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        self.root.destroy()
+    
     def clear(self):
-        self.output.delete(1.0, tk.END)
+        self.ui_call(self.output.delete, 1.0, tk.END)
     
-    def snmp_get(self, oid):
+    def target(self):
+        """SNMP cíl podle aktuální konfigurace v UI (jen z hlavního vlákna)"""
+        if self.version.get() == "v3":
+            return SnmpTarget(
+                self.ip.get(), version="v3",
+                user=self.v3_user.get(), auth_protocol=self.auth_protocol.get(), auth_key=self.auth_key.get(),
+                priv_protocol=self.priv_protocol.get(), priv_key=self.priv_key.get(), context=self.v3_context.get(),
+            )
+        return SnmpTarget(self.ip.get(), self.community.get(), self.version.get())
+
+    def snmp_get(self, oid, target=None):
         """SNMP GET request"""
+        results, error = self.snmp_get_many([oid], target)
+        if error:
+            return None, error
+        if oid not in results:
+            return None, "noSuchName"
+        return results[oid], None
+
+    def snmp_get_many(self, oids, target=None):
+        """SNMP GET více OID v jednom PDU - při tooBig se dávka rozdělí"""
         try:
-            import asyncio
-            
-            async def do_get():
-                target = await UdpTransportTarget.create((self.ip.get(), 161))
-                return await get_cmd(
-                    SnmpEngine(),
-                    CommunityData(self.community.get(), mpModel=0 if self.version.get() == "v1" else 1),
-                    target,
-                    ContextData(),
-                    ObjectType(ObjectIdentity(oid))
-                )
-            
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            errorIndication, errorStatus, errorIndex, varBinds = loop.run_until_complete(do_get())
-            loop.close()
-            
-            if errorIndication:
-                return None, str(errorIndication)
-            elif errorStatus:
-                return None, f"{errorStatus.prettyPrint()} at {errorIndex}"
-            else:
-                return str(varBinds[0][1]), None
-                
-        except Exception as e:
-            return None, str(e)
-    
-    def snmp_walk(self, oid):
-        """SNMP WALK request"""
-        results = {}
-        try:
-            import asyncio
-            
-            async def do_walk():
-                target = await UdpTransportTarget.create((self.ip.get(), 161))
-                data = []
-                async for errorIndication, errorStatus, errorIndex, varBinds in walk_cmd(
-                    SnmpEngine(),
-                    CommunityData(self.community.get(), mpModel=0 if self.version.get() == "v1" else 1),
-                    target,
-                    ContextData(),
-                    ObjectType(ObjectIdentity(oid)),
-                    lexicographicMode=False
-                ):
-                    data.append((errorIndication, errorStatus, errorIndex, varBinds))
-                return data
-            
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            data = loop.run_until_complete(do_walk())
-            loop.close()
-            
-            for errorIndication, errorStatus, errorIndex, varBinds in data:
-                if errorIndication:
-                    return None, str(errorIndication)
-                elif errorStatus:
-                    return None, f"{errorStatus.prettyPrint()}"
-                else:
-                    for varBind in varBinds:
-                        oid_str = str(varBind[0])
-                        index = oid_str.split('.')[-1]
-                        value = str(varBind[1])
-                        results[index] = value
-            
-            return results, None
-            
+            return self.session.get(target or self.target(), oids), None
         except Exception as e:
             return None, str(e)
-    
+
     def test(self):
         """Test SNMP připojení"""
         self.clear()
@@ -282,12 +576,20 @@ class SNMPMonitor:
         self.log("🔍 TEST SNMP PŘIPOJENÍ")
         self.log("=" * 90)
         self.log(f"📡 IP: {self.ip.get()}")
-        self.log(f"🔑 Community: {self.community.get()}")
+        if self.version.get() == "v3":
+            self.log(f"🔑 Uživatel: {self.v3_user.get()} ({self.auth_protocol.get()}/{self.priv_protocol.get()})")
+        else:
+            self.log(f"🔑 Community: {self.community.get()}")
         self.log(f"📋 Verze: {self.version.get()}")
         self.log("")
         self.log("⏳ Připojuji se...")
         
-        result, error = self.snmp_get(self.OID['sysDescr'])
+        thread = threading.Thread(target=self.test_worker, args=(self.target(),), daemon=True)
+        thread.start()
+    
+    def test_worker(self, target):
+        """Test připojení v pracovním vlákně"""
+        result, error = self.snmp_get(self.OID['sysDescr'], target)
         
         if error:
             self.log("")
@@ -296,10 +598,10 @@ class SNMPMonitor:
             self.log("")
             self.log("🔧 Zkontrolujte:")
             self.log("  • IP adresu switche")
-            self.log("  • SNMP community")
+            self.log("  • SNMP community (u v3 uživatele, protokoly a hesla)")
             self.log("  • SNMP je povoleno na zařízení")
             self.log("  • Firewall neblokuje port 161/UDP")
-            messagebox.showerror("Chyba", f"SNMP selhalo:\n{error}")
+            self.ui_call(messagebox.showerror, "Chyba", f"SNMP selhalo:\n{error}")
         else:
             self.log("")
             self.log("✅✅✅ ÚSPĚCH! ✅✅✅")
@@ -308,7 +610,7 @@ class SNMPMonitor:
             self.log(f"   {result[:200]}")
             self.log("")
             self.log("➡ Nyní klikněte na 'Načíst porty'")
-            messagebox.showinfo("Úspěch! 🎉", "SNMP připojení funguje!")
+            self.ui_call(messagebox.showinfo, "Úspěch! 🎉", "SNMP připojení funguje!")
     
     def load_ports(self):
         """Načtení portů"""
@@ -319,41 +621,54 @@ class SNMPMonitor:
         self.log("")
         self.log("⏳ Načítám seznam portů...")
         
-        # Načti názvy portů
-        if_names, error = self.snmp_walk(self.OID['ifDescr'])
-        
-        if error:
+        thread = threading.Thread(target=self.load_ports_worker, args=(self.target(),), daemon=True)
+        thread.start()
+    
+    def load_ports_worker(self, target):
+        """Načtení tabulky portů v pracovním vlákně (přes cache metadat)"""
+        try:
+            if_rows, source = self.session.call(
+                fetch_interfaces(self.session.client, target, self.ifcache, self.max_repetitions)
+            )
+        except Exception as e:
+            error = str(e)
             self.log("")
             self.log(f"❌ Chyba: {error}")
-            messagebox.showerror("Chyba", f"Nepodařilo se načíst porty:\n{error}")
+            self.ui_call(messagebox.showerror, "Chyba", f"Nepodařilo se načíst porty:\n{error}")
             return
         
-        if not if_names:
+        if not if_rows:
             self.log("❌ Žádné porty nenalezeny")
-            messagebox.showwarning("Upozornění", "Nenalezeny žádné porty")
+            self.ui_call(messagebox.showwarning, "Upozornění", "Nenalezeny žádné porty")
             return
         
-        # Načti statusy
-        self.log(f"⏳ Načítám statusy a popisy {len(if_names)} portů...")
-        if_admin, _ = self.snmp_walk(self.OID['ifAdminStatus'])
-        if_oper, _ = self.snmp_walk(self.OID['ifOperStatus'])
-        if_alias, _ = self.snmp_walk(self.OID['ifAlias'])
+        self.log("")
+        interfaces, rows, ports = self.port_rows(if_rows)
+        for display_text in ports:
+            self.log(f"  {display_text}")
         
         self.log("")
-        self.interfaces = {}
+        self.log(f"✅ Načteno {len(ports)} portů ({LOAD_SOURCES[source]})")
+        self.log("")
+        self.log("➡ Vyberte porty (Ctrl/Shift + klik) a klikněte START")
+        self.ui_call(self.show_ports, interfaces, rows)
+        self.ui_call(messagebox.showinfo, "Hotovo", f"Načteno {len(ports)} portů!")
+    
+    def port_rows(self, if_rows):
+        """Metadata rozhraní -> (ifIndex -> jméno, řádky seznamu portů, texty pro log)"""
+        interfaces = {}
+        rows = []
         ports = []
         
-        for idx, name in if_names.items():
-            admin = if_admin.get(idx, '2') if if_admin else '2'
-            oper = if_oper.get(idx, '2') if if_oper else '2'
-            alias = if_alias.get(idx, '') if if_alias else ''
+        for idx, row in if_rows.items():
+            name, alias = row['descr'], row['alias']
             
             status = []
-            status.append('UP' if admin == '1' else 'DOWN')
-            status.append('active' if oper == '1' else 'inactive')
+            status.append('UP' if row['admin'] == '1' else 'DOWN')
+            status.append('active' if row['oper'] == '1' else 'inactive')
             status_str = f"[{'/'.join(status)}]"
             
-            self.interfaces[idx] = name
+            interfaces[idx] = name
             
             # Formát: "1: InLoopBack0 - Popis portu [UP/active]"
             if alias and alias.strip():
@@ -362,42 +677,30 @@ class SNMPMonitor:
                 display_text = f"{idx}: {name} {status_str}"
             
             ports.append(display_text)
-            self.log(f"  {display_text}")
-        
-        self.port_combo['values'] = ports
-        if ports:
-            self.port_combo.current(0)
-            self.start_btn.config(state="normal")
+            rows.append((idx, (f"{idx}: {name}", alias, status_str)))
         
-        self.log("")
-        self.log(f"✅ Načteno {len(ports)} portů")
-        self.log("")
-        self.log("➡ Vyberte port a klikněte START")
-        messagebox.showinfo("Hotovo", f"Načteno {len(ports)} portů!")
+        return interfaces, rows, ports
     
-    def get_stats(self, idx):
-        """Získá statistiky pro port - používá high-capacity 64-bit countery"""
-        stats = {}
-        
-        val, _ = self.snmp_get(f"{self.OID['ifHCInOctets']}.{idx}")
-        stats['in_octets'] = int(val) if val and val.isdigit() else 0
-        
-        val, _ = self.snmp_get(f"{self.OID['ifHCOutOctets']}.{idx}")
-        stats['out_octets'] = int(val) if val and val.isdigit() else 0
-        
-        val, _ = self.snmp_get(f"{self.OID['ifHCInUcastPkts']}.{idx}")
-        stats['in_packets'] = int(val) if val and val.isdigit() else 0
-        
-        val, _ = self.snmp_get(f"{self.OID['ifHCOutUcastPkts']}.{idx}")
-        stats['out_packets'] = int(val) if val and val.isdigit() else 0
-        
-        val, _ = self.snmp_get(f"{self.OID['ifInErrors']}.{idx}")
-        stats['in_errors'] = int(val) if val and val.isdigit() else 0
-        
-        val, _ = self.snmp_get(f"{self.OID['ifOutErrors']}.{idx}")
-        stats['out_errors'] = int(val) if val and val.isdigit() else 0
-        
-        return stats
+    def show_cached_ports(self):
+        """Při startu zobrazí porty z cache (bez SNMP dotazu)"""
+        if_rows = cached_rows(self.ifcache, self.target())
+        if if_rows:
+            interfaces, rows, _ = self.port_rows(if_rows)
+            self.show_ports(interfaces, rows)
+            self.log(f"📦 {len(rows)} portů z cache - 'Načíst porty' ověří změny na zařízení")
+    
+    def show_ports(self, interfaces, rows):
+        """Naplní seznam portů (hlavní vlákno)"""
+        self.interfaces = interfaces
+        self.port_list.delete(*self.port_list.get_children())
+        for idx, values in rows:
+            self.port_list.insert("", "end", iid=idx, values=values)
+        
+        if rows:
+            first = self.port_list.get_children()[0]
+            self.port_list.selection_set(first)
+            self.port_list.see(first)
+            self.start_btn.config(state="normal")
     
     def format_speed_mbps(self, bytes_per_sec):
         """Formátuje rychlost v Mbps/Gbps"""
@@ -409,48 +712,86 @@ class SNMPMonitor:
         else:
             return f"{mbps:.2f} Mbps"
     
-    def update_displays(self, in_rate, out_rate, in_pps, out_pps):
-        """Aktualizuje textové displeje"""
-        # Aktualizuj min/max
-        if in_rate > 0:  # Ignoruj nulové hodnoty
-            self.rx_min = min(self.rx_min, in_rate)
-            self.rx_max = max(self.rx_max, in_rate)
-        
-        if out_rate > 0:  # Ignoruj nulové hodnoty
-            self.tx_min = min(self.tx_min, out_rate)
-            self.tx_max = max(self.tx_max, out_rate)
+    def update_displays(self, total, tracker):
+        """Aktualizuje textové displeje (součet vybraných portů)"""
+        # Min/max drží tracker přes všechna měření, i ta nevykreslená
+        rates, stats = total.rates, total.stats
         
         # Rychlost
-        self.rx_speed_label.config(text=self.format_speed_mbps(in_rate))
-        self.tx_speed_label.config(text=self.format_speed_mbps(out_rate))
+        self.rx_speed_label.config(text=self.format_speed_mbps(rates.in_rate))
+        self.tx_speed_label.config(text=self.format_speed_mbps(rates.out_rate))
         
         # Pakety za sekundu
-        self.rx_pps_label.config(text=f"{int(in_pps):,} pkt/s")
-        self.tx_pps_label.config(text=f"{int(out_pps):,} pkt/s")
+        self.rx_pps_label.config(text=f"{int(rates.in_pps):,} pkt/s")
+        self.tx_pps_label.config(text=f"{int(rates.out_pps):,} pkt/s")
         
         # Min/Max
-        if self.rx_min != float('inf'):
-            self.rx_min_label.config(text=f"Min: {self.format_speed_mbps(self.rx_min)}")
-            self.rx_max_label.config(text=f"Max: {self.format_speed_mbps(self.rx_max)}")
+        if tracker.rx_min != float('inf'):
+            self.rx_min_label.config(text=f"Min: {self.format_speed_mbps(tracker.rx_min)}")
+            self.rx_max_label.config(text=f"Max: {self.format_speed_mbps(tracker.rx_max)}")
+        
+        if tracker.tx_min != float('inf'):
+            self.tx_min_label.config(text=f"Min: {self.format_speed_mbps(tracker.tx_min)}")
+            self.tx_max_label.config(text=f"Max: {self.format_speed_mbps(tracker.tx_max)}")
         
-        if self.tx_min != float('inf'):
-            self.tx_min_label.config(text=f"Min: {self.format_speed_mbps(self.tx_min)}")
-            self.tx_max_label.config(text=f"Max: {self.format_speed_mbps(self.tx_max)}")
+        # Průměr a percentily (časově vážené, včetně nečinnosti)
+        self.rx_pct_label.config(text=self.format_stats(tracker.rx_stats))
+        self.tx_pct_label.config(text=self.format_stats(tracker.tx_stats))
         
         # Aktualizuj čítače
-        if self.prev_stats:
-            self.rx_errors_label.config(text=f"{self.prev_stats.get('in_errors', 0):,}")
-            self.tx_errors_label.config(text=f"{self.prev_stats.get('out_errors', 0):,}")
-            self.rx_packets_label.config(text=f"{self.prev_stats.get('in_packets', 0):,}")
-            self.tx_packets_label.config(text=f"{self.prev_stats.get('out_packets', 0):,}")
-            
-            # Uptime
-            if self.start_time:
-                elapsed = time.time() - self.start_time
-                hours = int(elapsed // 3600)
-                minutes = int((elapsed % 3600) // 60)
-                seconds = int(elapsed % 60)
-                self.uptime_label.config(text=f"{hours:02d}:{minutes:02d}:{seconds:02d}")
+        self.rx_errors_label.config(text=f"{stats.in_errors:,}")
+        self.tx_errors_label.config(text=f"{stats.out_errors:,}")
+        self.rx_packets_label.config(text=f"{stats.in_packets:,}")
+        self.tx_packets_label.config(text=f"{stats.out_packets:,}")
+        
+        # Uptime
+        if self.start_time:
+            elapsed = total.timestamp - self.start_time
+            hours = int(elapsed // 3600)
+            minutes = int((elapsed % 3600) // 60)
+            seconds = int(elapsed % 60)
+            self.uptime_label.config(text=f"{hours:02d}:{minutes:02d}:{seconds:02d}")
+    
+    def format_stats(self, stream):
+        """Průměr, EWMA, p95 a p99 rychlosti ze StreamStats"""
+        if not stream.count:
+            return "Ø - | EWMA - | p95 - | p99 -"
+        return (f"Ø {self.format_speed_mbps(stream.mean)} | EWMA {self.format_speed_mbps(stream.ewma)}"
+                f" | p95 {self.format_speed_mbps(stream.quantile(0.95))}"
+                f" | p99 {self.format_speed_mbps(stream.quantile(0.99))}")
+    
+    def update_port_row(self, sample, tracker):
+        """Přepíše řádek portu v tabulce (bez překreslení ostatních)"""
+        idx, stats, rates = sample.ifindex, sample.stats, sample.rates
+        if rates is None:
+            return
+        
+        def minmax(lo, hi):
+            if lo == float('inf'):
+                return "-"
+            return f"{self.format_speed_mbps(lo)} / {self.format_speed_mbps(hi)}"
+        
+        self.port_table.item(idx, values=(
+            f"{idx}: {self.interfaces.get(idx, '')}",
+            self.format_speed_mbps(rates.in_rate),
+            self.format_speed_mbps(rates.out_rate),
+            f"{int(rates.in_pps):,}",
+            f"{int(rates.out_pps):,}",
+            minmax(tracker.rx_min, tracker.rx_max),
+            minmax(tracker.tx_min, tracker.tx_max),
+            f"{self.format_speed_mbps(tracker.rx_stats.quantile(0.95))} / "
+            f"{self.format_speed_mbps(tracker.tx_stats.quantile(0.95))}",
+            f"{stats.in_errors:,} / {stats.out_errors:,}",
+        ))
+    
+    def format_bytes(self, count):
+        """Formátuje množství dat (B/KB/MB/GB)"""
+        val = count
+        for unit in ['B', 'KB', 'MB', 'GB']:
+            if val < 1024:
+                return f"{val:.0f} {unit}" if unit == 'B' else f"{val:.1f} {unit}"
+            val /= 1024
+        return f"{val:.1f} TB"
     
     def format_speed_short(self, bytes_per_sec):
         """Krátký formát rychlosti"""
@@ -483,114 +824,229 @@ class SNMPMonitor:
         
         return f"{bytes_str} | {bits_str}"
     
-    def monitor_loop(self):
-        """Monitoring loop"""
-        sel = self.port_combo.get()
-        idx = sel.split(':')[0].strip()
-        name = self.interfaces[idx]
-        
-        self.output.delete(1.0, tk.END)
+    def monitor_loop(self, indices, target, interval):
+        """Monitoring loop - všechny vybrané porty jedním dávkovým GET za cyklus"""
+        self.clear()
         self.log("=" * 50)
-        self.log(f"🎯 MONITORING")
-        self.log(f"Port: {name}")
-        self.log(f"Index: {idx}")
+        self.log(f"🎯 MONITORING ({len(indices)} portů)")
+        for idx in indices:
+            self.log(f"Port: {self.interfaces[idx]} (index {idx})")
         self.log("=" * 50)
         self.log("")
         
         # Vymažeme historii
-        self.start_time = time.time()
-        
-        # Reset min/max hodnot
-        self.rx_min = float('inf')
-        self.rx_max = 0
-        self.tx_min = float('inf')
-        self.tx_max = 0
-        
-        interval = 2
-        last_measurement_time = time.time()
-        
-        while self.monitoring:
-            try:
-                current_time = time.time()
-                stats = self.get_stats(idx)
-                ts = datetime.now().strftime("%H:%M:%S")
-                
-                if self.prev_stats:
-                    # Skutečný interval mezi měřeními
-                    actual_interval = current_time - last_measurement_time
-                    
-                    in_rate = (stats['in_octets'] - self.prev_stats['in_octets']) / actual_interval
-                    out_rate = (stats['out_octets'] - self.prev_stats['out_octets']) / actual_interval
-                    in_pps = (stats['in_packets'] - self.prev_stats['in_packets']) / actual_interval
-                    out_pps = (stats['out_packets'] - self.prev_stats['out_packets']) / actual_interval
-                    
-                    # Debug výpis
-                    if self.debug_mode:
-                        self.log(f"[{ts}] DEBUG:")
-                        self.log(f"  Current IN octets:  {stats['in_octets']:,}")
-                        self.log(f"  Previous IN octets: {self.prev_stats['in_octets']:,}")
-                        self.log(f"  Delta IN octets:    {stats['in_octets'] - self.prev_stats['in_octets']:,}")
-                        self.log(f"  IN bytes/sec:       {in_rate:,.2f}")
-                        self.log(f"  IN Mbps calc:       {(in_rate * 8) / (1000 * 1000):.2f}")
-                        self.log(f"")
-                        self.log(f"  Current OUT octets:  {stats['out_octets']:,}")
-                        self.log(f"  Previous OUT octets: {self.prev_stats['out_octets']:,}")
-                        self.log(f"  Delta OUT octets:    {stats['out_octets'] - self.prev_stats['out_octets']:,}")
-                        self.log(f"  OUT bytes/sec:       {out_rate:,.2f}")
-                        self.log(f"  OUT Mbps calc:       {(out_rate * 8) / (1000 * 1000):.2f}")
-                        self.log(f"  Actual interval:     {actual_interval:.2f} sec (not {interval}!)")
-                        self.log("")
-                    
-                    # Aktualizuj displeje
-                    self.update_displays(max(0, in_rate), max(0, out_rate), max(0, in_pps), max(0, out_pps))
-                    
-                    # Log - teď v Mbps
-                    if not self.debug_mode:  # Normální výpis jen když není debug
-                        self.log(f"[{ts}]")
-                        self.log(f"  ⬇ IN:  {self.format_speed_mbps(max(0, in_rate))}")
-                        self.log(f"         {max(0, in_pps):>8.0f} pkt/s")
-                        self.log(f"  ⬆ OUT: {self.format_speed_mbps(max(0, out_rate))}")
-                        self.log(f"         {max(0, out_pps):>8.0f} pkt/s")
-                    
-                    if stats['in_errors'] > 0 or stats['out_errors'] > 0:
-                        self.log(f"  ⚠ Errors: IN={stats['in_errors']}, OUT={stats['out_errors']}")
-                    
-                    self.log("-" * 50)
-                
-                self.prev_stats = stats
-                last_measurement_time = current_time
-                time.sleep(interval)
-                
-            except Exception as e:
-                self.log(f"⚠ Chyba: {e}")
-                time.sleep(interval)
+        self.start_time = None  # Čas prvního měření (on_poll)
+        self.last_samples = {}
+        self.history = HistoryStore(GRAPH_TIERS)
+        self.missed = 0
+        
+        self.monitor = PortMonitor(self.session, target, indices, interval=interval, history=self.history,
+                                   archive=self.archive if self.archive_mode else None)
+        self.run_poller(self.monitor, self.on_poll)
+    
+    def run_poller(self, poller, on_poll):
+        """Spustí monitor / top talkers; konec přehrávaného záznamu zastaví jako Stop"""
+        poller.run(on_poll, self.stop_event, on_error=lambda e: self.log(f"⚠ Chyba: {e}"),
+                   paced=not self.replay)  # Záznam si tempo řídí sám (rychlost přehrávání)
+        if not self.stop_event.is_set():
+            self.log(f"📼 Konec záznamu ({self.session.client.replayed} odpovědí)")
+            self.ui_call(self.stop)
+    
+    def on_poll(self, samples, total):
+        """Zpracuje jedno měření monitoru (pracovní vlákno) - log a předání do UI"""
+        if self.start_time is None:
+            self.start_time = total.timestamp
+        ts = datetime.fromtimestamp(total.timestamp).strftime("%H:%M:%S.%f")
+        ts = ts[:-3] if self.monitor.interval < 1 else ts[:-7]  # Pod 1 s i milisekundy
+        rates = total.rates
+        
+        if self.monitor.missed > self.missed:
+            self.log(f"⚠ Zmeškáno {self.monitor.missed - self.missed} cyklů (poll delší než interval)")
+            self.missed = self.monitor.missed
+        
+        if rates is not None:
+            # Debug výpis
+            if self.debug_mode:
+                self.log(f"[{ts}] DEBUG: interval {rates.interval:.2f} sec (not {self.monitor.interval}!)")
+                for sample in samples:
+                    prev, cur = self.last_samples[sample.ifindex].stats, sample.stats
+                    self.log(f"  {self.interfaces[sample.ifindex]}:")
+                    self.log(f"    IN octets:  {prev.in_octets:,} -> {cur.in_octets:,} "
+                             f"(delta {cur.in_octets - prev.in_octets:,})")
+                    self.log(f"    OUT octets: {prev.out_octets:,} -> {cur.out_octets:,} "
+                             f"(delta {cur.out_octets - prev.out_octets:,})")
+                self.log(f"  Σ IN bytes/sec:  {rates.in_rate:,.2f} ({(rates.in_rate * 8) / (1000 * 1000):.2f} Mbps)")
+                self.log(f"  Σ OUT bytes/sec: {rates.out_rate:,.2f} ({(rates.out_rate * 8) / (1000 * 1000):.2f} Mbps)")
+                self.log("")
+            
+            # Displeje a tabulku překreslí drain_ui_queue (jen poslední měření)
+            self.ui_queue.put(('poll', (self.monitor, samples, total)))
+            
+            # Log - teď v Mbps
+            if not self.debug_mode:  # Normální výpis jen když není debug
+                self.log(f"[{ts}]")
+            
+            for sample in samples:
+                if not self.debug_mode and sample.rates:
+                    self.log(f"  {self.interfaces[sample.ifindex][:24]:<24} "
+                             f"⬇ {self.format_speed_mbps(sample.rates.in_rate):>12} {sample.rates.in_pps:>8.0f} pkt/s  "
+                             f"⬆ {self.format_speed_mbps(sample.rates.out_rate):>12} {sample.rates.out_pps:>8.0f} pkt/s")
+            
+            if total.stats.in_errors > 0 or total.stats.out_errors > 0:
+                self.log(f"  ⚠ Errors: IN={total.stats.in_errors}, OUT={total.stats.out_errors}")
+            
+            self.log("-" * 50)
+        
+        self.last_samples = {sample.ifindex: sample for sample in samples}
+    
+    def render_poll(self, monitor, samples, total):
+        """Překreslí displeje a řádky portů podle posledního měření (hlavní vlákno)"""
+        if monitor is not self.monitor:
+            return  # Měření z předchozího běhu
+        self.update_displays(total, monitor.total)
+        for sample in samples:
+            self.update_port_row(sample, monitor.trackers[sample.ifindex])
+        self.update_snmp_stats(self.session.client.stats.device(monitor.target))
+        self.update_graph()
+    
+    def update_snmp_stats(self, stats):
+        """Instrumentace SNMP v panelu Counters - switch, síť, nebo naše CPU?"""
+        histogram = stats.latency.get('get')
+        if histogram is not None:
+            self.snmp_stat_labels["latency"].config(
+                text=f"{histogram.percentile(0.5) * 1000:.1f} / {histogram.percentile(0.99) * 1000:.1f} ms")
+        self.snmp_stat_labels["timeouts"].config(text=f"{stats.timeouts:,} / {stats.retransmits:,}")
+        self.snmp_stat_labels["errors"].config(text=f"{sum(stats.errors.values()):,}")
+        self.snmp_stat_labels["wire"].config(
+            text=f"{self.format_bytes(stats.bytes_in)} / {self.format_bytes(stats.bytes_out)}")
+        if stats.request_time > 0:
+            cpu = min(100.0, (stats.encode_time + stats.decode_time) / stats.request_time * 100)
+            self.snmp_stat_labels["cpu"].config(text=f"{cpu:.0f} % / {100 - cpu:.0f} %")
+    
+    def update_graph(self):
+        """Překreslí graf z historie souhrnu pro zvolené okno"""
+        if self.monitor is None or self.monitor.TOTAL not in self.history:
+            return
+        end = self.monitor.total.prev_time  # Čas posledního měření (u přehrávání ze záznamu)
+        start = end - GRAPH_WINDOWS[self.graph_window.get()]
+        tier = self.history[self.monitor.TOTAL].covering(start)
+        
+        series = []
+        for column in ('in_octets', 'out_octets'):
+            points = list(tier.series(column, start, per_second=True))
+            series.append(([t for t, _ in points], [v for _, v in points]))
+        self.graph.draw(*series, start, end)
+    
+    def top_loop(self, target, interval):
+        """Top talkers - průchod celého switche každý interval"""
+        self.clear()
+        self.log("=" * 50)
+        self.log(f"🏆 TOP TALKERS {target.host} (top {TOP_N}, interval {interval:g} s)")
+        self.log("=" * 50)
+        self.talkers = TopTalkers(self.session, target, TOP_N, interval)
+        self.run_poller(self.talkers, self.on_top)
+    
+    def on_top(self, ranking, timestamp):
+        """Zpracuje jeden průchod top talkers (pracovní vlákno)"""
+        self.ui_call(self.render_top, self.talkers, ranking)
+        leaders = [
+            f"{label} {self.port_name(ranking[metric][0][1])}"
+            for metric, label in (("rx", "⬇"), ("tx", "⬆"), ("errors", "⚠")) if ranking[metric]
+        ]
+        if leaders:
+            ts = datetime.fromtimestamp(timestamp).strftime("%H:%M:%S")
+            self.log(f"[{ts}] {self.talkers.ports} portů | " + " | ".join(leaders))
+    
+    def port_name(self, idx):
+        return f"{idx}: {self.interfaces[idx]}" if idx in self.interfaces else idx
+    
+    def render_top(self, talkers, ranking):
+        """Přepíše řádky žebříčku (hlavní vlákno)"""
+        if talkers is not self.talkers:
+            return
+        columns = (
+            [(self.port_name(idx), self.format_speed_mbps(rate)) for rate, idx in ranking["rx"]],
+            [(self.port_name(idx), self.format_speed_mbps(rate)) for rate, idx in ranking["tx"]],
+            [(self.port_name(idx), f"{rate:,.1f}") for rate, idx in ranking["errors"]],
+        )
+        for rank in range(TOP_N):
+            values = [rank + 1]
+            for column in columns:
+                values += column[rank] if rank < len(column) else ("-", "-")
+            self.top_table.item(str(rank + 1), values=values)
+    
+    def top(self):
+        """Start top talkers (žebříček místo tabulky vybraných portů)"""
+        if self.version.get() == "v1":
+            messagebox.showwarning("Upozornění", "Top talkers potřebují SNMPv2c/v3 (64bit countery)!")
+            return
+        try:
+            interval = max(TOP_MIN_INTERVAL, float(self.interval.get()))
+        except ValueError:
+            messagebox.showwarning("Upozornění", "Neplatný interval!")
+            return
+        
+        for rank in range(1, TOP_N + 1):
+            self.top_table.item(str(rank), values=(rank,) + ("-",) * 6)
+        self.port_table.pack_forget()
+        self.top_table.pack(fill="x", pady=(10, 0))
+        
+        self.stop_event = threading.Event()
+        self.start_btn.config(state="disabled")
+        self.top_btn.config(state="disabled")
+        self.stop_btn.config(state="normal")
+        
+        self.worker = threading.Thread(target=self.top_loop, args=(self.target(), interval), daemon=True)
+        self.worker.start()
     
     def start(self):
         """Start monitoring"""
-        if not self.port_combo.get():
+        indices = list(self.port_list.selection())
+        if not indices:
             messagebox.showwarning("Upozornění", "Vyberte port!")
             return
+        try:
+            interval = float(self.interval.get())
+        except ValueError:
+            interval = 0
+        if interval <= 0:
+            messagebox.showwarning("Upozornění", "Neplatný interval!")
+            return
         
-        self.monitoring = True
-        self.prev_stats = {}
+        # Řádky tabulky pro vybrané porty
+        self.top_table.pack_forget()
+        self.port_table.pack(fill="x", pady=(10, 0))
+        self.port_table.delete(*self.port_table.get_children())
+        for idx in indices:
+            self.port_table.insert("", "end", iid=idx, values=(f"{idx}: {self.interfaces[idx]}",) + ("-",) * 8)
+        
+        self.stop_event = threading.Event()
         self.start_btn.config(state="disabled")
+        self.top_btn.config(state="disabled")
         self.stop_btn.config(state="normal")
-        self.port_combo.config(state="disabled")
+        self.port_list.config(selectmode="none")
         
-        thread = threading.Thread(target=self.monitor_loop, daemon=True)
-        thread.start()
+        self.worker = threading.Thread(target=self.monitor_loop, args=(indices, self.target(), interval), daemon=True)
+        self.worker.start()
     
     def stop(self):
         """Stop monitoring"""
-        self.monitoring = False
+        self.stop_event.set()
         self.start_btn.config(state="normal")
+        self.top_btn.config(state="normal")
         self.stop_btn.config(state="disabled")
-        self.port_combo.config(state="readonly")
+        self.port_list.config(selectmode="extended")
         self.log("")
         self.log("⏹ Monitoring zastaven")
         self.log("")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SNMP Port Monitor")
+    parser.add_argument('--record', help="zapisovat SNMP odpovědi do záznamu (gzip)")
+    parser.add_argument('--replay', help="přehrát záznam místo dotazů na síť")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="rychlost přehrávání (1 = reálný čas, 0 = co nejrychleji)")
+    args = parser.parse_args()
     root = tk.Tk()
-    app = SNMPMonitor(root)
+    app = SNMPMonitor(root, args.record, args.replay, args.speed)
     root.mainloop()